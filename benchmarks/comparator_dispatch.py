@@ -0,0 +1,130 @@
+"""Per-node comparator dispatch benchmark.
+
+Builds documents with many small nodes (wide nested objects whose leaves hold
+a handful of values), so the cost of choosing comparators dominates the cost
+of running them. The full CLI comparator set is timed twice: with the
+comparators' ``node_types`` / ``root_only`` declarations, which let
+``Converter`` dispatch through per-type tables, and with the declarations
+cleared, which makes every comparator see every node via ``can_process``.
+
+Usage::
+
+    python -m benchmarks.comparator_dispatch
+    python -m benchmarks.comparator_dispatch --objects 200 --fields 50 --documents 5
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Callable
+
+from genschema import Converter, PseudoArrayHandler
+from genschema.comparators import (
+    DeleteElement,
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+    SchemaVersionComparator,
+)
+from genschema.comparators.template import Comparator
+
+
+def _make_document(objects: int, fields: int, rnd: random.Random) -> dict:
+    return {
+        f"object_{o}": {
+            f"field_{f}": rnd.choice([rnd.randint(0, 9), "text", None, [1], {"x": 1}])
+            for f in range(fields)
+        }
+        for o in range(objects)
+    }
+
+
+def _cli_comparators() -> list[Comparator]:
+    return [
+        FormatComparator(),
+        EnumComparator(),
+        SchemaVersionComparator(),
+        RequiredComparator(),
+        EmptyComparator(),
+        DeleteElement(),
+        DeleteElement("isPseudoArray"),
+    ]
+
+
+def _undeclared(comparators: list[Comparator]) -> list[Comparator]:
+    for comparator in comparators:
+        comparator.node_types = None
+        comparator.root_only = False
+    return comparators
+
+
+def _converter(documents: list[dict], comparators: list[Comparator]) -> Converter:
+    conv = Converter(pseudo_handler=PseudoArrayHandler())
+    for document in documents:
+        conv.add_json(document)
+    for comparator in comparators:
+        conv.register(comparator)
+    return conv
+
+
+def _count_calls(documents: list[dict], comparators: list[Comparator]) -> tuple[int, int]:
+    """Число узлов (вызовов базового компаратора) и вызовов ``can_process`` за ``run()``."""
+    conv = _converter(documents, comparators)
+    counters = {"nodes": 0, "can_process": 0}
+
+    def count(comparator: Comparator, key: str) -> None:
+        method = comparator.can_process
+
+        def wrapper(*args: Any) -> bool:
+            counters[key] += 1
+            return method(*args)
+
+        comparator.can_process = wrapper  # type: ignore[method-assign, assignment]
+
+    for comparator in comparators:
+        count(comparator, "can_process")
+    count(conv._core_comparator, "nodes")
+    conv.run()
+    return counters["nodes"], counters["can_process"]
+
+
+def _best_time(documents: list[dict], make: Callable[[], list[Comparator]], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        conv = _converter(documents, make())
+        start = time.perf_counter()
+        conv.run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Comparator dispatch benchmark")
+    parser.add_argument("--objects", type=int, default=100)
+    parser.add_argument("--fields", type=int, default=40)
+    parser.add_argument("--documents", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    documents = [_make_document(args.objects, args.fields, rnd) for _ in range(args.documents)]
+
+    declared = _converter(documents, _cli_comparators()).run()
+    undeclared = _converter(documents, _undeclared(_cli_comparators())).run()
+    assert declared == undeclared
+
+    print(f"{'dispatch':>10} {'nodes':>8} {'can_process':>12} {'seconds':>10} {'us/node':>9}")
+    for label, make in (
+        ("all", lambda: _undeclared(_cli_comparators())),
+        ("per-type", _cli_comparators),
+    ):
+        nodes, calls = _count_calls(documents, make())
+        elapsed = _best_time(documents, make, args.repeat)
+        print(f"{label:>10} {nodes:>8} {calls:>12} {elapsed:>10.4f} {elapsed / nodes * 1e6:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+"""Refresh-cost benchmark for the incremental ``Converter`` mode.
+
+Simulates a stream of API responses: documents arrive in batches and the
+schema is refreshed after every batch. The batch converter re-runs over all
+documents seen so far, the incremental one folds each new document into its
+summaries and rebuilds the schema from them.
+
+Usage::
+
+    python -m benchmarks.incremental_refresh
+    python -m benchmarks.incremental_refresh --batches 20 --batch-size 500
+"""
+
+import argparse
+import random
+import time
+
+from genschema import Converter, PseudoArrayHandler
+from genschema.comparators import (
+    DeleteElement,
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+)
+
+STATUSES = ["new", "paid", "shipped", "cancelled"]
+
+
+def _make_document(rnd: random.Random) -> dict:
+    return {
+        "id": rnd.randint(1, 10**9),
+        "status": rnd.choice(STATUSES),
+        "email": f"user{rnd.randint(1, 10**6)}@example.com",
+        "created": f"2024-0{rnd.randint(1, 9)}-1{rnd.randint(0, 9)}",
+        "items": [
+            {"sku": f"SKU-{rnd.randint(1, 10**5)}", "qty": rnd.randint(1, 5)}
+            for _ in range(rnd.randint(0, 4))
+        ],
+        "meta": {str(i): rnd.random() for i in range(rnd.randint(0, 3))},
+    }
+
+
+def _make_converter(incremental: bool) -> Converter:
+    conv = Converter(pseudo_handler=PseudoArrayHandler(), incremental=incremental)
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(RequiredComparator())
+    conv.register(EmptyComparator())
+    conv.register(DeleteElement())
+    conv.register(DeleteElement("isPseudoArray"))
+    return conv
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Incremental refresh benchmark")
+    parser.add_argument("--batches", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    batches = [[_make_document(rnd) for _ in range(args.batch_size)] for _ in range(args.batches)]
+
+    batch_conv = _make_converter(incremental=False)
+    inc_conv = _make_converter(incremental=True)
+
+    print(f"{'documents':>10} {'batch s':>10} {'incremental s':>14}")
+    for number, batch in enumerate(batches, 1):
+        start = time.perf_counter()
+        for doc in batch:
+            batch_conv.add_json(doc)
+        batch_schema = batch_conv.run()
+        batch_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for doc in batch:
+            inc_conv.add_json(doc)
+        inc_schema = inc_conv.schema()
+        inc_elapsed = time.perf_counter() - start
+
+        assert batch_schema == inc_schema
+        documents = number * args.batch_size
+        print(f"{documents:>10} {batch_elapsed:>10.4f} {inc_elapsed:>14.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+"""Load/dump benchmark for the JSON backends in ``genschema.json_backend``.
+
+For every file in ``tests/datasets`` and every installed backend, reports the
+best time to parse the file bytes and to serialize the parsed document with
+``indent=2`` (as the CLI writes schemas). Parsed values must equal the
+stdlib ``json`` result.
+
+Usage::
+
+    python -m benchmarks.json_backends
+    python -m benchmarks.json_backends --repeat 50 --backends json orjson
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from typing import Any, Callable
+
+from genschema.json_backend import JSON_BACKENDS, get_json_backend
+
+
+def _best(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="JSON backend load/dump benchmark")
+    parser.add_argument("--dataset-dir", default="tests/datasets")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--backends", nargs="+", default=[name for name in JSON_BACKENDS if name != "auto"]
+    )
+    args = parser.parse_args()
+
+    backends = []
+    for name in args.backends:
+        try:
+            backends.append(get_json_backend(name))
+        except ValueError as e:
+            print(f"skipping {name}: {e}")
+
+    print(f"{'dataset':<24} {'backend':<9} {'load ms':>9} {'dump ms':>9}")
+    for file_path in sorted(glob.glob(os.path.join(args.dataset_dir, "*.json"))):
+        with open(file_path, "rb") as f:
+            raw = f.read()
+        expected = json.loads(raw)
+
+        name = os.path.basename(file_path)
+        for backend in backends:
+            data = backend.loads(raw)
+            assert data == expected, f"{name}: {backend.name} parsed a different value"
+            load = _best(lambda: backend.loads(raw), args.repeat)
+            dump = _best(lambda: backend.dumps(data, indent=2), args.repeat)
+            print(f"{name:<24} {backend.name:<9} {load * 1e3:>9.3f} {dump * 1e3:>9.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
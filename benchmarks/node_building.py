@@ -0,0 +1,173 @@
+"""Allocation benchmark for node construction in ``Converter.run()``.
+
+Every level builds one output node. For each bundled dataset this benchmark
+reports the peak memory traced by ``tracemalloc`` during a run, the memory
+still held once the run returns (essentially the schema itself), and the best
+wall time over several untraced runs. It also checks that every run returns
+the same schema.
+
+With ``--baseline REF`` the same measurement also runs against ``genschema``
+as of the git ref REF (exported with ``git archive``), and both are printed
+side by side; ``--ref`` picks a ref for the other side instead of the working
+tree. Each side runs in its own fresh process, and the schemas must match.
+Node construction became copy-on-write in the commit "Build level nodes
+copy-on-write"; compare it with its parent to reproduce the change alone.
+
+Usage::
+
+    python -m benchmarks.node_building
+    python -m benchmarks.node_building --repeat 20 --intern-shapes
+    python -m benchmarks.node_building --baseline <ref>
+    python -m benchmarks.node_building --baseline <commit>^ --ref <commit>
+"""
+
+import argparse
+import glob
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import tracemalloc
+from typing import Optional
+
+from genschema import Converter, PseudoArrayHandler
+from genschema.comparators import (
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _converter(data: object, intern_shapes: bool) -> Converter:
+    conv = Converter(
+        pseudo_handler=PseudoArrayHandler(), intern_shapes=intern_shapes, strip_metadata=True
+    )
+    conv.add_json(data)
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(RequiredComparator())
+    conv.register(EmptyComparator())
+    return conv
+
+
+def _measure(dataset_dir: str, repeat: int, intern_shapes: bool) -> dict[str, dict]:
+    results = {}
+    for file_path in sorted(glob.glob(os.path.join(dataset_dir, "*.json"))):
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        conv = _converter(data, intern_shapes)
+        tracemalloc.start()
+        schema = conv.run()
+        held, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        best = float("inf")
+        for _ in range(repeat):
+            conv = _converter(data, intern_shapes)
+            start = time.perf_counter()
+            result = conv.run()
+            best = min(best, time.perf_counter() - start)
+        assert result == schema, f"{file_path}: output differs between runs"
+
+        results[os.path.basename(file_path)] = {
+            "peak": peak / 1024,
+            "held": held / 1024,
+            "best": best * 1e3,
+            "schema": schema,
+        }
+    return results
+
+
+def _export(ref: str, target: str) -> None:
+    """Extract the ``genschema`` package as of git ``ref`` into ``target``."""
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", ref, "genschema"],
+        cwd=REPO_ROOT,
+        check=True,
+        capture_output=True,
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target)
+
+
+def _measure_in_process(package_root: str, args: argparse.Namespace) -> dict[str, dict]:
+    """Run the measurement in a fresh interpreter that imports genschema from ``package_root``."""
+    command = [
+        sys.executable,
+        os.path.abspath(__file__),
+        "--dataset-dir",
+        os.path.abspath(args.dataset_dir),
+        "--repeat",
+        str(args.repeat),
+        "--json",
+    ]
+    if args.intern_shapes:
+        command.append("--intern-shapes")
+    env = dict(os.environ, PYTHONPATH=package_root)
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    results: dict[str, dict] = json.loads(output)
+    return results
+
+
+def _print(results: dict[str, dict], baseline: Optional[dict[str, dict]]) -> None:
+    if baseline is None:
+        print(f"{'dataset':<24} {'peak KiB':>10} {'held KiB':>10} {'best ms':>9}")
+        for name, r in results.items():
+            print(f"{name:<24} {r['peak']:>10.1f} {r['held']:>10.1f} {r['best']:>9.2f}")
+        return
+
+    print(f"{'dataset':<24} {'peak KiB':>19} {'held KiB':>19} {'best ms':>17}")
+    for name, r in results.items():
+        b = baseline[name]
+        assert b["schema"] == r["schema"], f"{name}: schema differs from the baseline"
+        print(
+            f"{name:<24} {b['peak']:>8.1f} -> {r['peak']:>6.1f} "
+            f"{b['held']:>8.1f} -> {r['held']:>6.1f} {b['best']:>7.2f} -> {r['best']:>6.2f}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="node construction allocation benchmark")
+    parser.add_argument("--dataset-dir", default="tests/datasets")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--intern-shapes", action="store_true")
+    parser.add_argument(
+        "--baseline",
+        metavar="REF",
+        help="git ref to compare against, e.g. the parent of the copy-on-write commit",
+    )
+    parser.add_argument(
+        "--ref", help="with --baseline, measure this git ref instead of the working tree"
+    )
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.json:
+        print(json.dumps(_measure(args.dataset_dir, args.repeat, args.intern_shapes)))
+        return 0
+    if args.baseline is None:
+        _print(_measure(args.dataset_dir, args.repeat, args.intern_shapes), None)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _export(args.baseline, os.path.join(tmpdir, "baseline"))
+        baseline = _measure_in_process(os.path.join(tmpdir, "baseline"), args)
+        package_root = REPO_ROOT
+        if args.ref is not None:
+            package_root = os.path.join(tmpdir, "ref")
+            _export(args.ref, package_root)
+        results = _measure_in_process(package_root, args)
+    _print(results, baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
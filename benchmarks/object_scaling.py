@@ -0,0 +1,78 @@
+"""Scaling benchmark for object property bucketing.
+
+Generates wide sparse records (every record carries only a ``--density``
+share of all known keys) and measures ``Converter.run()`` while growing either
+the number of distinct keys or the number of records. With single-pass
+bucketing the time per present ``key * record`` cell should stay flat.
+
+Usage::
+
+    python -m benchmarks.object_scaling
+    python -m benchmarks.object_scaling --widths 50 100 200 400 --items 1000
+"""
+
+import argparse
+import time
+
+from genschema import Converter
+from genschema.comparators import DeleteElement, RequiredComparator
+
+
+def _make_records(width: int, items: int, density: float) -> list[dict]:
+    per_record = max(1, int(width * density))
+    return [
+        {f"field_{(i * per_record + t) % width}": (i + t) % 7 for t in range(per_record)}
+        for i in range(items)
+    ]
+
+
+def _measure(width: int, items: int, density: float, repeat: int) -> tuple[int, float]:
+    records = _make_records(width, items, density)
+    cells = sum(len(record) for record in records)
+    best = float("inf")
+    for _ in range(repeat):
+        conv = Converter()
+        conv.add_json(records)
+        conv.register(RequiredComparator())
+        conv.register(DeleteElement())
+        start = time.perf_counter()
+        conv.run()
+        best = min(best, time.perf_counter() - start)
+    return cells, best
+
+
+def _report(title: str, rows: list[tuple[int, int, int, float]]) -> None:
+    print(title)
+    print(f"{'width':>8} {'items':>8} {'cells':>10} {'seconds':>10} {'us/cell':>10}")
+    for width, items, cells, elapsed in rows:
+        per_cell = elapsed / cells * 1e6
+        print(f"{width:>8} {items:>8} {cells:>10} {elapsed:>10.4f} {per_cell:>10.3f}")
+    print()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Object bucketing scaling benchmark")
+    parser.add_argument("--widths", type=int, nargs="+", default=[100, 200, 400, 800, 1600])
+    parser.add_argument("--items", type=int, nargs="+", default=[500, 1000, 2000, 4000, 8000])
+    parser.add_argument("--base-width", type=int, default=400)
+    parser.add_argument("--base-items", type=int, default=2000)
+    parser.add_argument("--density", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = [
+        (w, args.base_items, *_measure(w, args.base_items, args.density, args.repeat))
+        for w in args.widths
+    ]
+    _report("Scaling by record width:", rows)
+
+    rows = [
+        (args.base_width, n, *_measure(args.base_width, n, args.density, args.repeat))
+        for n in args.items
+    ]
+    _report("Scaling by record count:", rows)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+"""Speedup curve of ``Converter.run(workers=N)`` against the serial run.
+
+Generates a set of independent API-like responses, then times the serial
+``run()`` and ``run(workers=N)`` for every requested worker count. The
+parallel schema is checked to be identical to the serial one.
+
+Usage::
+
+    python -m benchmarks.parallel_run
+    python -m benchmarks.parallel_run --documents 20000 --workers 1 2 4 8 16 32
+"""
+
+import argparse
+import os
+import random
+import time
+
+from genschema import Converter, PseudoArrayHandler
+from genschema.comparators import (
+    DeleteElement,
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+)
+
+
+def _make_document(rnd: random.Random) -> dict:
+    return {
+        "id": rnd.randint(1, 10**9),
+        "kind": rnd.choice(["order", "refund", "invoice"]),
+        "email": f"user{rnd.randint(1, 10**6)}@example.com",
+        "created": f"2024-0{rnd.randint(1, 9)}-1{rnd.randint(0, 9)}T10:00:00Z",
+        "lines": [
+            {
+                "sku": f"SKU-{rnd.randint(1, 10**5)}",
+                "qty": rnd.randint(1, 5),
+                "price": round(rnd.random() * 100, 2),
+                "tags": [rnd.choice(["a", "b", "c"]) for _ in range(rnd.randint(0, 3))],
+            }
+            for _ in range(rnd.randint(1, 8))
+        ],
+        "attrs": {str(i): rnd.choice([1, "x", None]) for i in range(rnd.randint(0, 5))},
+    }
+
+
+def _make_converter(documents: list[dict]) -> Converter:
+    conv = Converter(pseudo_handler=PseudoArrayHandler())
+    for doc in documents:
+        conv.add_json(doc)
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(RequiredComparator())
+    conv.register(EmptyComparator())
+    conv.register(DeleteElement())
+    conv.register(DeleteElement("isPseudoArray"))
+    return conv
+
+
+def _timed(documents: list[dict], workers: int | None) -> tuple[dict, float]:
+    conv = _make_converter(documents)
+    start = time.perf_counter()
+    schema = conv.run(workers=workers)
+    return schema, time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Process-pool run() benchmark")
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    documents = [_make_document(rnd) for _ in range(args.documents)]
+
+    serial_schema, serial = _timed(documents, None)
+    print(f"cpu count: {os.cpu_count()}, documents: {args.documents}")
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>10}")
+    print(f"{'serial':>8} {serial:>10.4f} {1.0:>10.2f}")
+    for workers in args.workers:
+        schema, elapsed = _timed(documents, workers)
+        assert schema == serial_schema
+        print(f"{workers:>8} {elapsed:>10.4f} {serial / elapsed:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,84 @@
+"""Benchmark for parallel processing of sibling property subtrees.
+
+Builds one top-level object with a few huge array-valued properties (the
+shape of ``latestblock.json``'s transaction lists) and times ``run()`` with
+``parallel_subtrees`` disabled, on a thread pool and on a process pool.
+
+Usage::
+
+    python -m benchmarks.parallel_subtrees
+    python -m benchmarks.parallel_subtrees --properties 8 --items 50000 --workers 8
+"""
+
+import argparse
+import os
+import random
+import time
+from typing import Optional
+
+from genschema import Converter, PseudoArrayHandler
+from genschema.comparators import (
+    DeleteElement,
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+)
+
+
+def _make_document(properties: int, items: int, rnd: random.Random) -> dict:
+    return {
+        f"list_{p}": [
+            {
+                "hash": f"{rnd.getrandbits(64):016x}",
+                "size": rnd.randint(100, 10_000),
+                "time": f"2024-01-0{rnd.randint(1, 9)}T00:00:00Z",
+                "inputs": [{"value": rnd.randint(0, 10**8)} for _ in range(rnd.randint(1, 3))],
+            }
+            for _ in range(items)
+        ]
+        for p in range(properties)
+    }
+
+
+def _timed(document: dict, mode: Optional[str], workers: Optional[int]) -> tuple[dict, float]:
+    conv = Converter(
+        pseudo_handler=PseudoArrayHandler(),
+        parallel_subtrees=mode,  # type: ignore[arg-type]
+        subtree_workers=workers,
+    )
+    conv.add_json(document)
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(RequiredComparator())
+    conv.register(EmptyComparator())
+    conv.register(DeleteElement())
+    conv.register(DeleteElement("isPseudoArray"))
+    start = time.perf_counter()
+    schema = conv.run()
+    return schema, time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Parallel sibling subtree benchmark")
+    parser.add_argument("--properties", type=int, default=4)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    document = _make_document(args.properties, args.items, random.Random(args.seed))
+
+    serial_schema, serial = _timed(document, None, None)
+    print(f"cpu count: {os.cpu_count()}, properties: {args.properties}, items: {args.items}")
+    print(f"{'mode':>8} {'seconds':>10} {'speedup':>10}")
+    print(f"{'serial':>8} {serial:>10.4f} {1.0:>10.2f}")
+    for mode in ("thread", "process"):
+        schema, elapsed = _timed(document, mode, args.workers)
+        assert schema == serial_schema
+        print(f"{mode:>8} {elapsed:>10.4f} {serial / elapsed:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
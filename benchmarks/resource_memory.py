@@ -0,0 +1,82 @@
+"""Peak memory benchmark for ``Converter.run()`` on the bundled datasets.
+
+Measures the peak traced allocation (``tracemalloc``) and wall time of a
+schema generation run for every file in ``tests/datasets``. Inputs are loaded
+before tracing starts, so only the memory allocated by the pipeline itself
+is reported.
+
+Usage::
+
+    python -m benchmarks.resource_memory
+    python -m benchmarks.resource_memory --keep-triggers
+    python -m benchmarks.resource_memory --array-size 1000000
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+import tracemalloc
+
+from genschema import Converter, PseudoArrayHandler
+from genschema.comparators import (
+    DeleteElement,
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+)
+
+
+def _run(data: object, keep_triggers: bool) -> None:
+    conv = Converter(pseudo_handler=PseudoArrayHandler(), base_of="anyOf")
+    conv.add_json(data)
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(RequiredComparator())
+    conv.register(EmptyComparator())
+    if not keep_triggers:
+        conv.register(DeleteElement())
+    conv.register(DeleteElement("isPseudoArray"))
+    conv.run()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="tracemalloc benchmark on datasets")
+    parser.add_argument("--dataset-dir", default="tests/datasets")
+    parser.add_argument(
+        "--keep-triggers",
+        action="store_true",
+        help="Do not register DeleteElement, so j2sElementTrigger ids end up in the output.",
+    )
+    parser.add_argument(
+        "--array-size",
+        type=int,
+        default=0,
+        help="Also measure a synthetic top-level array of this many scalar elements.",
+    )
+    args = parser.parse_args()
+
+    cases: list[tuple[str, object]] = []
+    for file_path in sorted(glob.glob(os.path.join(args.dataset_dir, "*.json"))):
+        with open(file_path, "r", encoding="utf-8") as f:
+            cases.append((os.path.basename(file_path), json.load(f)))
+    if args.array_size:
+        cases.append((f"array[{args.array_size}]", list(range(args.array_size))))
+
+    print(f"{'dataset':<24} {'peak KiB':>10} {'seconds':>10}")
+    for name, data in cases:
+        tracemalloc.start()
+        start = time.perf_counter()
+        _run(data, args.keep_triggers)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{name:<24} {peak / 1024:>10.1f} {elapsed:>10.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
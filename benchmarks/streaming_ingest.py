@@ -0,0 +1,108 @@
+"""Memory benchmark for ``Converter.add_json_stream()`` on large top-level arrays.
+
+Writes synthetic order exports (one top-level array of documents) of growing
+size to a temporary directory and builds an incremental schema from each file,
+once with ``add_json`` (the whole file is loaded) and once with
+``add_json_stream``. Every measurement runs in a fresh process and reports
+the peak traced allocation (``tracemalloc``), the peak RSS of the process
+and the wall time. Both modes must produce the same schema.
+
+Usage::
+
+    python -m benchmarks.streaming_ingest
+    python -m benchmarks.streaming_ingest --sizes 10000 100000 1000000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from genschema import Converter, PseudoArrayHandler
+from genschema.comparators import (
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+)
+
+STATUSES = ["new", "paid", "shipped", "cancelled"]
+
+
+def _make_document(rnd: random.Random) -> dict:
+    return {
+        "id": rnd.randint(1, 10**9),
+        "status": rnd.choice(STATUSES),
+        "email": f"user{rnd.randint(1, 10**6)}@example.com",
+        "created": f"2024-0{rnd.randint(1, 9)}-1{rnd.randint(0, 9)}",
+        "items": [
+            {"sku": f"SKU-{rnd.randint(1, 10**5)}", "qty": rnd.randint(1, 5)}
+            for _ in range(rnd.randint(0, 4))
+        ],
+    }
+
+
+def _write_export(path: str, size: int) -> None:
+    rnd = random.Random(size)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for index in range(size):
+            if index:
+                f.write(",\n")
+            json.dump(_make_document(rnd), f)
+        f.write("]")
+
+
+def _measure(path: str, stream: bool) -> tuple[dict, float, float, float]:
+    conv = Converter(pseudo_handler=PseudoArrayHandler(), incremental=True, strip_metadata=True)
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(RequiredComparator())
+    conv.register(EmptyComparator())
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    if stream:
+        conv.add_json_stream(path)
+    else:
+        conv.add_json(path)
+    schema = conv.schema()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return schema, peak / 1024 / 1024, rss_kib / 1024, elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="streaming ingestion memory benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    args = parser.parse_args()
+
+    # A fresh process per measurement: ru_maxrss is a lifetime maximum
+    spawn = multiprocessing.get_context("spawn")
+    print(f"{'elements':>10} {'file MiB':>9} {'mode':<7} {'peak MiB':>9} {'RSS MiB':>9} {'sec':>7}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in args.sizes:
+            path = os.path.join(tmpdir, f"export-{size}.json")
+            _write_export(path, size)
+            file_mib = os.path.getsize(path) / 1024 / 1024
+            schemas = []
+            for mode, stream in (("load", False), ("stream", True)):
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                    schema, peak, rss, elapsed = pool.submit(_measure, path, stream).result()
+                schemas.append(schema)
+                row = f"{size:>10} {file_mib:>9.1f} {mode:<7} {peak:>9.1f} {rss:>9.1f}"
+                print(f"{row} {elapsed:>7.2f}")
+            assert schemas[0] == schemas[1], f"{size}: streamed schema differs"
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,21 @@
-from .pipeline import Converter
-from .pseudo_arrays import PseudoArrayHandler, PseudoArrayHandlerBase
+from .budget import RunBudget
+from .json_backend import JsonBackend, get_json_backend
+from .pipeline import Converter, merge_states
+from .pseudo_arrays import PseudoArrayDecision, PseudoArrayHandler, PseudoArrayHandlerBase
+from .sampling import SamplingPolicy
+from .tracing import ChromeTrace, TraceEvent
 
-__all__ = ["Converter", "PseudoArrayHandler", "PseudoArrayHandlerBase"]
+__all__ = [
+    "ChromeTrace",
+    "Converter",
+    "JsonBackend",
+    "PseudoArrayDecision",
+    "PseudoArrayHandler",
+    "PseudoArrayHandlerBase",
+    "RunBudget",
+    "SamplingPolicy",
+    "TraceEvent",
+    "get_json_backend",
+    "merge_states",
+]
 __version__ = "0.2.0"
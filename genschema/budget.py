@@ -0,0 +1,84 @@
+"""
+Ограничения ресурсов одного построения схемы.
+
+:class:`RunBudget` задаёт пределы для ``Converter.run(budget=...)``: глубину
+вложенности уровней, число обработанных уровней, ширину объединения
+(``anyOf``/``oneOf``/``allOf``) и время работы. Уровень, на котором предел
+достигнут, не строится: на его месте выдаётся разрешающая подсхема ``{}``,
+а путь уровня и причина попадают в ``Converter.truncated_paths()``.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+PERMISSIVE_SCHEMA: dict = {}
+"""Подсхема на месте отсечённого уровня: допускает любое значение."""
+
+
+@dataclass
+class RunBudget:
+    """
+    Пределы ресурсов для ``Converter.run(budget=...)``. ``None`` — без предела.
+
+    Пределы проверяются перед построением каждого уровня, поэтому один
+    огромный уровень не прерывается, а отсечение всегда даёт корректную схему.
+    """
+
+    max_depth: Optional[int] = None
+    """Наибольшая глубина уровня: свойства, элементы и альтернативы объединений."""
+
+    max_nodes: Optional[int] = None
+    """Сколько уровней можно построить за запуск."""
+
+    max_union_width: Optional[int] = None
+    """Наибольшее число альтернатив объединения в одном узле."""
+
+    deadline: Optional[float] = None
+    """Время на построение в секундах от начала ``run()``."""
+
+    def __post_init__(self) -> None:
+        for name in ("max_depth", "max_nodes", "max_union_width", "deadline"):
+            value = getattr(self, name)
+            if value is not None and value < 0:
+                raise ValueError(f"Budget limit {name} must be non-negative, got {value!r}")
+
+
+class BudgetState:
+    """Расход бюджета в одном запуске и отсечённые пути ``путь -> причина``."""
+
+    __slots__ = ("budget", "nodes", "expires", "truncated")
+
+    def __init__(self, budget: RunBudget):
+        self.budget = budget
+        self.nodes = 0
+        self.expires = None if budget.deadline is None else time.monotonic() + budget.deadline
+        self.truncated: dict[str, str] = {}
+
+    def enter(self, env: str, depth: int) -> bool:
+        """
+        Учитывает уровень ``env`` на глубине ``depth``.
+
+        Возвращает ``False`` и запоминает причину, если уровень нужно отсечь.
+        """
+        budget = self.budget
+        reason = None
+        if budget.max_depth is not None and depth > budget.max_depth:
+            reason = "max_depth"
+        elif budget.max_nodes is not None and self.nodes >= budget.max_nodes:
+            reason = "max_nodes"
+        elif self.expires is not None and time.monotonic() >= self.expires:
+            reason = "deadline"
+        if reason is not None:
+            self.truncated[env] = reason
+            return False
+        self.nodes += 1
+        return True
+
+    def allows_union(self, env: str, width: int) -> bool:
+        """Проверяет ширину объединения узла ``env``; при превышении запоминает путь."""
+        limit = self.budget.max_union_width
+        if limit is not None and width > limit:
+            self.truncated[env] = "max_union_width"
+            return False
+        return True
@@ -2,22 +2,28 @@ import argparse
 import json
 import sys
 import time
+from itertools import chain
+from typing import Iterable
 
 from rich.console import Console
+from rich.table import Table
 
-from . import Converter, PseudoArrayHandler
+from . import ChromeTrace, Converter, PseudoArrayHandler
 from .comparators import (
-    DeleteElement,
     EmptyComparator,
     EnumComparator,
     FormatComparator,
     RequiredComparator,
     SchemaVersionComparator,
 )
+from .discovery import iter_json_files
+from .json_backend import JSON_BACKENDS, JsonBackend, get_json_backend
 from .postprocessing import (
     SchemaReferenceExtractionConfig,
     SchemaReferencePostprocessor,
 )
+from .profiling import profile_rows
+from .streaming import JSON_LINES_SUFFIXES
 
 console = Console()
 
@@ -34,6 +40,12 @@ Examples:
   cat input.json | genschema -
   genschema --base-of anyOf < input.json
   genschema dir/file1.json dir/file2.json -o schema.json
+  genschema responses/*.json --jobs 8 -o schema.json
+  genschema crawl/*.json --jobs 8 --keep-going -o schema.json
+  genschema --input-dir crawl --pattern '**/*.json' --per-dir 100 --jobs 8
+  genschema export.json --stream -o schema.json
+  genschema events.jsonl --skip-invalid-lines -o schema.json
+  jq -c '.items[]' export.json | genschema - --jsonl
         """,
     )
     parser.add_argument(
@@ -42,6 +54,25 @@ Examples:
         help="Paths to input JSON files. Use '-' for stdin. "
         "If no arguments are provided, show this help message.",
     )
+    parser.add_argument(
+        "--input-dir",
+        metavar="DIR",
+        help="Also read the files under DIR that match --pattern. The tree is walked lazily "
+        "and files are read as they are found.",
+    )
+    parser.add_argument(
+        "--pattern",
+        default="**/*.json",
+        help="Glob for --input-dir, relative to DIR, with glob rules: '*', '?' and '[...]' "
+        "match within one name and skip dotfiles, '**' spans directories "
+        "(default: **/*.json).",
+    )
+    parser.add_argument(
+        "--per-dir",
+        type=int,
+        metavar="N",
+        help="With --input-dir, read at most N randomly sampled matching files per directory.",
+    )
     parser.add_argument(
         "-o",
         "--output",
@@ -66,7 +97,58 @@ Examples:
         help="Disable SchemaVersionComparator.",
     )
     parser.add_argument(
-        "--no-delete-element", action="store_true", help="Disable DeleteElement comparators."
+        "--no-delete-element",
+        action="store_true",
+        help="Keep internal j2sElementTrigger and isPseudoArray metadata in the output.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes that parse and summarize input files (default: 1).",
+    )
+    parser.add_argument(
+        "-k",
+        "--keep-going",
+        action="store_true",
+        help="Skip input files that cannot be read or parsed and report them, "
+        "instead of failing.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read each input as a top-level JSON array element by element, "
+        "so memory does not grow with the input size.",
+    )
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Treat every input as JSON Lines (one JSON instance per line). "
+        "Files ending in .jsonl or .ndjson are detected automatically.",
+    )
+    parser.add_argument(
+        "--skip-invalid-lines",
+        action="store_true",
+        help="Skip and count malformed JSON Lines instead of failing.",
+    )
+    parser.add_argument(
+        "--json-backend",
+        choices=JSON_BACKENDS,
+        default="auto",
+        help="Library used to read inputs and write the schema: the fastest installed "
+        "one (auto), or json, orjson, ujson, simdjson (default: auto).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-comparator and per-stage call counts and timings after generation.",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="Write pipeline events in Chrome trace-event format to PATH "
+        "(open with chrome://tracing, Perfetto or speedscope).",
     )
     parser.add_argument(
         "--extract-refs",
@@ -99,40 +181,49 @@ Examples:
     return parser
 
 
-def main(argv: list[str] | None = None) -> None:
-    parser = _build_parser()
-    raw_args = sys.argv[1:] if argv is None else argv
-
-    # If no arguments, show help and exit
-    if not raw_args:
-        parser.print_help(sys.stderr)
-        sys.exit(1)
+def _print_profile(stats: dict) -> None:
+    table = Table(title="Profile")
+    table.add_column("Kind")
+    table.add_column("Name")
+    table.add_column("Calls", justify="right")
+    table.add_column("Applied", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Resources", justify="right")
+    for kind, name, calls, applied, seconds, resources in profile_rows(stats):
+        table.add_row(
+            kind,
+            name,
+            str(calls),
+            "" if applied is None else str(applied),
+            f"{seconds:.4f}",
+            str(resources),
+        )
+    console.print(table)
 
-    args = parser.parse_args(raw_args)
 
-    # Collect input data
+def _load_inputs(inputs: list[str], backend: JsonBackend) -> list:
     datas = []
-    if not args.inputs:
-        # This case shouldn't happen due to the check above, but for safety
+    if not inputs:
+        # main() shows help when there are no arguments, but for safety
         try:
-            data = json.load(sys.stdin)
+            data = backend.loads(sys.stdin.read())
             datas.append(data)
         except json.JSONDecodeError as e:
             console.print(f"[red]Error reading JSON from stdin: {e}[/red]")
             sys.exit(1)
     else:
-        for input_path in args.inputs:
+        for input_path in inputs:
             if input_path == "-":
                 try:
-                    data = json.load(sys.stdin)
+                    data = backend.loads(sys.stdin.read())
                     datas.append(data)
                 except json.JSONDecodeError as e:
                     console.print(f"[red]Error reading JSON from stdin: {e}[/red]")
                     sys.exit(1)
             else:
                 try:
-                    with open(input_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
+                    with open(input_path, "rb") as f:
+                        data = backend.loads(f.read())
                     datas.append(data)
                 except FileNotFoundError:
                     console.print(f"[red]File not found: {input_path}[/red]")
@@ -144,13 +235,127 @@ def main(argv: list[str] | None = None) -> None:
     if not datas:
         console.print("[red]No valid JSON provided.[/red]")
         sys.exit(1)
+    return datas
+
+
+def _is_json_lines(input_path: str, args: argparse.Namespace) -> bool:
+    return args.jsonl or input_path.lower().endswith(JSON_LINES_SUFFIXES)
+
+
+def _stream_inputs(
+    conv: Converter, inputs: list[str], args: argparse.Namespace, backend: JsonBackend
+) -> tuple[int, int]:
+    """Feed inputs to an incremental converter; return (instances, skipped lines)."""
+    instances = skipped = 0
+    for input_path in inputs:
+        source = sys.stdin if input_path == "-" else input_path
+        name = "stdin" if input_path == "-" else f"file {input_path}"
+        try:
+            if _is_json_lines(input_path, args):
+                # Binary stdin lets undecodable lines be skipped like malformed ones
+                lines = sys.stdin.buffer if input_path == "-" else input_path
+                counts = conv.add_jsonl(lines, skip_invalid=args.skip_invalid_lines)
+                instances += counts["instances"]
+                skipped += counts["skipped"]
+            elif args.stream:
+                conv.add_json_stream(source)
+                instances += 1
+            else:
+                for data in _load_inputs([input_path], backend):
+                    conv.add_json(data)
+                    instances += 1
+        except FileNotFoundError:
+            console.print(f"[red]File not found: {input_path}[/red]")
+            sys.exit(1)
+        except ValueError as e:
+            kind = "JSON Lines" if _is_json_lines(input_path, args) else "JSON array"
+            console.print(f"[red]Invalid {kind} in {name}: {e}[/red]")
+            sys.exit(1)
+    return instances, skipped
+
+
+def _add_files(
+    conv: Converter, inputs: list[str], args: argparse.Namespace, parallel: bool
+) -> tuple[int, int]:
+    """Add input files, reporting every failed file at once; return (instances, skipped lines)."""
+    errors: dict[str, str] = {}
+
+    def skip_directory(path: str, error: OSError) -> None:
+        errors[path] = str(error)
+
+    paths: Iterable[str] = inputs
+    if args.input_dir:
+        discovered = iter_json_files(
+            args.input_dir, args.pattern, args.per_dir, on_error=skip_directory
+        )
+        paths = chain(inputs, discovered)
+    try:
+        report = conv.add_json_files(
+            paths,
+            workers=args.jobs if parallel else None,
+            jsonl=args.jsonl or None,
+            skip_invalid_lines=args.skip_invalid_lines,
+        )
+    except OSError as e:
+        console.print(f"[red]Cannot read input directory {args.input_dir}: {e}[/red]")
+        sys.exit(1)
+    errors.update(report["errors"])
+
+    color = "yellow" if args.keep_going else "red"
+    for path, message in errors.items():
+        console.print(f"[{color}]Cannot read {path}: {message}[/{color}]")
+    if errors and not args.keep_going:
+        total = report["files"] + len(errors)
+        console.print(
+            f"[red]{len(errors)} of {total} inputs failed (use --keep-going to skip them).[/red]"
+        )
+        sys.exit(1)
+    return report["instances"], report["skipped_lines"]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = _build_parser()
+    raw_args = sys.argv[1:] if argv is None else argv
+
+    # If no arguments, show help and exit
+    if not raw_args:
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+
+    args = parser.parse_args(raw_args)
+
+    # Collect input data. Files are read once the converter is set up: Converter.add_json_files
+    # collects per-file errors and, with --jobs, parses and summarizes them in worker processes.
+    # JSON Lines and streamed arrays go straight into incremental summaries, so memory does
+    # not grow with the number of instances.
+    inputs = args.inputs or ([] if args.input_dir else ["-"])
+    from_files = not args.stream and "-" not in inputs
+    if args.input_dir and not from_files:
+        parser.error("--input-dir cannot be combined with stdin or --stream")
+    if args.per_dir is not None and args.per_dir < 0:
+        parser.error("--per-dir must be non-negative")
+    parallel = from_files and args.jobs > 1 and not args.no_delete_element
+    patterns = [*inputs, args.pattern] if args.input_dir else inputs
+    incremental = parallel or args.stream or any(_is_json_lines(p, args) for p in patterns)
+    try:
+        backend = get_json_backend(args.json_backend)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(1)
+    datas = [] if incremental or from_files else _load_inputs(args.inputs, backend)
 
     # Converter setup
     pseudo_handler = None if args.no_pseudo_array else PseudoArrayHandler()
-    conv = Converter(pseudo_handler=pseudo_handler, base_of=args.base_of)
-
-    for data in datas:
-        conv.add_json(data)
+    trace = ChromeTrace() if args.trace else None
+    conv = Converter(
+        pseudo_handler=pseudo_handler,
+        base_of=args.base_of,
+        profile=args.profile,
+        tracer=trace,
+        strip_metadata=not args.no_delete_element,
+        incremental=incremental,
+        json_backend=backend,
+    )
 
     # Register comparators conditionally
     if not args.no_format:
@@ -163,18 +368,36 @@ def main(argv: list[str] | None = None) -> None:
         conv.register(RequiredComparator())
     if not args.no_empty:
         conv.register(EmptyComparator())
-    if not args.no_delete_element:
-        conv.register(DeleteElement())
-        conv.register(DeleteElement("isPseudoArray"))
+
+    # Incremental summaries need the comparators registered before the data
+    if from_files or incremental:
+        if from_files:
+            instances, skipped = _add_files(conv, inputs, args, parallel)
+        else:
+            instances, skipped = _stream_inputs(conv, inputs, args, backend)
+        if not instances:
+            console.print("[red]No valid JSON provided.[/red]")
+            sys.exit(1)
+    else:
+        for data in datas:
+            conv.add_json(data)
+        instances, skipped = len(datas), 0
 
     # Generate schema
     start_time = time.time()
     try:
-        result = conv.run()
+        result = conv.run(workers=args.jobs)
     except Exception as e:
         console.print(f"[red]Error generating schema: {e}[/red]")
         sys.exit(1)
 
+    if trace is not None:
+        try:
+            trace.write(args.trace)
+        except Exception as e:
+            console.print(f"[red]Error writing trace {args.trace}: {e}[/red]")
+            sys.exit(1)
+
     if args.extract_refs:
         try:
             refs_config = SchemaReferenceExtractionConfig(
@@ -196,7 +419,7 @@ def main(argv: list[str] | None = None) -> None:
     if args.output:
         try:
             with open(args.output, "w", encoding="utf-8") as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+                f.write(backend.dumps(result, indent=2))
             console.print(f"[green]Schema successfully written to {args.output}[/green]")
         except Exception as e:
             console.print(f"[red]Error writing file {args.output}: {e}[/red]")
@@ -205,13 +428,18 @@ def main(argv: list[str] | None = None) -> None:
         console.print(result)
 
     # Execution info
-    instances_word = "instance" if len(datas) == 1 else "instances"
-    console.print(f"Generated from {len(datas)} JSON {instances_word}.")
+    instances_word = "instance" if instances == 1 else "instances"
+    console.print(f"Generated from {instances} JSON {instances_word}.")
+    if skipped:
+        lines_word = "line" if skipped == 1 else "lines"
+        console.print(f"[yellow]Skipped {skipped} malformed JSON {lines_word}.[/yellow]")
     if args.extract_refs:
         defs = result.get(args.refs_defs_key, {})
         defs_count = len(defs) if isinstance(defs, dict) else 0
         console.print(f"Extracted {defs_count} shared definitions into {args.refs_defs_key}.")
     console.print(f"Elapsed time: {elapsed} sec.")
+    if args.profile:
+        _print_profile(conv.stats())
 
 
 if __name__ == "__main__":
@@ -1,3 +1,5 @@
+from typing import Hashable
+
 from .template import Comparator, ComparatorResult, ProcessingContext, ToDelete
 
 
@@ -5,12 +7,16 @@ class DeleteElement(Comparator):
     """Визуально показывает где именно могут сработать компораторы"""
 
     name = "delete-element"
+    shape_invariant = True
     attribute = ""
 
     def __init__(self, attribute: str = "j2sElementTrigger"):
         super().__init__()
         self.attribute = attribute
 
+    def memo_inputs(self, env: str) -> Hashable:
+        return None
+
     def can_process(self, ctx: ProcessingContext, env: str, node: dict) -> bool:
         # Обрабатываем объекты и массивы
         return self.attribute in node
@@ -1,4 +1,7 @@
-from .template import Comparator, ComparatorResult, ProcessingContext, Resource
+from itertools import chain
+from typing import Any, Hashable
+
+from .template import Comparator, ComparatorResult, ProcessingContext, iter_contents
 
 
 class EmptyComparator(Comparator):
@@ -9,11 +12,16 @@ class EmptyComparator(Comparator):
     """
 
     name = "empty"
+    node_types = frozenset({"object", "array"})
+    shape_invariant = True
 
     def __init__(self, flag_empty: bool = True, flag_non_empty: bool = True):
         self.flag_empty = flag_empty
         self.flag_non_empty = flag_non_empty
 
+    def memo_inputs(self, env: str) -> Hashable:
+        return None
+
     def can_process(self, ctx: ProcessingContext, env: str, node: dict) -> bool:
         t = node.get("type")
         return t == "object" or t == "array"
@@ -21,15 +29,16 @@ class EmptyComparator(Comparator):
     def process(self, ctx: ProcessingContext, env: str, node: dict) -> ComparatorResult:
 
         # Проверяем есть ли непустые кандидаты на этом уровне
-        def is_nonempty(r: Resource) -> bool:
-            c = r.content
+        def is_nonempty(c: Any) -> bool:
             if isinstance(c, dict):
                 return bool(c)  # не пустой словарь
             if isinstance(c, list):
                 return bool(c)  # не пустой список
             return True  # скаляры считаем непустыми
 
-        candidates = [is_nonempty(r) for r in ctx.schemas + ctx.jsons]
+        candidates = [
+            is_nonempty(c) for c in chain(iter_contents(ctx.schemas), iter_contents(ctx.jsons))
+        ]
 
         if self.flag_empty and not any(candidates):
             t = node.get("type")
@@ -16,9 +16,9 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Hashable
 
-from .template import Comparator, ComparatorResult, ProcessingContext
+from .template import Comparator, ComparatorResult, ProcessingContext, iter_contents
 
 ENUM_REJECT_FLAG = "j2sEnumRejected"
 NUMERIC_LIKE_STRING_RE = re.compile(r"^[+-]?(?:\d+|\d+\.\d+|\d+\.|\.\d+)$")
@@ -36,6 +36,8 @@ class EnumComparator(Comparator):
     """
 
     name = "enum"
+    node_types = frozenset({"string"})
+    shape_invariant = True
 
     max_unique_values: int = 16
     """Maximum number of distinct values allowed for enum inference."""
@@ -57,6 +59,15 @@ class EnumComparator(Comparator):
     reject_flag: str = ENUM_REJECT_FLAG
     """Schema flag that persists enum rejection across repeated runs."""
 
+    @property
+    def distinct_values(self) -> int:
+        """One value past the limit is enough to tell that the field must be rejected."""
+        return self.max_unique_values + 1
+
+    def memo_inputs(self, env: str) -> Hashable:
+        """Only the exclusion of the innermost field name depends on the path."""
+        return self._extract_field_name(env) in self.excluded_field_names
+
     def _extract_field_name(self, env: str) -> str | None:
         """Extract the current property name from a pipeline path.
 
@@ -103,12 +114,7 @@ class EnumComparator(Comparator):
 
     def _collect_json_values(self, ctx: ProcessingContext) -> list[str]:
         """Collect candidate enum values from raw JSON resources."""
-        values: list[str] = []
-        for resource in ctx.jsons:
-            value = resource.content
-            if isinstance(value, str):
-                values.append(value)
-        return values
+        return [value for value in iter_contents(ctx.jsons) if isinstance(value, str)]
 
     def _has_blank_string_value(self, values: list[str]) -> bool:
         """Return ``True`` when string candidates contain blank values."""
@@ -1,3 +1,5 @@
+from typing import Hashable
+
 from .template import Comparator, ComparatorResult, ProcessingContext
 
 
@@ -5,6 +7,10 @@ class FlagMaker(Comparator):
     """Визуально показывает где именно могут сработать компораторы"""
 
     name = "flag"
+    shape_invariant = True
+
+    def memo_inputs(self, env: str) -> Hashable:
+        return None
 
     def can_process(self, ctx: ProcessingContext, env: str, node: dict) -> bool:
         # Обрабатываем объекты и массивы
@@ -1,9 +1,15 @@
 import re
-from collections import defaultdict
 from functools import lru_cache
-from typing import Any, Optional
+from typing import Any, Hashable, Optional
 
-from .template import Comparator, ComparatorResult, ProcessingContext
+from .template import (
+    Comparator,
+    ComparatorResult,
+    ContextPartition,
+    ElementTrigger,
+    ProcessingContext,
+    iter_contents,
+)
 
 
 class FormatDetector:
@@ -39,6 +45,11 @@ class FormatDetector:
 
 class FormatComparator(Comparator):
     name = "format"
+    node_types = frozenset({"string"})
+    shape_invariant = True
+
+    def memo_inputs(self, env: str) -> Hashable:
+        return None
 
     def can_process(self, ctx: ProcessingContext, env: str, prev_result: dict) -> bool:
         # Обрабатываем только если на текущем уровне уже есть type: "string"
@@ -46,38 +57,45 @@ class FormatComparator(Comparator):
 
     def process(self, ctx: ProcessingContext, env: str, prev_result: dict) -> ComparatorResult:
 
-        # Базовые триггеры из предыдущих компараторов (обычно из TypeComparator)
-        base_triggers = set(prev_result.get("j2sElementTrigger", []))
+        # Базовые триггеры из предыдущих компараторов (обычно из TypeComparator).
+        # Сторонние компараторы могут передавать обычный список строковых id.
+        base_triggers = prev_result.get("j2sElementTrigger", [])
+        if isinstance(base_triggers, ElementTrigger):
+            base = base_triggers.on(ctx)
+        else:
+            base = ElementTrigger.from_ids(ctx, base_triggers)
 
-        # Собираем все возможные форматы и их источники
-        format_to_ids: dict[str | None, set[str]] = defaultdict(set)
-        format_to_ids[None].update(base_triggers)
+        # Раскладываем позиции по форматам сразу в разбиение контекста на альтернативы;
+        # строки без формата (группа None) дополняют базовый набор
+        partition = ContextPartition(ctx)
+        groups = partition.groups
 
         # 1. Форматы, явно указанные в схемах
-        for s in ctx.schemas:
-            if isinstance(s.content, dict) and s.content.get("type") == "string":
-                fmt = s.content.get("format")
-                format_to_ids[fmt].add(s.id)
-                if fmt is not None:
-                    format_to_ids[None].discard(s.id)
+        for position, content in enumerate(iter_contents(ctx.schemas)):
+            if isinstance(content, dict) and content.get("type") == "string":
+                groups.setdefault(content.get("format"), []).append(position)
 
         # 2. Форматы, выведенные из значений JSON
-        for j in ctx.jsons:
-            if isinstance(j.content, str):
-                fmt = FormatDetector.detect(j.content)
-                format_to_ids[fmt].add(j.id)
-                if fmt is not None:
-                    format_to_ids[None].discard(j.id)
-
-        # Формируем варианты
+        for position, content in enumerate(iter_contents(ctx.jsons), len(ctx.schemas)):
+            if isinstance(content, str):
+                groups.setdefault(FormatDetector.detect(content), []).append(position)
+
+        # Варианты с форматом и вариант без формата: базовый набор за вычетом
+        # всех элементов, у которых формат нашёлся (битовые операции над триггерами)
+        formatted = {fmt: partition.trigger(fmt) for fmt in groups if fmt is not None}
+        unformatted = partition.trigger(None, base.extra_ids) if None in groups else None
+        rest = base if unformatted is None else base | unformatted
+        for trigger in formatted.values():
+            rest = rest - trigger
+        if unformatted is not None and rest.bits == unformatted.bits:
+            # Обычный случай: готовый подконтекст группы без формата
+            rest = unformatted
+
         variants: list[dict] = []
-        for fmt, ids in format_to_ids.items():
-            if not ids:
-                continue
-            variant = {"type": "string", "j2sElementTrigger": sorted(ids)}
-            if fmt is not None:
-                variant["format"] = fmt
-            variants.append(variant)
+        if rest:
+            variants.append({"type": "string", "j2sElementTrigger": rest})
+        for fmt, trigger in formatted.items():
+            variants.append({"type": "string", "j2sElementTrigger": trigger, "format": fmt})
 
         # Результат
         if len(variants) == 1:
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Hashable
 
 from .template import Comparator, ComparatorResult, ProcessingContext, ToDelete
 
@@ -13,6 +13,11 @@ class NoAdditionalProperties(Comparator):
     """
 
     name = "no_additional_properties"
+    node_types = frozenset({"object"})
+    shape_invariant = True
+
+    def memo_inputs(self, env: str) -> Hashable:
+        return None
 
     def can_process(self, ctx: ProcessingContext, env: str, node: dict) -> bool:
         # Обрабатываем только те узлы, где уже определён тип object
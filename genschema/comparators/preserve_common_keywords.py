@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import copy
 from dataclasses import dataclass, field
+from typing import Hashable
 
 from .template import Comparator, ComparatorResult, ProcessingContext
 
@@ -51,9 +52,13 @@ class PreserveCommonKeywordsComparator(Comparator):
     """
 
     name = "preserve-common-keywords"
+    shape_invariant = True
 
     excluded_keywords: set[str] = field(default_factory=lambda: set(DEFAULT_MERGE_OWNED_KEYWORDS))
 
+    def memo_inputs(self, env: str) -> Hashable:
+        return None
+
     def can_process(self, ctx: ProcessingContext, env: str, node: dict) -> bool:
         return any(isinstance(schema.content, dict) for schema in ctx.schemas)
 
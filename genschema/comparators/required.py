@@ -1,6 +1,7 @@
 import logging
+from typing import Hashable
 
-from .template import Comparator, ComparatorResult, ProcessingContext
+from .template import Comparator, ComparatorResult, ProcessingContext, iter_contents
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +12,13 @@ class RequiredComparator(Comparator):
     Устанавливает "required" на основе наличия ключей в JSON на текущем уровне.
     """
 
+    name = "required"
+    node_types = frozenset({"object"})
+    shape_invariant = True
+
+    def memo_inputs(self, env: str) -> Hashable:
+        return None
+
     def can_process(self, ctx: ProcessingContext, env: str, node: dict) -> bool:
         # обрабатываем только объекты
         return node.get("type") == "object" and not node.get("isPseudoArray", False)
@@ -20,11 +28,11 @@ class RequiredComparator(Comparator):
 
         # Если есть хотя бы один JSON, который не является объектом,
         # мы не можем корректно определить обязательные ключи.
-        if ctx.jsons and any(not isinstance(j.content, dict) for j in ctx.jsons):
+        if ctx.jsons and any(not isinstance(c, dict) for c in iter_contents(ctx.jsons)):
             return None, None
 
         # ---------- из json ----------
-        objects = [j.content for j in ctx.jsons if isinstance(j.content, dict)]
+        objects = [c for c in iter_contents(ctx.jsons) if isinstance(c, dict)]
         if objects:
             keys: set[str] = set()
             for obj in objects:
@@ -1,3 +1,5 @@
+from typing import Hashable
+
 from .template import Comparator, ComparatorResult, ProcessingContext
 
 
@@ -7,10 +9,15 @@ class SchemaVersionComparator(Comparator):
     """
 
     name = "schema_version"
+    root_only = True
+    shape_invariant = True
 
     def __init__(self, version: str = "https://json-schema.org/draft/2020-12/schema"):
         self._version = version
 
+    def memo_inputs(self, env: str) -> Hashable:
+        return env == "/"
+
     def can_process(self, ctx: ProcessingContext, env: str, prev_result: dict) -> bool:
         return env == "/" and "$schema" not in prev_result
 
@@ -1,5 +1,7 @@
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
-from typing import Any, Optional
+from itertools import chain, compress
+from typing import Any, Hashable, Iterable, Iterator, Optional, Sequence
 
 
 @dataclass
@@ -8,26 +10,487 @@ class ToDelete:
     comparator_trigger: Optional["Comparator"] = None
 
 
-@dataclass
 class Resource:
-    id: str
-    type: str
-    content: Any
+    """
+    Источник данных (JSON или схема) на текущем уровне обработки.
+
+    Корневые ресурсы получают идентификатор при добавлении в ``Converter``,
+    дочерние хранят только ссылку на родителя и свой сегмент пути.
+    Строковый ``id`` вида ``"0/items/3"`` собирается по цепочке родителей
+    лишь при первом обращении, поэтому обход не тратит время и память
+    на форматирование путей, которые никто не читает.
+    """
+
+    __slots__ = ("type", "content", "parent", "key", "_id")
+
+    def __init__(
+        self,
+        id: str | int | None,
+        type: str,
+        content: Any,
+        parent: Optional["Resource"] = None,
+        key: str | int | None = None,
+    ):
+        self.type = type
+        self.content = content
+        self.parent = parent
+        self.key = id if parent is None else key
+        self._id: Optional[str] = id if isinstance(id, str) else None
+
+    @classmethod
+    def child(cls, parent: "Resource", key: str | int, content: Any) -> "Resource":
+        """Создаёт дочерний ресурс того же типа с сегментом пути ``key``."""
+        return cls(None, parent.type, content, parent, key)
+
+    @property
+    def id(self) -> str:
+        if self._id is None:
+            keys = []
+            node: Optional[Resource] = self
+            while node is not None and node._id is None:
+                keys.append(str(node.key))
+                node = node.parent
+            if node is not None:
+                keys.append(node._id)  # type: ignore[arg-type]
+            keys.reverse()
+            self._id = "/".join(keys)
+        return self._id
+
+    @id.setter
+    def id(self, value: str) -> None:
+        # Уже собранные id потомков не пересчитываются
+        self._id = value
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        assert isinstance(other, Resource)
+        return (self.id, self.type, self.content) == (other.id, other.type, other.content)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __reduce__(self) -> tuple:
+        # При передаче в другой процесс цепочка родителей заменяется готовым id:
+        # иначе вместе с ресурсом сериализовались бы родительские документы целиком.
+        return (Resource, (self.id, self.type, self.content))
+
+    def __repr__(self) -> str:
+        return f"Resource(id={self.id!r}, type={self.type!r}, content={self.content!r})"
+
+
+class ItemView(Sequence[Resource]):
+    """
+    Ленивое представление элементов массивов и псевдомассивов как ресурсов.
+
+    Хранит только ссылки на родительские ресурсы и их контейнеры (список или
+    словарь с упорядоченными ключами). ``Resource`` для элемента создаётся при
+    обращении к нему и нигде не кэшируется; компараторы, которым нужно только
+    содержимое, читают его через :func:`iter_contents` без создания записей.
+    Идентичность элемента внутри контекста задаётся его позицией.
+    """
+
+    __slots__ = ("_sources", "_starts", "_size", "_positions", "population")
+
+    def __init__(self) -> None:
+        self._sources: list[tuple[Resource, Any, Optional[list]]] = []
+        self._starts: list[int] = []
+        self._size = 0
+        self._positions: Optional[Sequence[int]] = None
+        self.population: Optional[int] = None
+        """Число элементов до выборки, если представление — выборка (``SamplingPolicy``)."""
+
+    def add(self, parent: Resource, container: Any, keys: Optional[list] = None) -> None:
+        """
+        Добавляет элементы ``container`` в представление.
+
+        Для списков ``keys`` не передаётся; для псевдомассивов ``keys`` задаёт
+        порядок ключей словаря. Сегментом пути элемента служит его порядковый номер.
+        """
+        size = len(container) if keys is None else len(keys)
+        if not size:
+            return
+        self._sources.append((parent, container, keys))
+        self._starts.append(self._size)
+        self._size += size
+
+    def subset(self, positions: Sequence[int]) -> "ItemView":
+        """Возвращает представление из элементов с позициями ``positions`` (по возрастанию)."""
+        view = ItemView()
+        view._sources = self._sources
+        view._starts = self._starts
+        view._size = self._size
+        if self._positions is None:
+            view._positions = positions
+        else:
+            base = self._positions
+            view._positions = [base[p] for p in positions]
+        return view
+
+    def _locate(self, position: int) -> tuple[Resource, int, Any]:
+        index = bisect_right(self._starts, position) - 1
+        parent, container, keys = self._sources[index]
+        local = position - self._starts[index]
+        value = container[local] if keys is None else container[keys[local]]
+        return parent, local, value
+
+    def contents(self) -> Iterator[Any]:
+        """Итерирует значения элементов, не создавая для них ``Resource``."""
+        if self._positions is not None:
+            for position in self._positions:
+                yield self._locate(position)[2]
+            return
+        for _, container, keys in self._sources:
+            if keys is None:
+                yield from container
+            else:
+                for key in keys:
+                    yield container[key]
+
+    def ids(self, positions: Iterable[int]) -> Iterator[str]:
+        """Итерирует строковые ``id`` элементов с индексами ``positions``, не создавая ресурсов."""
+        for index in positions:
+            position = index if self._positions is None else self._positions[index]
+            parent, local, _ = self._locate(position)
+            yield f"{parent.id}/{local}"
+
+    def __len__(self) -> int:
+        return self._size if self._positions is None else len(self._positions)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ItemView index out of range")
+        position = index if self._positions is None else self._positions[index]
+        parent, local, value = self._locate(position)
+        return Resource.child(parent, local, value)
+
+    def __iter__(self) -> Iterator[Resource]:
+        if self._positions is not None:
+            for position in self._positions:
+                parent, local, value = self._locate(position)
+                yield Resource.child(parent, local, value)
+            return
+        for parent, container, keys in self._sources:
+            if keys is None:
+                for i, value in enumerate(container):
+                    yield Resource.child(parent, i, value)
+            else:
+                for i, key in enumerate(keys):
+                    yield Resource.child(parent, i, container[key])
+
+    def __add__(self, other: Iterable[Resource]) -> list[Resource]:
+        return [*self, *other]
+
+    def __radd__(self, other: Iterable[Resource]) -> list[Resource]:
+        return [*other, *self]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, ItemView)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ItemView({list(self)!r})"
+
+
+def iter_contents(resources: Sequence[Resource]) -> Iterator[Any]:
+    """Итерирует содержимое ресурсов контекста, не материализуя элементы ``ItemView``."""
+    if isinstance(resources, ItemView):
+        return resources.contents()
+    return (r.content for r in resources)
 
 
 @dataclass
 class ProcessingContext:
-    schemas: list[Resource]
-    jsons: list[Resource]
+    schemas: Sequence[Resource]
+    jsons: Sequence[Resource]
     sealed: bool = False
 
 
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_FROM_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def positions_to_bits(positions: Iterable[int]) -> int:
+    """Битовая карта (``int``) набора позиций: бит ``p`` установлен для позиции ``p``."""
+    if isinstance(positions, range) and positions.step == 1:
+        return ((1 << len(positions)) - 1) << positions.start if positions else 0
+    if not isinstance(positions, (list, tuple)):
+        positions = list(positions)
+    if not positions:
+        return 0
+    # Байт на позицию, затем разбор строки двоичных цифр (линейный для основания 2)
+    flags = bytearray(max(positions) + 1)
+    for p in positions:
+        flags[p] = 1
+    return int(flags.translate(_TO_DIGITS)[::-1], 2)
+
+
+def bits_to_positions(bits: int) -> Sequence[int]:
+    """Отсортированные позиции установленных битов карты ``bits``."""
+    if not bits & (bits + 1):
+        # Сплошная карта 0..n-1 — самый частый случай (триггер на весь контекст)
+        return range(bits.bit_length())
+    flags = bin(bits)[:1:-1].encode().translate(_FROM_DIGITS)
+    return list(compress(range(len(flags)), flags))
+
+
+class ElementTrigger(Sequence[str]):
+    """
+    Набор элементов контекста, на которых сработал вариант компаратора
+    (``j2sElementTrigger``).
+
+    Элементы задаются позициями в контексте ``ctx``: сначала ``ctx.schemas``,
+    затем ``ctx.jsons``. Набор хранится битовой картой (``int``) над этими
+    позициями, поэтому пересечение, объединение и разность наборов — битовые
+    операции, а фильтрация контекста по альтернативе выбирает элементы
+    по позициям и не требует ни строковых id, ни материализации ``ItemView``.
+    Отсортированный список строковых ``id`` собирается только при чтении значения
+    (итерация, сравнение, попадание триггера в результат ``Converter.run()``).
+    Строковые id, которым нет соответствия в контексте, хранятся как есть.
+    """
+
+    __slots__ = ("_ctx", "_bits", "_positions", "_extra", "_rendered", "_subset")
+
+    def __init__(
+        self,
+        ctx: ProcessingContext,
+        positions: Iterable[int] = (),
+        extra_ids: Iterable[str] = (),
+    ):
+        self._ctx = ctx
+        self._bits = positions_to_bits(positions)
+        self._positions: Optional[list[int]] = None
+        self._extra = frozenset(extra_ids)
+        self._rendered: Optional[list[str]] = None
+        self._subset: Optional[ProcessingContext] = None
+
+    @classmethod
+    def from_bits(
+        cls, ctx: ProcessingContext, bits: int, extra_ids: Iterable[str] = ()
+    ) -> "ElementTrigger":
+        """Триггер по готовой битовой карте позиций ``ctx``."""
+        trigger = cls(ctx, (), extra_ids)
+        trigger._bits = bits
+        return trigger
+
+    @classmethod
+    def full(cls, ctx: ProcessingContext, extra_ids: Iterable[str] = ()) -> "ElementTrigger":
+        """Триггер, покрывающий все элементы контекста."""
+        return cls.from_bits(ctx, (1 << (len(ctx.schemas) + len(ctx.jsons))) - 1, extra_ids)
+
+    @classmethod
+    def from_ids(cls, ctx: ProcessingContext, ids: Iterable[str]) -> "ElementTrigger":
+        """Строит триггер по строковым id, сопоставляя их с элементами ``ctx``."""
+        wanted = set(ids)
+        matched = set()
+        positions = []
+        for position, resource in enumerate(chain(ctx.schemas, ctx.jsons)):
+            resource_id = resource.id
+            if resource_id in wanted:
+                positions.append(position)
+                matched.add(resource_id)
+        return cls(ctx, positions, wanted - matched)
+
+    @property
+    def ctx(self) -> ProcessingContext:
+        return self._ctx
+
+    @property
+    def bits(self) -> int:
+        """Битовая карта позиций набора."""
+        return self._bits
+
+    @property
+    def positions(self) -> Sequence[int]:
+        """Отсортированные позиции набора (строятся по битовой карте при первом обращении)."""
+        if self._positions is None:
+            self._positions = list(bits_to_positions(self._bits))
+        return self._positions
+
+    @property
+    def extra_ids(self) -> frozenset[str]:
+        return self._extra
+
+    def on(self, ctx: ProcessingContext) -> "ElementTrigger":
+        """Возвращает тот же набор, выраженный в позициях контекста ``ctx``."""
+        if ctx is self._ctx:
+            return self
+        return ElementTrigger.from_ids(ctx, self)
+
+    def __and__(self, other: "ElementTrigger") -> "ElementTrigger":
+        other = other.on(self._ctx)
+        return ElementTrigger.from_bits(
+            self._ctx, self._bits & other._bits, self._extra & other._extra
+        )
+
+    def __or__(self, other: "ElementTrigger") -> "ElementTrigger":
+        other = other.on(self._ctx)
+        return ElementTrigger.from_bits(
+            self._ctx, self._bits | other._bits, self._extra | other._extra
+        )
+
+    def __sub__(self, other: "ElementTrigger") -> "ElementTrigger":
+        other = other.on(self._ctx)
+        return ElementTrigger.from_bits(
+            self._ctx, self._bits & ~other._bits, self._extra - other._extra
+        )
+
+    def select(self, ctx: ProcessingContext) -> ProcessingContext:
+        """
+        Возвращает подконтекст ``ctx`` из элементов набора, сохраняя их порядок.
+
+        Подконтекст своего контекста запоминается; триггеры из
+        :class:`ContextPartition` получают его готовым.
+        """
+        if ctx is self._ctx and self._subset is not None:
+            return self._subset
+        trigger = self.on(ctx)
+        split = len(ctx.schemas)
+        subset = _subcontext(
+            ctx,
+            bits_to_positions(trigger._bits & ((1 << split) - 1)),
+            bits_to_positions(trigger._bits >> split),
+        )
+        if ctx is self._ctx:
+            self._subset = subset
+        return subset
+
+    def render(self) -> list[str]:
+        if self._rendered is None:
+            schemas, jsons = self._ctx.schemas, self._ctx.jsons
+            split = len(schemas)
+            ids = set(self._extra)
+            ids.update(schemas[p].id for p in bits_to_positions(self._bits & ((1 << split) - 1)))
+            json_positions = bits_to_positions(self._bits >> split)
+            if isinstance(jsons, ItemView):
+                ids.update(jsons.ids(json_positions))
+            else:
+                ids.update(jsons[p].id for p in json_positions)
+            self._rendered = sorted(ids)
+        return self._rendered
+
+    def __len__(self) -> int:
+        return len(self.render())
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.render()[index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.render())
+
+    def __bool__(self) -> bool:
+        return bool(self._bits) or bool(self._extra)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ElementTrigger):
+            return self.render() == other.render()
+        if isinstance(other, list):
+            return self.render() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self.render())
+
+
+def _subcontext(
+    ctx: ProcessingContext, schema_positions: Sequence[int], json_positions: Sequence[int]
+) -> ProcessingContext:
+    """Подконтекст из схем и JSON ``ctx`` с заданными позициями (в своих списках)."""
+    schemas = [ctx.schemas[p] for p in schema_positions]
+    jsons: Sequence[Resource]
+    if isinstance(ctx.jsons, ItemView):
+        jsons = ctx.jsons.subset(json_positions)
+    else:
+        jsons = [ctx.jsons[p] for p in json_positions]
+    return ProcessingContext(schemas, jsons, ctx.sealed)
+
+
+class ContextPartition:
+    """
+    Разбиение контекста на группы альтернатив (типы, форматы).
+
+    Компаратор раскладывает позиции элементов по ключам в ``groups`` в том же
+    проходе, в котором их классифицирует. :meth:`trigger` выдаёт триггер группы
+    вместе с готовым подконтекстом, поэтому фильтрация контекста по альтернативе
+    (:meth:`ElementTrigger.select`) не просматривает контекст заново, сколько бы
+    альтернатив ни было. Позиции в группах должны добавляться по возрастанию.
+    """
+
+    __slots__ = ("ctx", "groups")
+
+    def __init__(self, ctx: ProcessingContext):
+        self.ctx = ctx
+        self.groups: dict[Any, list[int]] = {}
+
+    def merge(self, source: Any, target: Any) -> None:
+        """Вливает группу ``source`` в ``target`` (например, ``integer`` в ``number``)."""
+        self.groups[target] = sorted({*self.groups[target], *self.groups.pop(source)})
+
+    def trigger(self, key: Any, extra_ids: Iterable[str] = ()) -> ElementTrigger:
+        positions = self.groups[key]
+        split = bisect_left(positions, len(self.ctx.schemas))
+        json_positions = positions[split:]
+        if self.ctx.schemas:
+            offset = len(self.ctx.schemas)
+            json_positions = [p - offset for p in json_positions]
+        trigger = ElementTrigger(self.ctx, positions, extra_ids)
+        trigger._subset = _subcontext(self.ctx, positions[:split], json_positions)
+        return trigger
+
+
 ComparatorResult = tuple[Optional[dict[str, ToDelete | Any | bool]], Optional[list[dict]]]
 
 
 class Comparator:
     name = "base"
 
+    node_types: Optional[frozenset[str]] = None
+    """
+    Типы узлов (значение ``type`` узла после базового компаратора), к которым
+    применим компаратор; ``None`` — к любым, включая узлы без строкового ``type``.
+    ``Converter`` собирает по этим объявлениям таблицу компараторов для каждого
+    типа и не вызывает ``can_process`` у неподходящих. Объявление лишь сужает
+    круг узлов: ``can_process`` по-прежнему решает окончательно.
+    """
+
+    root_only = False
+    """Применим ли компаратор только к корню (``env == "/"``)."""
+
+    shape_invariant = False
+    """
+    Зависит ли результат только от различных форм значений уровня
+    (:func:`genschema.shapes.level_shape`) в порядке их первого появления,
+    а не от числа повторов. Только с такими компараторами ``Converter``
+    может интернировать формы (``intern_shapes=True``).
+    """
+
+    @property
+    def distinct_values(self) -> int:
+        """
+        Сколько первых различных строковых значений узла нужно компаратору.
+
+        Инкрементальный режим ``Converter`` хранит в сводках не все строки,
+        а столько, сколько запросил самый требовательный компаратор.
+        """
+        return 0
+
+    def memo_inputs(self, env: str) -> Hashable:
+        """
+        Входы компаратора, зависящие от пути уровня, для мемоизации ``Converter``.
+
+        Ключ мемоизированного уровня составлен из содержимого контекста и этих
+        значений: поддерево переиспользуется только там, где они совпадают.
+        Пути дочерних уровней продолжают ``env`` сегментами, которые определяются
+        содержимым, поэтому хватает входов самого уровня. По умолчанию — весь путь
+        (безопасно для любого компаратора); компараторы, не читающие ``env``,
+        возвращают ``None``.
+        """
+        return env
+
     def can_process(self, ctx: ProcessingContext, env: str, prev_result: dict) -> bool:
         return False
 
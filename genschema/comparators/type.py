@@ -1,6 +1,13 @@
-from typing import Any
+from typing import Any, Hashable
 
-from .template import Comparator, ComparatorResult, ProcessingContext
+from .template import (
+    Comparator,
+    ComparatorResult,
+    ContextPartition,
+    ElementTrigger,
+    ProcessingContext,
+    iter_contents,
+)
 
 
 def infer_json_type(v: Any) -> str:
@@ -92,31 +99,44 @@ def infer_schema_types(s: dict | str) -> list[str]:
 
 class TypeComparator(Comparator):
     name = "type"
+    shape_invariant = True
+
+    def memo_inputs(self, env: str) -> Hashable:
+        return None
 
     def can_process(self, ctx: ProcessingContext, env: str, prev_result: dict) -> bool:
         return "type" not in prev_result and bool(ctx.schemas or ctx.jsons)
 
     def process(self, ctx: ProcessingContext, env: str, prev_result: dict) -> ComparatorResult:
-        type_map: dict[str, set[str]] = {}
+        # Элементы контекста задаются позициями: сначала схемы, затем JSON.
+        # Позиции раскладываются по типам сразу в разбиение контекста на альтернативы.
+        partition = ContextPartition(ctx)
+        type_map = partition.groups
 
-        for s in ctx.schemas:
-            for t in infer_schema_types(s.content):
-                type_map.setdefault(t, set()).add(s.id)
+        for position, content in enumerate(iter_contents(ctx.schemas)):
+            for t in infer_schema_types(content):
+                type_map.setdefault(t, []).append(position)
 
-        for j in ctx.jsons:
-            t = infer_json_type(j.content)
-            type_map.setdefault(t, set()).add(j.id)
+        for position, content in enumerate(iter_contents(ctx.jsons), len(ctx.schemas)):
+            t = infer_json_type(content)
+            type_map.setdefault(t, []).append(position)
 
         # Нормализация: number поглощает integer
         if "number" in type_map and "integer" in type_map:
-            type_map["number"].update(type_map["integer"])
-            del type_map["integer"]
+            partition.merge("integer", "number")
 
         if not type_map:
             return None, None
 
+        # Единственный тип на всех элементах — сплошной триггер без построения карты
+        if len(type_map) == 1:
+            ((t, positions),) = type_map.items()
+            total = len(ctx.schemas) + len(ctx.jsons)
+            if len(positions) == total and len(set(positions)) == total:
+                return {"type": t, "j2sElementTrigger": ElementTrigger.full(ctx)}, None
+
         variants: list[dict[str, Any]] = [
-            {"type": t, "j2sElementTrigger": sorted(ids)} for t, ids in type_map.items()
+            {"type": t, "j2sElementTrigger": partition.trigger(t)} for t in type_map
         ]
 
         if ctx.sealed:
@@ -0,0 +1,156 @@
+"""
+Поиск входных файлов в дереве каталогов.
+
+:func:`iter_json_files` обходит каталог лениво, через ``os.scandir``: каталог
+читается, только когда до него дошёл обход, и его файлы отдаются сразу,
+поэтому список всех путей дерева нигде не строится.
+
+Файлы выбираются по шаблону пути относительно корня с правилами ``glob``:
+каждый сегмент между ``/`` сравнивается с одним именем как в :mod:`fnmatch`
+(``*``, ``?``, ``[...]``, с учётом регистра), сегмент ``**`` — любое число
+каталогов, в том числе ни одного. Имя, начинающееся с точки, подходит под
+сегмент, только если и сегмент начинается с точки; ``**`` в такие каталоги
+не заходит.
+"""
+
+import errno
+import fnmatch
+import os
+import random
+import re
+import stat
+from typing import Callable, Iterator, Optional
+
+DirectoryErrorHandler = Callable[[str, OSError], None]
+"""Обработчик ошибки чтения подкаталога: его путь и исключение."""
+
+NameMatcher = Callable[[str], bool]
+
+_MAGIC = re.compile(r"[*?[]")
+
+
+def _segment_matcher(segment: str) -> Optional[NameMatcher]:
+    """Проверка имени по сегменту шаблона; ``None`` — сегмент ``**``."""
+    if segment == "**":
+        return None
+    if not _MAGIC.search(segment):
+        return segment.__eq__
+    regex = re.compile(fnmatch.translate(segment))
+    hidden = segment.startswith(".")
+    return lambda name: (hidden or not name.startswith(".")) and regex.match(name) is not None
+
+
+class _Pattern:
+    """
+    Шаблон как автомат по сегментам: состояние — номер сегмента, с которым
+    сравнивается следующее имя пути.
+    """
+
+    def __init__(self, pattern: str):
+        parts = [part for part in pattern.split("/") if part]
+        if not parts:
+            raise ValueError("Pattern must not be empty.")
+        self.segments = [_segment_matcher(part) for part in parts]
+        self.last = len(parts) - 1
+        # Ведущие сегменты без подстановок — готовый путь, каталоги на нём не читаются
+        start = 0
+        while start < self.last and not _MAGIC.search(parts[start]):
+            start += 1
+        self.prefix = parts[:start]
+        self.start = self._closure({start})
+
+    def _closure(self, states: set[int]) -> tuple[int, ...]:
+        # ``**`` может не совпасть ни с одним каталогом: сразу доступен и следующий сегмент
+        result = set(states)
+        for state in states:
+            while self.segments[state] is None and state < self.last:
+                state += 1
+                result.add(state)
+        return tuple(sorted(result))
+
+    def enter(self, states: tuple[int, ...], name: str) -> tuple[int, ...]:
+        """Состояния в подкаталоге ``name``; пустой кортеж — в него заходить незачем."""
+        following = set()
+        for state in states:
+            matcher = self.segments[state]
+            if matcher is None:
+                if not name.startswith("."):
+                    following.add(state)
+            elif state < self.last and matcher(name):
+                following.add(state + 1)
+        return self._closure(following) if following else ()
+
+    def matches(self, states: tuple[int, ...], name: str) -> bool:
+        """Подходит ли файл ``name`` каталога с состояниями ``states``."""
+        if self.last not in states:
+            return False
+        matcher = self.segments[self.last]
+        return not name.startswith(".") if matcher is None else matcher(name)
+
+
+def iter_json_files(
+    directory: "str | os.PathLike[str]",
+    pattern: str = "**/*.json",
+    per_directory: Optional[int] = None,
+    seed: int = 0,
+    on_error: Optional[DirectoryErrorHandler] = None,
+) -> Iterator[str]:
+    """
+    Отдаёт пути файлов ``directory``, подходящих под ``pattern``.
+
+    Порядок детерминирован: в глубину, внутри каталога по именам, файлы каталога
+    раньше его подкаталогов. Читаются только каталоги, где ещё может найтись
+    подходящий файл: ведущие сегменты без подстановок ведут прямо в нужный
+    каталог, а вглубь обход идёт лишь по ``**`` и совпавшим сегментам.
+    Символические ссылки на каталоги не обходятся.
+
+    :param per_directory: Не больше стольких подходящих файлов из каждого каталога:
+    равномерная случайная выборка, детерминированная при фиксированном ``seed``
+    и не зависящая от остальных каталогов. ``None`` — все файлы.
+    :param on_error: Обработчик ошибок чтения подкаталогов; без него ошибка
+    поднимается. Ошибка чтения самого ``directory`` поднимается всегда.
+    """
+    if per_directory is not None and per_directory < 0:
+        raise ValueError("per_directory must be non-negative.")
+    matcher = _Pattern(pattern)
+    root = os.fspath(directory)
+    start = os.path.join(root, *matcher.prefix)
+    if matcher.prefix:
+        # Сам корень не читается, но его ошибки поднимаются так же, как без префикса
+        if not stat.S_ISDIR(os.stat(root).st_mode):
+            raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), root)
+
+    stack = [(start, "".join(part + "/" for part in matcher.prefix), matcher.start)]
+    while stack:
+        path, relative, states = stack.pop()
+        files: list[tuple[str, str]] = []
+        subdirectories: list[tuple[str, str, tuple[int, ...]]] = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        inner = matcher.enter(states, entry.name)
+                        if inner:
+                            subdirectories.append((entry.path, relative + entry.name + "/", inner))
+                    elif entry.is_file() and matcher.matches(states, entry.name):
+                        files.append((entry.name, entry.path))
+        except OSError as e:
+            missing = isinstance(e, (FileNotFoundError, NotADirectoryError))
+            if missing and path == start and matcher.prefix:
+                # Каталога из префикса шаблона нет: как и у ``glob``, подходящих файлов нет
+                continue
+            if on_error is None or path == root:
+                raise
+            on_error(path, e)
+            continue
+
+        files.sort()
+        if per_directory is not None and len(files) > per_directory:
+            # Своё зерно у каждого каталога: выборка не зависит от порядка обхода
+            chosen = random.Random(f"{seed}:{relative}").sample(range(len(files)), per_directory)
+            files = [files[index] for index in sorted(chosen)]
+        for _, file_path in files:
+            yield file_path
+
+        subdirectories.sort(reverse=True)
+        stack.extend(subdirectories)
@@ -0,0 +1,132 @@
+"""
+Бэкенды чтения и записи JSON.
+
+``Converter`` и CLI читают входные файлы и пишут схему через :class:`JsonBackend`.
+Базовый класс — стандартный :mod:`json`; наследники используют ``orjson``,
+``ujson`` или ``simdjson``, если они установлены. :func:`get_json_backend`
+выбирает бэкенд по имени, ``"auto"`` — самый быстрый из установленных.
+
+Быстрые парсеры строже стандартного: ``NaN``, ``Infinity`` и целые вне 64 бит
+они отвергают. Такой документ бэкенд разбирает стандартным :mod:`json`, поэтому
+результат чтения всегда совпадает с ``json.loads``, а ошибки синтаксиса —
+это ``json.JSONDecodeError``.
+"""
+
+import importlib
+import json
+from typing import Any, Optional
+
+
+class JsonBackend:
+    """
+    Стандартный :mod:`json`. Базовый класс бэкендов: наследник переопределяет
+    :meth:`loads` и :meth:`dumps` и возвращается к реализации базового класса
+    для того, что его библиотека не поддерживает.
+    """
+
+    name = "json"
+    module: Optional[str] = None
+    """Модуль библиотеки бэкенда; импортируется при создании экземпляра."""
+
+    def __init__(self) -> None:
+        self._lib: Any = None if self.module is None else importlib.import_module(self.module)
+
+    def __reduce__(self) -> tuple[type["JsonBackend"], tuple[()]]:
+        # Модуль библиотеки не сериализуется: в другом процессе бэкенд создаётся заново
+        return type(self), ()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.name!r}>"
+
+    def loads(self, data: "str | bytes") -> Any:
+        """Разбирает JSON-документ из строки или байтов (UTF-8)."""
+        return json.loads(data)
+
+    def dumps(self, obj: Any, indent: Optional[int] = None) -> str:
+        """Сериализует ``obj``; символы вне ASCII записываются как есть."""
+        return json.dumps(obj, indent=indent, ensure_ascii=False)
+
+
+class OrjsonBackend(JsonBackend):
+    name = "orjson"
+    module = "orjson"
+
+    def loads(self, data: "str | bytes") -> Any:
+        try:
+            return self._lib.loads(data)
+        except ValueError:
+            return super().loads(data)
+
+    def dumps(self, obj: Any, indent: Optional[int] = None) -> str:
+        # orjson умеет только отступ в два пробела
+        if indent not in (None, 2):
+            return super().dumps(obj, indent)
+        option = self._lib.OPT_INDENT_2 if indent else 0
+        try:
+            return str(self._lib.dumps(obj, option=option).decode())
+        except TypeError:
+            return super().dumps(obj, indent)
+
+
+class UjsonBackend(JsonBackend):
+    name = "ujson"
+    module = "ujson"
+
+    def loads(self, data: "str | bytes") -> Any:
+        try:
+            return self._lib.loads(data)
+        except ValueError:
+            return super().loads(data)
+
+    def dumps(self, obj: Any, indent: Optional[int] = None) -> str:
+        try:
+            return str(
+                self._lib.dumps(
+                    obj, indent=indent or 0, ensure_ascii=False, escape_forward_slashes=False
+                )
+            )
+        except (TypeError, OverflowError):
+            return super().dumps(obj, indent)
+
+
+class SimdjsonBackend(JsonBackend):
+    """Только чтение: запись выполняет стандартный :mod:`json`."""
+
+    name = "simdjson"
+    module = "simdjson"
+
+    def loads(self, data: "str | bytes") -> Any:
+        try:
+            return self._lib.loads(data)
+        except ValueError:
+            return super().loads(data)
+
+
+_BACKENDS: dict[str, type[JsonBackend]] = {
+    backend.name: backend for backend in (OrjsonBackend, UjsonBackend, SimdjsonBackend, JsonBackend)
+}
+"""Бэкенды в порядке предпочтения для ``"auto"``."""
+
+JSON_BACKENDS = ("auto", *_BACKENDS)
+"""Допустимые имена бэкендов."""
+
+
+def get_json_backend(name: str = "auto") -> JsonBackend:
+    """
+    Бэкенд по имени: ``"json"``, ``"orjson"``, ``"ujson"``, ``"simdjson"``
+    или ``"auto"`` — первый установленный в этом порядке.
+
+    :raises ValueError: Неизвестное имя или библиотека бэкенда не установлена.
+    """
+    if name == "auto":
+        for backend in _BACKENDS.values():
+            try:
+                return backend()
+            except ImportError:
+                continue
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name!r}")
+    try:
+        return _BACKENDS[name]()
+    except ImportError as e:
+        raise ValueError(f"JSON backend {name!r} is not installed.") from e
@@ -0,0 +1,198 @@
+"""
+Мемоизация результатов уровней по содержимому контекста.
+
+Одинаковые подконтексты встречаются часто: одна и та же вложенная структура
+под многими свойствами, повторяющиеся элементы массивов, одинаковые схемы.
+:class:`ContentDigest` строит структурный дайджест содержимого контекста,
+а :class:`MemoCache` хранит построенные по нему узлы с вытеснением LRU.
+"""
+
+import copy
+import json
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any, Hashable, Iterable, Optional
+
+from .comparators.template import ElementTrigger, ProcessingContext, iter_contents
+
+DIGEST_SIZE = 16
+
+SampledLevels = tuple[tuple[str, tuple[int, int]], ...]
+"""Статистика выборки поддерева: путь относительно уровня и (рассмотрено, всего)."""
+
+
+def _scalar_digest(value: Any) -> bytes:
+    if isinstance(value, str):
+        data = b"s" + value.encode("utf-8", "surrogatepass")
+    elif value is None:
+        data = b"n"
+    elif isinstance(value, bool):
+        data = b"t" if value else b"f"
+    elif isinstance(value, int):
+        data = b"i" + str(value).encode()
+    elif isinstance(value, float):
+        data = b"r" + repr(value).encode()
+    else:
+        data = b"o" + repr(value).encode("utf-8", "surrogatepass")
+    return blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+
+def _prev_default(value: Any) -> Any:
+    if isinstance(value, ElementTrigger):
+        # Позиции триггера заданы относительно контекста, поэтому сравнимы между контекстами
+        return ["j2sElementTrigger", hex(value.bits), sorted(value.extra_ids)]
+    return repr(value)
+
+
+class ContentDigest:
+    """
+    Структурные дайджесты JSON-значений и контекстов.
+
+    Дайджесты контейнеров запоминаются по ``id`` объекта, поэтому каждое
+    поддерево хешируется один раз, сколько бы уровней его ни содержали.
+    Значения не должны меняться, пока жив экземпляр: ``Converter`` создаёт
+    новый на каждый запуск.
+    """
+
+    __slots__ = ("_containers",)
+
+    def __init__(self) -> None:
+        self._containers: dict[int, tuple[bytes, Any]] = {}
+
+    def __reduce__(self) -> tuple:
+        # id объектов не переносятся между процессами: копия начинает с пустой таблицы
+        return ContentDigest, ()
+
+    def of(self, value: Any) -> bytes:
+        """Дайджест значения (обход без рекурсии, глубина не ограничена)."""
+        if not isinstance(value, (dict, list)):
+            return _scalar_digest(value)
+        containers = self._containers
+        cached = containers.get(id(value))
+        if cached is not None:
+            return cached[0]
+
+        stack: list[tuple[Any, bool]] = [(value, False)]
+        while stack:
+            node, ready = stack.pop()
+            if id(node) in containers:
+                continue
+            children = node.values() if isinstance(node, dict) else node
+            if not ready:
+                stack.append((node, True))
+                for child in children:
+                    if isinstance(child, (dict, list)) and id(child) not in containers:
+                        stack.append((child, False))
+                continue
+
+            h = blake2b(b"d" if isinstance(node, dict) else b"l", digest_size=DIGEST_SIZE)
+            if isinstance(node, dict):
+                for key, child in node.items():
+                    h.update(_scalar_digest(key))
+                    h.update(self._child(child))
+            else:
+                for child in node:
+                    h.update(self._child(child))
+            # Ссылка на объект держит его живым, чтобы id не был переиспользован
+            containers[id(node)] = (h.digest(), node)
+        return containers[id(value)][0]
+
+    def _child(self, value: Any) -> bytes:
+        if isinstance(value, (dict, list)):
+            return self._containers[id(value)][0]
+        return _scalar_digest(value)
+
+    def context(self, ctx: ProcessingContext, prev: dict, inputs: Iterable[Hashable]) -> bytes:
+        """
+        Ключ уровня: содержимое схем и JSON контекста по порядку, ``sealed``,
+        входной узел ``prev`` и зависящие от пути входы компараторов ``inputs``.
+        """
+        h = blake2b(digest_size=DIGEST_SIZE)
+        h.update(repr((ctx.sealed, len(ctx.schemas), tuple(inputs))).encode())
+        h.update(json.dumps(prev, default=_prev_default).encode())
+        for content in iter_contents(ctx.schemas):
+            h.update(self.of(content))
+        for content in iter_contents(ctx.jsons):
+            h.update(self.of(content))
+        return h.digest()
+
+
+def copy_node(node: dict) -> dict:
+    """
+    Глубокая копия узла схемы без рекурсии: глубина вложенности не ограничена.
+
+    Словари и списки копируются, общие поддеревья остаются общими и в копии,
+    как у :func:`copy.deepcopy`; прочие значения копируются ``copy.deepcopy``.
+    """
+    root: dict = {}
+    copies: dict[int, Any] = {id(node): root}
+    stack: list[tuple[Any, Any]] = [(node, root)]
+    while stack:
+        source, target = stack.pop()
+        items = source.items() if isinstance(source, dict) else enumerate(source)
+        for key, value in items:
+            if isinstance(value, (dict, list)):
+                copied = copies.get(id(value))
+                if copied is None:
+                    copied = copies[id(value)] = {} if isinstance(value, dict) else []
+                    stack.append((value, copied))
+            elif isinstance(value, (str, int, float, bool)) or value is None:
+                copied = value
+            else:
+                copied = copy.deepcopy(value)
+            if isinstance(target, dict):
+                target[key] = copied
+            else:
+                target.append(copied)
+    return root
+
+
+class MemoCache:
+    """
+    LRU-кеш построенных узлов со счётчиками попаданий и промахов.
+
+    Вместе с узлом хранится статистика выборки его поддерева: при попадании
+    ``Converter`` переносит её на новый путь (см. ``Converter.sampling_stats``).
+    Кеш общий для исполнителей пула потоков (``parallel_subtrees="thread"``),
+    поэтому операции и счётчики защищены блокировкой.
+    """
+
+    __slots__ = ("maxsize", "hits", "misses", "_entries", "_lock")
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError("Memo cache size must be positive.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[dict, SampledLevels]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __reduce__(self) -> tuple:
+        # В процессы пула кеш уходит пустым, чтобы не пересылать его с каждой задачей
+        return MemoCache, (self.maxsize,)
+
+    def get(self, key: bytes) -> Optional[tuple[dict, SampledLevels]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: bytes, node: dict, sampled: SampledLevels = ()) -> None:
+        with self._lock:
+            self._entries[key] = (node, sampled)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
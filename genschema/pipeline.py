@@ -1,15 +1,66 @@
-import json
+import copy
 import logging
+import os
 import re
-from typing import Literal, Optional
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, islice
+from time import perf_counter
+from typing import IO, Any, Generator, Iterable, Iterator, Literal, Optional, Sequence
 
-from .comparators import TypeComparator
-from .comparators.template import Comparator, ProcessingContext, Resource, ToDelete
-from .pseudo_arrays import PseudoArrayHandlerBase
+from .budget import PERMISSIVE_SCHEMA, BudgetState, RunBudget
+from .comparators import DeleteElement, TypeComparator
+from .comparators.template import (
+    Comparator,
+    ElementTrigger,
+    ItemView,
+    ProcessingContext,
+    Resource,
+    ToDelete,
+    iter_contents,
+)
+from .discovery import iter_json_files
+from .json_backend import JsonBackend, get_json_backend
+from .memo import ContentDigest, MemoCache, copy_node
+from .profiling import RunProfile
+from .pseudo_arrays import NOT_PSEUDO_ARRAY, PseudoArrayDecision, PseudoArrayHandlerBase
+from .sampling import SamplingPolicy
+from .shapes import ShapeGroups
+from .streaming import JSON_LINES_SUFFIXES, iter_json_array, iter_json_lines
+from .summary import (
+    JsonSummary,
+    Representative,
+    item_representatives,
+    property_representatives,
+)
+from .tracing import TraceEvent, Tracer
 
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
+LevelSteps = Generator[tuple[ProcessingContext, str, dict], Optional["dict | Future[dict]"], dict]
+"""
+Генератор обхода уровня: отдаёт запросы на дочерние уровни и получает их результат.
+
+Результат запроса свойства (``/properties/...``) может прийти как ``Future``,
+если движок отправил поддерево в пул (см. ``parallel_subtrees``).
+"""
+
+NO_PREV: dict = {}
+"""
+Пустой входной узел дочернего уровня. Общий для всех запросов и никогда не меняется:
+уровень копирует ``prev`` в собственный узел один раз, в :meth:`Converter._prepare_level`.
+"""
+
+SubtreeResult = tuple[dict, dict[str, tuple[int, int]], Optional[RunProfile]]
+"""Результат поддерева из пула: узел, статистика выборки и профиль (если он ведётся)."""
+
+CHUNKS_PER_WORKER = 4
+"""На сколько частей на процесс делятся документы в ``Converter.run(workers=N)``."""
+
+FILES_PER_SHARD = 16
+"""Сколько файлов читает процесс за одну задачу в ``Converter.add_json_files(workers=N)``."""
+
 
 class Converter:
     def __init__(
@@ -17,6 +68,18 @@ class Converter:
         pseudo_handler: Optional[PseudoArrayHandlerBase] = None,
         base_of: Literal["anyOf", "oneOf", "allOf"] = "anyOf",
         core_comparator: Optional[TypeComparator] = None,
+        engine: Literal["recursive", "iterative"] = "recursive",
+        incremental: bool = False,
+        parallel_subtrees: Optional[Literal["thread", "process"]] = None,
+        subtree_threshold: int = 10_000,
+        subtree_workers: Optional[int] = None,
+        sampling: Optional[SamplingPolicy] = None,
+        intern_shapes: bool = False,
+        memo_size: Optional[int] = None,
+        profile: bool = False,
+        tracer: Optional[Tracer] = None,
+        strip_metadata: bool = False,
+        json_backend: "str | JsonBackend" = "auto",
     ):
         """
         Конвертер JSON + JSON Schema структур в JSON Schema.
@@ -33,6 +96,90 @@ class Converter:
         Он вынесен отдельно,
         так как type - единственное поле без которого Converter не может построить структуру.
         :type core_comparator: TypeComparator
+
+        :param engine: Движок обхода уровней.
+        ``"recursive"`` обрабатывает вложенные уровни рекурсивными вызовами,
+        ``"iterative"`` использует явный стек и подходит для документов
+        с глубиной вложенности, превышающей лимит рекурсии Python.
+        Результат обоих движков идентичен.
+        :type engine: Literal["recursive", "iterative"]
+
+        :param incremental: Инкрементальный режим.
+        ``add_json`` не сохраняет документ, а сразу вливает его в накопительные сводки
+        узлов (:mod:`genschema.summary`), и :meth:`schema` можно вызывать в любой момент:
+        стоимость построения зависит от разнообразия структуры, а не от объёма данных.
+        Схема совпадает с пакетным ``run()`` по тем же данным, кроме значений
+        ``j2sElementTrigger``: они ссылаются на элементы сводок, а не на исходные ресурсы.
+        Компараторы нужно регистрировать до добавления JSON.
+        :type incremental: bool
+
+        :param parallel_subtrees: Параллельная обработка поддеревьев свойств объекта.
+        Поддеревья соседних свойств независимы, поэтому крупные из них отправляются
+        в пул потоков (``"thread"``) или процессов (``"process"``), а мелкие
+        обрабатываются на месте. Результат не отличается от последовательного.
+        Пул процессов даёт выигрыш на CPU-bound данных; пул потоков — только
+        для компараторов, отпускающих GIL.
+        :type parallel_subtrees: Optional[Literal["thread", "process"]]
+
+        :param subtree_threshold: Минимальный размер поддерева для отправки в пул —
+        число значений контекста свойства с учётом элементов его массивов и объектов
+        первого уровня.
+        :type subtree_threshold: int
+
+        :param subtree_workers: Размер пула (по умолчанию — решение ``concurrent.futures``).
+        :type subtree_workers: Optional[int]
+
+        :param sampling: Политика выборки элементов больших массивов и псевдомассивов.
+        Массивы длиннее порога политики обрабатываются по выборке, в которую всегда
+        попадает хотя бы один элемент каждого типа и формата. Сколько элементов
+        реально рассмотрено, возвращает :meth:`sampling_stats`.
+        :type sampling: Optional[SamplingPolicy]
+
+        :param intern_shapes: Интернирование форм (:mod:`genschema.shapes`).
+        Значения уровня группируются по форме (ключи объекта, пустота массива,
+        значение строки, тип скаляра), компараторы уровня обрабатывают по одному
+        представителю группы, а триггеры разворачиваются на всю группу.
+        Результат не меняется, а работа компараторов растёт с числом различных форм,
+        а не значений. Все компараторы должны быть ``shape_invariant``.
+        :type intern_shapes: bool
+
+        :param memo_size: Размер LRU-кеша результатов уровней (:mod:`genschema.memo`);
+        ``None`` — без кеша. Ключ уровня — структурный дайджест содержимого его контекста
+        и зависящие от пути входы компараторов (``Comparator.memo_inputs``); при
+        попадании поддерево не строится, а копируется готовый узел. Кеш работает,
+        только если ``j2sElementTrigger`` удаляется из результата (``DeleteElement()``):
+        id триггеров зависят от расположения данных, а не от содержимого.
+        По сводкам (``incremental`` и ``run(workers=...)``) кеш не используется:
+        содержимое представителей — лишь заготовки, а данные поддерева лежат в сводке.
+        Счётчики — :meth:`memo_stats`.
+        :type memo_size: Optional[int]
+
+        :param profile: Профилирование (:mod:`genschema.profiling`): число вызовов,
+        время и число обработанных ресурсов по компараторам и этапам обхода
+        за последний запуск возвращает :meth:`stats`. Без профилирования замеры
+        не выполняются.
+        :type profile: bool
+
+        :param tracer: Приёмник событий обхода (:mod:`genschema.tracing`): вход
+        и выход уровня, применённые компараторы, разделения объединений и найденные
+        псевдомассивы с путём, числом элементов и длительностью. Например,
+        :class:`~genschema.tracing.ChromeTrace`. С приёмником поддеревья
+        не отправляются в пул (``parallel_subtrees``): события идут по порядку.
+        :type tracer: Optional[Callable[[TraceEvent], None]]
+
+        :param strip_metadata: Служебные атрибуты ``j2sElementTrigger`` и ``isPseudoArray``
+        не попадают в результат. Они нужны компараторам уровня и разделению объединений,
+        поэтому живут в рабочем узле только до конца подготовки уровня, после чего
+        отбрасываются; триггеры при этом не переводятся в строковую форму.
+        Результат тот же, что с ``DeleteElement()`` и ``DeleteElement("isPseudoArray")``
+        в конце списка компараторов, но без их вызова на каждом узле.
+        :type strip_metadata: bool
+
+        :param json_backend: Бэкенд чтения JSON-файлов (:mod:`genschema.json_backend`):
+        ``"json"``, ``"orjson"``, ``"ujson"``, ``"simdjson"``, ``"auto"`` (самый быстрый
+        из установленных) или экземпляр :class:`~genschema.json_backend.JsonBackend`.
+        Прочитанные значения не зависят от бэкенда.
+        :type json_backend: str | JsonBackend
         """
         self._schemas: list[Resource] = []
         self._jsons: list[Resource] = []
@@ -41,27 +188,308 @@ class Converter:
         self._id = 0
         self._pseudo_handler = pseudo_handler
         self._base_of = base_of
+        if engine not in ("recursive", "iterative"):
+            raise ValueError(f"Unknown engine: {engine!r}")
+        self._engine = engine
+        self._incremental = incremental
+        self._summary: Optional[JsonSummary] = None
+        if parallel_subtrees not in (None, "thread", "process"):
+            raise ValueError(f"Unknown parallel_subtrees mode: {parallel_subtrees!r}")
+        self._parallel_subtrees = parallel_subtrees
+        self._subtree_threshold = subtree_threshold
+        self._subtree_workers = subtree_workers
+        self._subtree_pool: Optional[tuple[Executor, Converter]] = None
+        self._sampling = sampling
+        self._sampled: dict[str, tuple[int, int]] = {}
+        if intern_shapes and not self._core_comparator.shape_invariant:
+            raise ValueError("intern_shapes requires a shape-invariant core comparator.")
+        self._intern_shapes = intern_shapes
+        self._plans: dict[tuple[Optional[str], bool], list[int]] = {}
+        self._memo = MemoCache(memo_size) if memo_size is not None else None
+        self._digest: Optional[ContentDigest] = None
+        self._pseudo_cache: dict[tuple[str, ...], PseudoArrayDecision] = {}
+        self._budget_state: Optional[BudgetState] = None
+        self._truncated: dict[str, str] = {}
+        self._profiling = profile
+        self._tracer = tracer
+        self._strip_metadata = strip_metadata
+        self._json = (
+            json_backend
+            if isinstance(json_backend, JsonBackend)
+            else get_json_backend(json_backend)
+        )
+        self._profile: Optional[RunProfile] = None
+        self._subtree_profiles: list[RunProfile] = []
 
     def add_schema(self, s: dict | str) -> None:
         if isinstance(s, str):
-            with open(s, "r") as f:
-                s = json.loads(f.read())
+            with open(s, "rb") as f:
+                s = self._json.loads(f.read())
 
-        self._schemas.append(Resource(str(self._id), "schema", s))
+        self._schemas.append(Resource(self._id, "schema", s))
         self._id += 1
 
     def add_json(self, j: dict | list | str) -> None:
         if isinstance(j, str):
-            with open(j, "r") as f:
-                j = json.loads(f.read())
+            with open(j, "rb") as f:
+                j = self._json.loads(f.read())
+        self._add_document(j)
+
+    def add_json_stream(self, source: "str | os.PathLike[str] | IO") -> None:
+        """
+        Добавляет JSON-массив верхнего уровня, читая файл по частям
+        (:mod:`genschema.streaming`).
 
-        self._jsons.append(Resource(str(self._id), "json", j))
+        Результат тот же, что у ``add_json`` с тем же файлом. В инкрементальном
+        режиме элементы сразу вливаются в сводку и не хранятся, поэтому память
+        не растёт с размером файла. В пакетном режиме элементы собираются в один
+        документ: экономится только память под текст файла.
+
+        :param source: Путь к файлу или открытый файл (текстовый или двоичный в UTF-8).
+        :raises ValueError: Значение верхнего уровня не массив или JSON некорректен.
+        В инкрементальном режиме уже прочитанные элементы к этому моменту
+        находятся в сводке.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "r", encoding="utf-8") as f:
+                self.add_json_stream(f)
+            return
+
+        items = iter_json_array(source)
+        if self._incremental:
+            self._incremental_summary().add_array(items)
+        else:
+            self._jsons.append(Resource(self._id, "json", list(items)))
         self._id += 1
 
+    def add_jsonl(
+        self, source: "str | os.PathLike[str] | IO", skip_invalid: bool = False
+    ) -> dict[str, int]:
+        """
+        Добавляет документы JSON Lines (NDJSON): каждая непустая строка —
+        отдельный JSON, как при ``add_json`` для каждой строки.
+
+        Строки читаются и разбираются по одной (:mod:`genschema.streaming`).
+        В инкрементальном режиме документы сразу вливаются в сводку, поэтому
+        память зависит от разнообразия структуры, а не от числа строк.
+
+        :param source: Путь к файлу или открытый файл (текстовый или двоичный в UTF-8).
+        :param skip_invalid: Пропускать некорректные строки вместо ``ValueError``.
+        Строки до ошибки к этому моменту уже добавлены.
+        :return: ``{"instances": добавлено документов, "skipped": пропущено строк}``.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            # Двоичный режим: строки декодируются по одной, и некорректный UTF-8 можно пропустить
+            with open(source, "rb") as f:
+                return self.add_jsonl(f, skip_invalid)
+
+        counts = {"instances": 0, "skipped": 0}
+
+        def skip(number: int, error: ValueError) -> None:
+            logger.debug("Skipping invalid JSON line %d: %s", number, error)
+            counts["skipped"] += 1
+
+        for document in iter_json_lines(source, skip if skip_invalid else None, self._json.loads):
+            # Строка-документ может быть JSON-строкой: add_json принял бы её за путь
+            self._add_document(document)
+            counts["instances"] += 1
+        return counts
+
+    def add_json_files(
+        self,
+        paths: "Iterable[str | os.PathLike[str]]",
+        workers: Optional[int] = None,
+        jsonl: Optional[bool] = None,
+        skip_invalid_lines: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Добавляет файлы по порядку: JSON — как ``add_json``, JSON Lines — как ``add_jsonl``.
+
+        Ошибка чтения или разбора файла не прерывает добавление: файл пропускается,
+        а ошибка попадает в отчёт (строки JSON Lines до ошибки остаются добавленными).
+
+        :param workers: Число процессов для чтения файлов. Файлы делятся на
+        последовательные части по ``FILES_PER_SHARD``; процесс сам читает и разбирает
+        свои файлы и возвращает только их сводку (:mod:`genschema.summary`), сводки
+        сливаются строго в порядке частей. Документы не пересекают границу процессов,
+        а в ожидании слияния одновременно находится не больше
+        ``workers * CHUNKS_PER_WORKER`` частей, поэтому ``paths`` может быть ленивым.
+        Требует инкрементального режима.
+        :type workers: Optional[int]
+
+        :param jsonl: ``True`` — все файлы в формате JSON Lines,
+        ``None`` — только файлы с расширением ``.jsonl`` или ``.ndjson``.
+        :type jsonl: Optional[bool]
+
+        :param skip_invalid_lines: Пропускать некорректные строки JSON Lines
+        (как ``skip_invalid`` у :meth:`add_jsonl`), а не весь файл.
+        :type skip_invalid_lines: bool
+
+        :return: ``{"files": добавлено файлов, "instances": добавлено документов,
+        "skipped_lines": пропущено строк, "errors": {путь: сообщение об ошибке}}``.
+        """
+        if workers is None or workers <= 1:
+            return self._add_files(paths, jsonl, skip_invalid_lines)
+        if not self._incremental:
+            raise ValueError("Parallel file ingestion requires incremental=True.")
+
+        report = _files_report()
+        limit = self._distinct_values()
+        pending: deque[Future[tuple[dict, dict[str, Any]]]] = deque()
+
+        def merge(future: Future[tuple[dict, dict[str, Any]]]) -> None:
+            state, shard_report = future.result()
+            self.merge_state({"incremental": True, "schemas": [], "summary": state})
+            _merge_files_reports(report, shard_report)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for shard in _batched((os.fspath(path) for path in paths), FILES_PER_SHARD):
+                if len(pending) >= workers * CHUNKS_PER_WORKER:
+                    merge(pending.popleft())
+                pending.append(
+                    pool.submit(
+                        _summarize_files, shard, limit, self._json, jsonl, skip_invalid_lines
+                    )
+                )
+            while pending:
+                merge(pending.popleft())
+        return report
+
+    def add_json_dir(
+        self,
+        directory: "str | os.PathLike[str]",
+        pattern: str = "**/*.json",
+        per_directory: Optional[int] = None,
+        seed: int = 0,
+        workers: Optional[int] = None,
+        jsonl: Optional[bool] = None,
+        skip_invalid_lines: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Добавляет файлы каталога ``directory``, подходящие под шаблон ``pattern``
+        (:func:`genschema.discovery.iter_json_files`).
+
+        Каталоги читаются лениво, и каждый найденный файл сразу передаётся
+        в :meth:`add_json_files`: список путей дерева не строится.
+
+        :param pattern: Шаблон пути относительно ``directory`` по правилам ``glob``.
+        :param per_directory: Не больше стольких файлов из каждого каталога
+        (случайная выборка, детерминированная при фиксированном ``seed``).
+        :param workers: См. :meth:`add_json_files`; ``jsonl`` и ``skip_invalid_lines`` — тоже.
+        :return: Отчёт :meth:`add_json_files`; в ``"errors"`` попадают и подкаталоги,
+        которые не удалось прочитать.
+        :raises OSError: Не удалось прочитать сам ``directory``.
+        """
+        unreadable: dict[str, str] = {}
+
+        def skip(path: str, error: OSError) -> None:
+            logger.debug("Skipping directory %s: %s", path, error)
+            unreadable[path] = str(error)
+
+        paths = iter_json_files(directory, pattern, per_directory, seed, skip)
+        report = self.add_json_files(paths, workers, jsonl, skip_invalid_lines)
+        report["errors"].update(unreadable)
+        return report
+
+    def _add_files(
+        self,
+        paths: "Iterable[str | os.PathLike[str]]",
+        jsonl: Optional[bool],
+        skip_invalid_lines: bool,
+    ) -> dict[str, Any]:
+        """Последовательная часть :meth:`add_json_files`."""
+        report = _files_report()
+        for file_path in paths:
+            path = os.fspath(file_path)
+            try:
+                if jsonl or (jsonl is None and path.lower().endswith(JSON_LINES_SUFFIXES)):
+                    counts = self.add_jsonl(path, skip_invalid_lines)
+                    report["instances"] += counts["instances"]
+                    report["skipped_lines"] += counts["skipped"]
+                else:
+                    self.add_json(path)
+                    report["instances"] += 1
+            except (OSError, ValueError) as e:
+                logger.debug("Skipping file %s: %s", path, e)
+                report["errors"][path] = str(e)
+                continue
+            report["files"] += 1
+        return report
+
+    def _add_document(self, j: Any) -> None:
+        if self._incremental:
+            self._incremental_summary().add(j)
+        else:
+            self._jsons.append(Resource(self._id, "json", j))
+        self._id += 1
+
+    def _incremental_summary(self) -> JsonSummary:
+        if self._summary is None:
+            self._summary = JsonSummary(self._distinct_values())
+        return self._summary
+
     def clear_data(self) -> None:
         self._id = 0
         self._jsons = []
         self._schemas = []
+        self._summary = None
+
+    def merge(self, other: "Converter") -> None:
+        """
+        Добавляет все данные ``other`` так, будто они были добавлены в этот конвертер
+        после его собственных.
+
+        Схемы и JSON других конвертеров переносятся как есть, а в инкрементальном
+        режиме сливаются сводки, поэтому сохраняются и свидетельства для ``required``,
+        ``enum`` и ``format``. Слияние ассоциативно. Компараторы ``other`` не переносятся.
+        """
+        self.merge_state(other.export_state())
+
+    def export_state(self) -> dict:
+        """
+        Частичное состояние конвертера для слияния в другом процессе.
+
+        Содержит добавленные схемы и JSON-документы (в инкрементальном режиме —
+        сериализованную сводку вместо документов). Состояние можно передать
+        через ``pickle`` или JSON и объединить :meth:`merge_state` или :func:`merge_states`.
+        """
+        state: dict[str, Any] = {
+            "incremental": self._incremental,
+            "schemas": [s.content for s in self._schemas],
+        }
+        if self._incremental:
+            state["summary"] = None if self._summary is None else self._summary.to_state()
+        else:
+            state["jsons"] = [j.content for j in self._jsons]
+        return state
+
+    def merge_state(self, state: dict) -> None:
+        """Вливает частичное состояние из :meth:`export_state` или :func:`merge_states`."""
+        if state["incremental"] != self._incremental:
+            raise ValueError("Cannot merge states of incremental and batch converters.")
+
+        for content in state["schemas"]:
+            self._schemas.append(Resource(self._id, "schema", content))
+            self._id += 1
+
+        if not self._incremental:
+            for content in state["jsons"]:
+                self._jsons.append(Resource(self._id, "json", content))
+                self._id += 1
+            return
+
+        if state["summary"] is None:
+            return
+        other = JsonSummary.from_state(state["summary"])
+        if other.limit < self._distinct_values():
+            raise ValueError(
+                "The merged state keeps fewer distinct values than the registered "
+                "comparators need."
+            )
+        if self._summary is None:
+            self._summary = JsonSummary(other.limit)
+        self._summary.merge(other)
+        self._id += other.documents
 
     def register(self, c: Comparator) -> None:
         if isinstance(c, TypeComparator):
@@ -69,36 +497,168 @@ class Converter:
                 "A TypeComparator-like comparator must be provided during initialization "
                 "using the core_comparator attribute."
             )
+        if self._summary is not None and c.distinct_values > self._summary.limit:
+            raise ValueError(
+                "In incremental mode comparators must be registered before JSON is added."
+            )
+        if self._intern_shapes and not c.shape_invariant:
+            raise ValueError(f"Comparator {c.name!r} is not shape-invariant (intern_shapes).")
         self._comparators.append(c)
+        self._plans = {}
+        if self._memo is not None:
+            self._memo.clear()
+
+    def _comparator_plan(self, node_type: Optional[str], root: bool) -> list[int]:
+        """
+        Индексы компараторов (в порядке регистрации), применимых к узлам
+        типа ``node_type`` — по их ``node_types`` и ``root_only``.
+        Таблица собирается один раз на пару (тип, корень).
+        """
+        plan = self._plans.get((node_type, root))
+        if plan is None:
+            plan = self._plans[(node_type, root)] = [
+                index
+                for index, c in enumerate(self._comparators)
+                if (c.node_types is None or node_type in c.node_types) and (root or not c.root_only)
+            ]
+        return plan
+
+    def _memo_key(self, ctx: ProcessingContext, env: str, prev: dict) -> Optional[bytes]:
+        """Ключ уровня в кеше результатов или ``None``, если кеш в этом запуске не используется."""
+        if self._digest is None:
+            return None
+        # Статистику выборки поддеревьев из пула пишет поток обратного вызова,
+        # и её нельзя привязать к записи кеша: с выборкой уровни вне пула не кешируются
+        if self._subtree_pool is not None and self._sampling is not None:
+            return None
+        inputs = [env == "/", self._core_comparator.memo_inputs(env)]
+        inputs.extend(c.memo_inputs(env) for c in self._comparators)
+        return self._digest.context(ctx, prev, inputs)
+
+    def _memo_lookup(self, key: Optional[bytes], env: str) -> Optional[dict]:
+        """
+        Копия закешированного узла по ключу ``key``. Статистика выборки
+        его поддерева переносится на уровень ``env``.
+        """
+        if key is None or self._memo is None:
+            return None
+        cached = self._memo.get(key)
+        if cached is None:
+            return None
+        node, sampled = cached
+        for suffix, counts in sampled:
+            self._sampled[env + suffix] = counts
+        return copy_node(node)
+
+    def _memo_store(self, key: Optional[bytes], env: str, node: dict, mark: int) -> None:
+        """
+        Кеширует узел уровня ``env`` вместе со статистикой выборки его поддерева:
+        записями ``_sampled``, добавленными после того, как их было ``mark``.
+        """
+        if key is None or self._memo is None:
+            return
+        added = islice(reversed(self._sampled.items()), len(self._sampled) - mark)
+        sampled = tuple((path[len(env) :], counts) for path, counts in added)
+        self._memo.put(key, node, sampled[::-1])
+
+    def _distinct_values(self) -> int:
+        """Сколько различных строк на класс формата хранить в сводках узлов."""
+        comparators = [self._core_comparator, *self._comparators]
+        return max(c.distinct_values for c in comparators)
 
     # ---------------- utils ----------------
 
-    def _collect_prop_names(self, schemas: list[Resource], jsons: list[Resource]) -> list[str]:
+    def _collect_prop_names(
+        self, schemas: Sequence[Resource], jsons: Sequence[Resource]
+    ) -> list[str]:
         names = set()
-        for s in schemas:
-            c = s.content
+        for c in iter_contents(schemas):
             if isinstance(c, dict) and isinstance(c.get("properties"), dict):
                 names.update(c["properties"].keys())
-        for j in jsons:
-            if isinstance(j.content, dict):
-                names.update(j.content.keys())
+        for c in iter_contents(jsons):
+            if isinstance(c, dict):
+                names.update(c.keys())
         return sorted(names)
 
-    def _gather_property_candidates(
-        self, schemas: list[Resource], jsons: list[Resource], prop: str
-    ) -> tuple[list[Resource], list[Resource]]:
-        s_out, j_out = [], []
+    def _classify_keys(self, keys: list[str], ctx: ProcessingContext) -> PseudoArrayDecision:
+        """
+        Решение обработчика псевдомассивов для отсортированных ключей ``keys``.
+
+        Если решение зависит только от ключей (``keys_only``), оно кешируется
+        до конца запуска: каждый набор ключей разбирается и упорядочивается один раз.
+        """
+        handler = self._pseudo_handler
+        if handler is None:
+            return NOT_PSEUDO_ARRAY
+        if not handler.keys_only:
+            return handler.classify(keys, ctx)
+        cache_key = tuple(keys)
+        decision = self._pseudo_cache.get(cache_key)
+        if decision is None:
+            decision = handler.classify(keys, ctx)
+            self._pseudo_cache[cache_key] = decision
+        return decision
+
+    def _classify_object(self, content: dict, ctx: ProcessingContext) -> PseudoArrayDecision:
+        """
+        :meth:`_classify_keys` для ключей одного объекта.
+
+        Кеш дополнительно запоминает ключи в порядке объекта,
+        чтобы повторные объекты с теми же ключами не сортировались заново.
+        """
+        if self._pseudo_handler is None or not self._pseudo_handler.keys_only:
+            return self._classify_keys(sorted(content), ctx)
+        raw_key = tuple(content)
+        decision = self._pseudo_cache.get(raw_key)
+        if decision is None:
+            decision = self._classify_keys(sorted(raw_key), ctx)
+            self._pseudo_cache[raw_key] = decision
+        return decision
+
+    def _bucket_properties(
+        self, schemas: Sequence[Resource], jsons: Sequence[Resource]
+    ) -> dict[str, tuple[list[Resource], list[Resource]]]:
+        """
+        Индексирует контекст по именам свойств за один проход.
+
+        Возвращает словарь ``имя -> (schemas, jsons)`` с отсортированными ключами,
+        где в корзинах лежат родительские ресурсы, содержащие это свойство
+        (в порядке контекста). Дочерние ресурсы создаются позже,
+        в :meth:`_property_ctx`, только для обрабатываемого свойства.
+        """
+        buckets: dict[str, tuple[list[Resource], list[Resource]]] = {}
 
         for s in schemas:
             c = s.content
-            if isinstance(c, dict) and prop in c.get("properties", {}):
-                s_out.append(Resource(f"{s.id}/{prop}", "schema", c["properties"][prop]))
+            if isinstance(c, dict) and isinstance(c.get("properties"), dict):
+                for prop in c["properties"]:
+                    bucket = buckets.get(prop)
+                    if bucket is None:
+                        bucket = buckets[prop] = ([], [])
+                    bucket[0].append(s)
 
         for j in jsons:
-            if isinstance(j.content, dict) and prop in j.content:
-                j_out.append(Resource(f"{j.id}/{prop}", "json", j.content[prop]))
+            c = j.content
+            if isinstance(c, dict):
+                for prop in c:
+                    bucket = buckets.get(prop)
+                    if bucket is None:
+                        bucket = buckets[prop] = ([], [])
+                    bucket[1].append(j)
+
+        return {name: buckets[name] for name in sorted(buckets)}
 
-        return s_out, j_out
+    def _property_ctx(
+        self, name: str, bucket: tuple[list[Resource], list[Resource]], sealed: bool
+    ) -> ProcessingContext:
+        schema_parents, json_parents = bucket
+        schemas = [Resource.child(s, name, s.content["properties"][name]) for s in schema_parents]
+        jsons: Sequence[Resource]
+        if json_parents and isinstance(json_parents[0], Representative):
+            jsons = property_representatives(json_parents, name)
+        else:
+            jsons = [Resource.child(j, name, j.content[name]) for j in json_parents]
+        return ProcessingContext(schemas, jsons, sealed)
 
     def _keys_matched_by_pattern(self, pattern: str, keys: list[str]) -> set[str]:
         try:
@@ -111,27 +671,37 @@ class Converter:
         self, ctx: ProcessingContext
     ) -> tuple[ProcessingContext, ProcessingContext]:
         obj_jsons = []
-        item_jsons = []
+        item_sources: list[tuple[Resource, Optional[list]]] = []
 
         for j in ctx.jsons:
             c = j.content
             if isinstance(c, list):
-                for i, el in enumerate(c):
-                    item_jsons.append(Resource(f"{j.id}/{i}", "json", el))
+                item_sources.append((j, None))
             elif isinstance(c, dict):
-                keys = self._collect_prop_names([], [j])
-                is_pseudo_array = False
-                if self._pseudo_handler:
-                    is_pseudo_array, _ = self._pseudo_handler.is_pseudo_array(keys, ctx)
-                if is_pseudo_array:
-                    sorted_keys = sorted(keys, key=lambda k: int(k) if k.isdigit() else -1)
-                    for i, k in enumerate(sorted_keys):
-                        item_jsons.append(Resource(f"{j.id}/{i}", "json", c[k]))
+                decision = self._classify_object(c, ctx)
+                if decision.is_pseudo_array:
+                    item_sources.append((j, decision.order))
                 else:
                     obj_jsons.append(j)
             else:
                 obj_jsons.append(j)
 
+        item_jsons: Sequence[Resource]
+        if item_sources and isinstance(item_sources[0][0], Representative):
+            item_jsons = item_representatives(item_sources)
+        else:
+            view = ItemView()
+            for j, item_keys in item_sources:
+                view.add(j, j.content, item_keys)
+            item_jsons = view
+            if self._sampling is not None and len(view) > self._sampling.threshold:
+                positions = self._sampling.select(
+                    view.contents(), len(view), self._distinct_values()
+                )
+                sample = view.subset(positions)
+                sample.population = len(view)
+                item_jsons = sample
+
         obj_schemas = []
         item_schemas = []
 
@@ -140,18 +710,12 @@ class Converter:
             if isinstance(c, dict):
                 t = c.get("type")
                 if t == "array" and "items" in c:
-                    item_schemas.append(Resource(f"{s.id}/items", "schema", c["items"]))
+                    item_schemas.append(Resource.child(s, "items", c["items"]))
                 elif t == "object" and "properties" in c:
-                    keys = sorted(c["properties"].keys())
-                    is_pseudo_array = False
-                    if self._pseudo_handler:
-                        is_pseudo_array, _ = self._pseudo_handler.is_pseudo_array(keys, ctx)
-                    if is_pseudo_array:
-                        sorted_keys = sorted(keys, key=lambda k: int(k) if k.isdigit() else -1)
-                        for i, k in enumerate(sorted_keys):
-                            item_schemas.append(
-                                Resource(f"{s.id}/{i}", "schema", c["properties"][k])
-                            )
+                    decision = self._classify_object(c["properties"], ctx)
+                    if decision.is_pseudo_array and decision.order is not None:
+                        for i, k in enumerate(decision.order):
+                            item_schemas.append(Resource.child(s, i, c["properties"][k]))
                     else:
                         obj_schemas.append(s)
                 elif t == "object" and isinstance(c.get("patternProperties"), dict):
@@ -161,10 +725,10 @@ class Converter:
                         continue
 
                     keys = self._collect_prop_names([], ctx.jsons)
-                    is_pseudo_array, _ = self._pseudo_handler.is_pseudo_array(keys, ctx)
+                    decision = self._classify_keys(keys, ctx)
 
                     # If a branch is not pseudo-array, keep schema on object path.
-                    if not is_pseudo_array or not keys:
+                    if not decision.is_pseudo_array or not keys:
                         obj_schemas.append(s)
                         continue
 
@@ -185,11 +749,7 @@ class Converter:
 
                     for index, pattern in enumerate(matched_patterns):
                         item_schemas.append(
-                            Resource(
-                                f"{s.id}/patternProperties/{index}",
-                                "schema",
-                                pattern_props[pattern],
-                            )
+                            Resource.child(s, f"patternProperties/{index}", pattern_props[pattern])
                         )
                 else:
                     obj_schemas.append(s)
@@ -201,126 +761,729 @@ class Converter:
             ProcessingContext(item_schemas, item_jsons, ctx.sealed),
         )
 
-    def _filter_ctx_by_ids(self, ctx: ProcessingContext, ids: set) -> ProcessingContext:
-        if not ids:
+    def _items_ctx(self, ctx: ProcessingContext) -> ProcessingContext:
+        """Контекст элементов массивов и псевдомассивов уровня (этап ``split_array``)."""
+        if self._profile is None:
+            return self._split_array_ctx(ctx)[1]
+        start = perf_counter()
+        items_ctx = self._split_array_ctx(ctx)[1]
+        self._profile.stage("split_array", perf_counter() - start, _ctx_size(ctx))
+        return items_ctx
+
+    def _filter_ctx_by_trigger(self, ctx: ProcessingContext, trigger: Any) -> ProcessingContext:
+        """
+        Сужает контекст до ресурсов, на которых сработала альтернатива.
+
+        ``ElementTrigger`` выбирает элементы по позициям в контексте; обычный список
+        строковых id (от сторонних компараторов) сравнивается с ``Resource.id``.
+        Пустой триггер оставляет контекст без изменений.
+        """
+        if not trigger:
             return ctx
+        if isinstance(trigger, ElementTrigger):
+            return trigger.select(ctx)
+        ids = set(trigger)
         schemas = [s for s in ctx.schemas if s.id in ids]
         jsons = [j for j in ctx.jsons if j.id in ids]
         return ProcessingContext(schemas, jsons, ctx.sealed)
 
     # ---------------- core ----------------
 
-    def _run_level(self, ctx: ProcessingContext, env: str, prev: dict) -> dict:
-        logger.debug("Entering _run_level: env=%s, prev_result=%s", env, prev)
+    def _prepare_level(
+        self, ctx: ProcessingContext, env: str, prev: dict
+    ) -> tuple[dict, Optional[str]]:
+        """
+        Применяет компараторы к текущему уровню.
+
+        Возвращает построенный узел и паттерн псевдомассива
+        (``None``, если уровень не является псевдомассивом).
+        Это единственный этап уровня, которому нужен полный путь ``env``.
+        """
+        logger.debug("Entering _run_level: env=%s, elements=%d", env, len(ctx.jsons))
+        # Единственная копия узла на уровне: ``prev`` может принадлежать родителю,
+        # а дальше узел принадлежит уровню, и все этапы меняют его на месте.
         node = dict(prev)
+        if isinstance(ctx.jsons, ItemView) and ctx.jsons.population is not None:
+            self._sampled[env] = (len(ctx.jsons), ctx.jsons.population)
+
+        # Компараторы уровня работают с представителями форм, если это возможно
+        level, shapes = ctx, self._shape_groups(ctx, node)
+        if shapes is not None:
+            level = shapes.ctx
+
+        profile, tracer = self._profile, self._tracer
+        measured = profile is not None or tracer is not None
 
         def use_comp(comp: Comparator) -> bool:
-            if not comp.can_process(ctx, env, node):
+            if measured:
+                return measure_comp(comp)
+            if not comp.can_process(level, env, node):
                 return False
 
-            g, alts = comp.process(ctx, env, node)
+            g, alts = comp.process(level, env, node)
             if g:
                 node.update(g)
             if alts:
                 node.setdefault(self._base_of, []).extend(alts)
             return True
 
+        def measure_comp(comp: Comparator) -> bool:
+            start = perf_counter()
+            applied = comp.can_process(level, env, node)
+            if applied:
+                g, alts = comp.process(level, env, node)
+                if g:
+                    node.update(g)
+                if alts:
+                    node.setdefault(self._base_of, []).extend(alts)
+            end = perf_counter()
+            size = _ctx_size(level)
+            if profile is not None:
+                profile.comparator(comp.name, end - start, applied, size)
+            if tracer is not None and applied:
+                tracer(TraceEvent("comparator_applied", env, size, end, end - start, comp.name))
+            return applied
+
         # Вызов базового компаратора
         use_comp(self._core_comparator)
 
         # Определение является ли объект псевдомассивом
+        pseudo_pattern = None
         if node.get("type") == "object":
-            props = self._collect_prop_names(ctx.schemas, ctx.jsons)
             if self._pseudo_handler:
-                is_pseudo_array, pattern = self._pseudo_handler.is_pseudo_array(props, ctx)
-                node["isPseudoArray"] = is_pseudo_array
-            else:
-                # node["isPseudoArray"] = False
-                is_pseudo_array = False
+                props = self._collect_prop_names(level.schemas, level.jsons)
+                decision = self._classify_keys(props, ctx)
+                node["isPseudoArray"] = decision.is_pseudo_array
+                if decision.is_pseudo_array:
+                    pseudo_pattern = str(decision.pattern)
+                    if tracer is not None:
+                        tracer(TraceEvent("pseudo_array_detected", env, len(props), perf_counter()))
 
-        # Вызов остальных компараторов
-        for comp in self._comparators:
-            use_comp(comp)
+        # Вызов остальных компараторов по таблице для типа узла. Если компаратор
+        # сменил тип узла, остаток обхода продолжается по таблице нового типа.
+        root = env == "/"
+        node_type = _node_type(node)
+        plan = self._comparator_plan(node_type, root)
+        step = 0
+        while step < len(plan):
+            index = plan[step]
+            use_comp(self._comparators[index])
+            step += 1
+            if _node_type(node) != node_type:
+                node_type = _node_type(node)
+                plan = [i for i in self._comparator_plan(node_type, root) if i > index]
+                step = 0
 
         # Удаление атрибутов помеченных на удаление
         to_delete_keys = []
+        to_render_keys = []
         for key, element in node.items():
             if isinstance(element, ToDelete):
                 to_delete_keys.append(key)
+            elif isinstance(element, ElementTrigger):
+                to_render_keys.append(key)
         for key in to_delete_keys:
             del node[key]
 
-        # если есть Of — обработаем каждую альтернативу через _run_level
+        # Служебные атрибуты уровня больше не нужны: триггеры альтернатив остаются
+        # в них до разделения объединения и отбрасываются уже дочерними уровнями.
+        if self._strip_metadata:
+            for key in to_render_keys:
+                del node[key]
+            node.pop("isPseudoArray", None)
+            to_render_keys = []
+
+        if shapes is not None:
+            for key in to_render_keys:
+                node[key] = shapes.expand(node[key])
+            for alt in node.get(self._base_of, []):
+                trigger = alt.get("j2sElementTrigger")
+                if isinstance(trigger, ElementTrigger) and trigger.ctx is level:
+                    alt["j2sElementTrigger"] = shapes.expand(trigger)
+
+        # Оставшиеся триггеры попадут в результат: фиксируем их строковую форму сейчас,
+        # пока id родительских ресурсов уже собраны, и отпускаем сами ресурсы.
+        for key in to_render_keys:
+            node[key] = node[key].render()
+
+        # Слишком широкое объединение не обходится: альтернативы заменяет разрешающая подсхема
+        state = self._budget_state
+        if state is not None and not state.allows_union(env, len(node.get(self._base_of, ()))):
+            return dict(PERMISSIVE_SCHEMA), None
+
+        if tracer is not None and self._base_of in node:
+            tracer(TraceEvent("union_split", env, len(node[self._base_of]), perf_counter()))
+
+        return node, pseudo_pattern
+
+    def _shape_groups(self, ctx: ProcessingContext, node: dict) -> Optional[ShapeGroups]:
+        """
+        Группы форм уровня для ``intern_shapes``; ``None``, если интернирование
+        выключено, не сокращает контекст или триггер узла нельзя перенести на группы.
+        ``node`` при необходимости получает перенесённый триггер.
+        """
+        if not self._intern_shapes:
+            return None
+        shapes = ShapeGroups.of(ctx)
+        if shapes is None:
+            return None
+        trigger = node.get("j2sElementTrigger")
+        if trigger is not None:
+            reduced = shapes.reduce(trigger) if isinstance(trigger, ElementTrigger) else None
+            if reduced is None:
+                return None
+            node["j2sElementTrigger"] = reduced
+        return shapes
+
+    def _run_children(
+        self, ctx: ProcessingContext, node: dict, pseudo_pattern: Optional[str]
+    ) -> LevelSteps:
+        """
+        Обходит дочерние уровни подготовленного узла.
+
+        Генератор отдаёт запросы ``(ctx, сегмент пути, prev)`` на обработку дочерних
+        уровней и получает обратно их результат. Сегмент относителен
+        текущему ``env``: полный путь собирает движок обхода.
+        """
+        # если есть Of — обработаем каждую альтернативу как отдельный уровень
         if self._base_of in node:
-            new_of = []
-            for idx, alt in enumerate(node[self._base_of]):
-                alt_ids = set(alt.get("j2sElementTrigger", []))
-                alt_ctx = self._filter_ctx_by_ids(ctx, alt_ids) if alt_ids else ctx
-                processed_alt = self._run_level(alt_ctx, env + f"/{self._base_of}/{idx}", alt)
-                new_of.append(processed_alt)
-            node[self._base_of] = new_of
-            logger.debug(
-                "Exiting _run_level (%s handled): env=%s, node=%s", self._base_of, env, node
-            )
-            return node
+            return (yield from self._stage("union", ctx, self._run_union(ctx, node)))
 
         # recursion based on type
         if node.get("type") == "object":
-            if is_pseudo_array:
-                node = self._run_pseudo_array(ctx, env, node, str(pattern))
+            if pseudo_pattern is not None:
+                steps = self._run_pseudo_array(ctx, node, pseudo_pattern)
+                node = yield from self._stage("pseudo_array", ctx, steps)
             else:
-                node = self._run_object(ctx, env, node)
+                node = yield from self._stage("object", ctx, self._run_object(ctx, node))
         elif node.get("type") == "array":
-            node = self._run_array(ctx, env, node)
+            node = yield from self._stage("array", ctx, self._run_array(ctx, node))
+
+        return node
+
+    def _stage(self, name: str, ctx: ProcessingContext, steps: LevelSteps) -> LevelSteps:
+        """Генератор этапа обхода; с профилированием — обёрнутый замером времени."""
+        if self._profile is None:
+            return steps
+        return _profiled_steps(self._profile, name, _ctx_size(ctx), steps)
 
-        logger.debug("Exiting _run_level: env=%s, node=%s", env, node)
+    def _level_steps(self, ctx: ProcessingContext, env: str, prev: dict) -> LevelSteps:
+        """Подготавливает уровень и возвращает генератор обхода его дочерних уровней."""
+        if self._profile is None and self._tracer is None:
+            node, pseudo_pattern = self._prepare_level(ctx, env, prev)
+            return self._run_children(ctx, node, pseudo_pattern)
+
+        start = perf_counter()
+        size = _ctx_size(ctx)
+        if self._tracer is not None:
+            self._tracer(TraceEvent("enter_level", env, size, start))
+        node, pseudo_pattern = self._prepare_level(ctx, env, prev)
+        if self._profile is not None:
+            self._profile.stage("level", perf_counter() - start, size)
+        steps = self._run_children(ctx, node, pseudo_pattern)
+        if self._tracer is None:
+            return steps
+        return _traced_steps(self._tracer, env, size, start, steps)
+
+    # ---------------- union ----------------
+
+    def _run_union(self, ctx: ProcessingContext, node: dict) -> LevelSteps:
+        new_of = []
+        for idx, alt in enumerate(node[self._base_of]):
+            trigger = alt.get("j2sElementTrigger")
+            alt_ctx = self._filter_ctx_by_trigger(ctx, trigger)
+            if isinstance(trigger, ElementTrigger) and alt_ctx is not ctx:
+                # Позиции триггера относятся к родительскому контексту:
+                # в подконтексте альтернативы он покрывает все элементы.
+                # Альтернатива принадлежит узлу и заменяется результатом, поэтому меняется на месте.
+                alt["j2sElementTrigger"] = ElementTrigger.full(alt_ctx, trigger.extra_ids)
+            processed_alt = yield alt_ctx, f"/{self._base_of}/{idx}", alt
+            new_of.append(processed_alt)
+        node[self._base_of] = new_of
         return node
 
+    def _within_budget(self, env: str, depth: int) -> bool:
+        """Можно ли строить уровень ``env`` на глубине ``depth`` в рамках бюджета запуска."""
+        return self._budget_state is None or self._budget_state.enter(env, depth)
+
+    def _run_level(self, ctx: ProcessingContext, env: str, prev: dict, depth: int = 0) -> dict:
+        """Рекурсивный движок обхода: дочерние уровни обрабатываются вложенными вызовами."""
+        if not self._within_budget(env, depth):
+            return dict(PERMISSIVE_SCHEMA)
+        key = self._memo_key(ctx, env, prev)
+        cached = self._memo_lookup(key, env)
+        if cached is not None:
+            return cached
+
+        mark = len(self._sampled)
+        steps = self._level_steps(ctx, env, prev)
+        try:
+            sub_ctx, segment, sub_prev = next(steps)
+            while True:
+                result: dict | Future[dict] | None = self._submit_subtree(
+                    sub_ctx, segment, env + segment, sub_prev
+                )
+                if result is None:
+                    result = self._run_level(sub_ctx, env + segment, sub_prev, depth + 1)
+                sub_ctx, segment, sub_prev = steps.send(result)
+        except StopIteration as stop:
+            built: dict = stop.value
+
+        self._memo_store(key, env, built, mark)
+        logger.debug("Exiting _run_level: env=%s", env)
+        return built
+
+    def _run_iterative(self, ctx: ProcessingContext, env: str, prev: dict) -> dict:
+        """
+        Итеративный движок обхода на явном стеке.
+
+        Даёт тот же результат, что и :meth:`_run_level`, но не упирается
+        в лимит рекурсии Python. Вместо строки ``env`` каждого уровня стек хранит
+        лишь её длину: все пути на стеке являются префиксами пути самого глубокого
+        уровня, поэтому в памяти держится одна строка, а не по строке на уровень.
+        """
+        if not self._within_budget(env, 0):
+            return dict(PERMISSIVE_SCHEMA)
+        key = self._memo_key(ctx, env, prev)
+        cached = self._memo_lookup(key, env)
+        if cached is not None:
+            return cached
+
+        path = env
+        # Уровень на стеке: его шаги, длина пути, ключ кеша и размер _sampled до уровня
+        stack: list[tuple[LevelSteps, int, Optional[bytes], int]] = [
+            (self._level_steps(ctx, env, prev), len(env), key, len(self._sampled))
+        ]
+        result: dict | Future[dict] | None = None
+
+        while stack:
+            steps, env_len, key, mark = stack[-1]
+            try:
+                sub_ctx, segment, sub_prev = steps.send(result)
+            except StopIteration as stop:
+                stack.pop()
+                result = stop.value
+                self._memo_store(key, path[:env_len], stop.value, mark)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Exiting _run_level: env=%s", path[:env_len])
+                continue
+
+            path = path[:env_len] + segment
+            if not self._within_budget(path, len(stack)):
+                result = dict(PERMISSIVE_SCHEMA)
+                continue
+            result = self._submit_subtree(sub_ctx, segment, path, sub_prev)
+            if result is not None:
+                continue
+            key = self._memo_key(sub_ctx, path, sub_prev)
+            result = self._memo_lookup(key, path)
+            if result is not None:
+                continue
+            mark = len(self._sampled)
+            stack.append((self._level_steps(sub_ctx, path, sub_prev), len(path), key, mark))
+
+        assert isinstance(result, dict)
+        return result
+
     # ---------------- object ----------------
 
-    def _run_object(self, ctx: ProcessingContext, env: str, node: dict) -> dict:
-        node = dict(node)
-        node.setdefault("properties", {})
+    def _run_object(self, ctx: ProcessingContext, node: dict) -> LevelSteps:
+        properties = node.setdefault("properties", {})
 
-        props = self._collect_prop_names(ctx.schemas, ctx.jsons)
-        for name in props:
-            s, j = self._gather_property_candidates(ctx.schemas, ctx.jsons, name)
-            sub_ctx = ProcessingContext(s, j, ctx.sealed)
-            node["properties"][name] = self._run_level(
-                sub_ctx, f"{env}/properties/{name}", node["properties"].get(name, {})
+        buckets = self._bucket_properties(ctx.schemas, ctx.jsons)
+        for name, bucket in buckets.items():
+            sub_ctx = self._property_ctx(name, bucket, ctx.sealed)
+            properties[name] = yield (
+                sub_ctx,
+                f"/properties/{name}",
+                properties.get(name, NO_PREV),
             )
 
-        if not node["properties"]:
-            node.pop("properties", None)
+        # Поддеревья, отправленные движком в пул, дожидаемся после обхода всех свойств
+        for name, value in properties.items():
+            if isinstance(value, Future):
+                properties[name] = value.result()
+
+        if not properties:
+            del node["properties"]
 
         return node
 
     # ---------------- pseudo array ----------------
 
-    def _run_pseudo_array(self, ctx: ProcessingContext, env: str, node: dict, pattern: str) -> dict:
-        node = dict(node)
-        node.setdefault("patternProperties", {})
-        _, items_ctx = self._split_array_ctx(ctx)
-        node["patternProperties"][pattern] = self._run_level(
-            items_ctx, f"{env}/patternProperties/{pattern}", {}
+    def _run_pseudo_array(self, ctx: ProcessingContext, node: dict, pattern: str) -> LevelSteps:
+        pattern_properties = node.setdefault("patternProperties", {})
+        items_ctx = self._items_ctx(ctx)
+        pattern_properties[pattern] = yield (
+            items_ctx,
+            f"/patternProperties/{pattern}",
+            NO_PREV,
         )
-        if not node["patternProperties"]:
-            node.pop("patternProperties", None)
+        if not pattern_properties:
+            del node["patternProperties"]
         return node
 
     # ---------------- array ----------------
 
-    def _run_array(self, ctx: ProcessingContext, env: str, node: dict) -> dict:
-        node = dict(node)
-        node.setdefault("items", {})
+    def _run_array(self, ctx: ProcessingContext, node: dict) -> LevelSteps:
+        prev_items = node.setdefault("items", NO_PREV)
 
-        _, items_ctx = self._split_array_ctx(ctx)
-        node["items"] = self._run_level(items_ctx, f"{env}/items", node.get("items", {}))
+        items_ctx = self._items_ctx(ctx)
+        node["items"] = yield items_ctx, "/items", prev_items
 
         return node
 
     # ---------------- entry ----------------
 
-    def run(self) -> dict:
-        ctx = ProcessingContext(self._schemas, self._jsons, sealed=False)
-        return self._run_level(ctx, "/", {})
+    def _subtree_size(self, ctx: ProcessingContext) -> int:
+        """Оценка объёма поддерева: значения контекста и элементы их контейнеров."""
+        return sum(
+            len(c) if isinstance(c, (list, dict)) else 1
+            for c in chain(iter_contents(ctx.schemas), iter_contents(ctx.jsons))
+        )
+
+    def _submit_subtree(
+        self, ctx: ProcessingContext, segment: str, env: str, prev: dict
+    ) -> Optional["Future[dict]"]:
+        """
+        Отправляет поддерево свойства в пул, если он активен и поддерево крупное.
+
+        Возвращает ``Future`` с результатом уровня или ``None``, если уровень нужно
+        обработать на месте. В пул попадают только запросы свойств объекта:
+        их соседние поддеревья независимы друг от друга.
+        """
+        if self._subtree_pool is None or not segment.startswith("/properties/"):
+            return None
+        if self._subtree_size(ctx) < self._subtree_threshold:
+            return None
+        pool, worker = self._subtree_pool
+        future: Future[dict] = Future()
+
+        def unpack(done: "Future[SubtreeResult]") -> None:
+            try:
+                node, sampled, profile = done.result()
+            except BaseException as e:
+                future.set_exception(e)
+                return
+            self._sampled.update(sampled)
+            if profile is not None:
+                # Профиль сливается в основном потоке после обхода, см. run()
+                self._subtree_profiles.append(profile)
+            future.set_result(node)
+
+        pool.submit(_run_subtree, worker, ctx, env, prev).add_done_callback(unpack)
+        return future
+
+    def _drops_triggers(self) -> bool:
+        """Удаляются ли ``j2sElementTrigger`` из результата (``strip_metadata`` или компаратор)."""
+        return self._strip_metadata or any(
+            isinstance(c, DeleteElement) and c.attribute == "j2sElementTrigger"
+            for c in self._comparators
+        )
+
+    def _summarize_parallel(self, workers: int) -> JsonSummary:
+        """
+        Строит сводку добавленных JSON в пуле процессов.
+
+        Документы делятся на последовательные части (по несколько на процесс
+        для выравнивания нагрузки), частичные сводки сливаются строго в порядке
+        частей, поэтому результат не зависит от порядка завершения процессов.
+        """
+        contents = [j.content for j in self._jsons]
+        size = -(-len(contents) // (workers * CHUNKS_PER_WORKER))
+        chunks = [contents[i : i + size] for i in range(0, len(contents), size)]
+        summary = JsonSummary(self._distinct_values())
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for state in pool.map(_summarize_chunk, chunks, [summary.limit] * len(chunks)):
+                summary.merge(JsonSummary.from_state(state))
+        return summary
+
+    def run(self, workers: Optional[int] = None, budget: Optional[RunBudget] = None) -> dict:
+        """
+        Строит схему по всем добавленным схемам и JSON.
+
+        :param workers: Число процессов для разбора добавленных JSON.
+        Каждый процесс сворачивает свою часть документов в сводку
+        (:mod:`genschema.summary`), сводки сливаются по порядку, и схема строится
+        по результату — так же, как в инкрементальном режиме. Результат идентичен
+        последовательному запуску. Параллельный разбор включается, только если
+        ``j2sElementTrigger`` удаляется из результата (``DeleteElement()``):
+        иначе id триггеров ссылались бы на элементы сводок, и запуск выполняется
+        последовательно.
+        :type workers: Optional[int]
+
+        :param budget: Пределы ресурсов запуска (:mod:`genschema.budget`): глубина,
+        число уровней, ширина объединений и время. Уровень сверх предела заменяется
+        разрешающей подсхемой ``{}``, отсечённые пути возвращает :meth:`truncated_paths`.
+        С бюджетом поддеревья не отправляются в пул (``parallel_subtrees``)
+        и кеш уровней (``memo_size``) не используется.
+        :type budget: Optional[RunBudget]
+        """
+        self._sampled = {}
+        self._truncated = {}
+        self._profile = RunProfile() if self._profiling else None
+        self._subtree_profiles = []
+        jsons: Sequence[Resource] = self._jsons
+        summarized = True
+        if self._summary is not None:
+            jsons = self._summary.representatives()
+        elif workers is not None and workers > 1 and len(jsons) > 1 and self._drops_triggers():
+            jsons = self._summarize_parallel(workers).representatives()
+        else:
+            summarized = False
+        ctx = ProcessingContext(self._schemas, jsons, sealed=False)
+        if budget is not None:
+            self._budget_state = BudgetState(budget)
+        try:
+            # Отсечённые уровни зависят от расхода бюджета, а не от содержимого, а дайджест
+            # представителей сводки не учитывает саму сводку: в обоих случаях кеш не используется
+            if self._memo is None or not self._drops_triggers() or budget is not None or summarized:
+                return self._run_root(ctx)
+
+            # Дайджесты содержимого живут один запуск: между запусками данные могут измениться.
+            # Результат копируется, чтобы правки вызывающего кода не попали в кеш.
+            self._digest = ContentDigest()
+            return copy_node(self._run_root(ctx))
+        finally:
+            self._digest = None
+            self._pseudo_cache = {}
+            if self._budget_state is not None:
+                self._truncated = self._budget_state.truncated
+                self._budget_state = None
+            if self._profile is not None:
+                for profile in self._subtree_profiles:
+                    self._profile.merge(profile)
+                self._subtree_profiles = []
+
+    def memo_stats(self) -> dict[str, int]:
+        """
+        Счётчики кеша результатов уровней (параметр ``memo_size``):
+        ``hits``, ``misses``, ``size`` и ``maxsize``. Без кеша — пустой словарь.
+        """
+        if self._memo is None:
+            return {}
+        return {
+            "hits": self._memo.hits,
+            "misses": self._memo.misses,
+            "size": len(self._memo),
+            "maxsize": self._memo.maxsize,
+        }
+
+    def _run_root(self, ctx: ProcessingContext) -> dict:
+        """Обрабатывает корневой уровень, при необходимости с пулом для поддеревьев."""
+        # Расход бюджета ведётся в одном месте, а события трассы идут по порядку,
+        # поэтому с бюджетом или приёмником трассы поддеревья строятся на месте
+        if (
+            self._parallel_subtrees is None
+            or self._budget_state is not None
+            or self._tracer is not None
+        ):
+            return self._run_subtree(ctx, "/", NO_PREV)
+
+        # Копия без данных и без пула обрабатывает поддеревья в исполнителях:
+        # вложенные поддеревья внутри исполнителя в пул не отправляются.
+        worker = copy.copy(self)
+        worker._schemas = []
+        worker._jsons = []
+        worker._summary = None
+        worker._parallel_subtrees = None
+        worker._sampled = {}
+        worker._pseudo_cache = {}
+        worker._profile = None if self._profile is None else RunProfile()
+        pool_type = (
+            ThreadPoolExecutor if self._parallel_subtrees == "thread" else ProcessPoolExecutor
+        )
+        with pool_type(max_workers=self._subtree_workers) as pool:
+            self._subtree_pool = (pool, worker)
+            try:
+                return self._run_subtree(ctx, "/", NO_PREV)
+            finally:
+                self._subtree_pool = None
+
+    def _run_subtree(self, ctx: ProcessingContext, env: str, prev: dict) -> dict:
+        """Обрабатывает уровень и всё его поддерево выбранным движком."""
+        if self._engine == "iterative":
+            return self._run_iterative(ctx, env, prev)
+        return self._run_level(ctx, env, prev)
+
+    def schema(self, budget: Optional[RunBudget] = None) -> dict:
+        """
+        Схема по всем данным, добавленным к текущему моменту.
+
+        В инкрементальном режиме строится по сводкам и не перечитывает документы,
+        поэтому её можно запрашивать после каждого ``add_json``.
+        В обычном режиме равносильна :meth:`run`.
+        """
+        return self.run(budget=budget)
+
+    def stats(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """
+        Профиль последнего построения схемы (параметр ``profile``).
+
+        ``{"comparators": {имя: {...}}, "stages": {этап: {...}}}``: для каждого
+        компаратора — ``calls`` (проверок ``can_process``), ``applied``, ``seconds``
+        и ``resources`` (ресурсов уровня при применении), для каждого этапа обхода —
+        ``calls``, ``seconds`` и ``resources``. Этапы описаны в :class:`RunProfile`.
+        Без профилирования — пустой словарь.
+        """
+        if self._profile is None:
+            return {}
+        return self._profile.as_dict()
+
+    def truncated_paths(self) -> dict[str, str]:
+        """
+        Уровни, отсечённые бюджетом при последнем построении схемы.
+
+        Ключ — путь уровня, значение — причина: ``"max_depth"``, ``"max_nodes"``,
+        ``"max_union_width"`` или ``"deadline"``. Без бюджета — пустой словарь.
+        """
+        return dict(self._truncated)
+
+    def sampling_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Сколько элементов массивов рассмотрено при последнем построении схемы.
+
+        Ключ — путь уровня элементов (``.../items`` или ``.../patternProperties/...``),
+        значение — ``{"examined": ..., "total": ...}``. В словарь попадают только
+        массивы, обработанные по выборке (см. параметр ``sampling``).
+        """
+        return {
+            env: {"examined": examined, "total": total}
+            for env, (examined, total) in self._sampled.items()
+        }
+
+
+def _node_type(node: dict) -> Optional[str]:
+    """Ключ таблицы компараторов: строковый ``type`` узла или ``None``."""
+    t = node.get("type")
+    return t if isinstance(t, str) else None
+
+
+def _ctx_size(ctx: ProcessingContext) -> int:
+    """Число ресурсов контекста для профиля."""
+    return len(ctx.schemas) + len(ctx.jsons)
+
+
+def _profiled_steps(
+    profile: RunProfile, name: str, resources: int, steps: LevelSteps
+) -> LevelSteps:
+    """Проводит запросы этапа ``steps`` и учитывает его время без времени дочерних уровней."""
+    elapsed = 0.0
+    result: Optional[dict | Future[dict]] = None
+    while True:
+        start = perf_counter()
+        try:
+            request = steps.send(result)
+        except StopIteration as stop:
+            profile.stage(name, elapsed + perf_counter() - start, resources)
+            built: dict = stop.value
+            return built
+        elapsed += perf_counter() - start
+        result = yield request
+
+
+def _traced_steps(
+    tracer: Tracer, env: str, elements: int, start: float, steps: LevelSteps
+) -> LevelSteps:
+    """Проводит запросы уровня ``steps`` и по его завершении отдаёт ``exit_level``."""
+    built: dict = yield from steps
+    end = perf_counter()
+    tracer(TraceEvent("exit_level", env, elements, end, end - start))
+    return built
+
+
+def _run_subtree(
+    converter: Converter, ctx: ProcessingContext, env: str, prev: dict
+) -> SubtreeResult:
+    """
+    Обработка поддерева в исполнителе пула (``parallel_subtrees``).
+
+    Вместе с узлом возвращает статистику выборки и профиль поддерева:
+    из пула процессов они иначе не вернутся.
+    """
+    # Исполнитель из пула потоков общий, поэтому статистика собирается в своей копии
+    converter = copy.copy(converter)
+    converter._sampled = {}
+    if converter._profile is not None:
+        converter._profile = RunProfile()
+    node = converter._run_subtree(ctx, env, prev)
+    return node, converter._sampled, converter._profile
+
+
+def _summarize_chunk(documents: list, limit: int) -> dict:
+    """Сводка части документов для параллельного :meth:`Converter.run` (выполняется в процессе)."""
+    summary = JsonSummary(limit)
+    for document in documents:
+        summary.add(document)
+    return summary.to_state()
+
+
+def _summarize_files(
+    paths: list[str],
+    limit: int,
+    json_backend: JsonBackend,
+    jsonl: Optional[bool],
+    skip_invalid_lines: bool,
+) -> tuple[dict, dict[str, Any]]:
+    """
+    Сводка и отчёт части файлов для параллельного :meth:`Converter.add_json_files`
+    (выполняется в процессе).
+    """
+    converter = Converter(incremental=True, json_backend=json_backend)
+    converter._summary = JsonSummary(limit)
+    report = converter._add_files(paths, jsonl, skip_invalid_lines)
+    return converter._summary.to_state(), report
+
+
+def _files_report() -> dict[str, Any]:
+    return {"files": 0, "instances": 0, "skipped_lines": 0, "errors": {}}
+
+
+def _merge_files_reports(report: dict[str, Any], other: dict[str, Any]) -> None:
+    for key in ("files", "instances", "skipped_lines"):
+        report[key] += other[key]
+    report["errors"].update(other["errors"])
+
+
+def _batched(items: Iterable[str], size: int) -> Iterator[list[str]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def merge_states(states: Iterable[dict]) -> dict:
+    """
+    Объединяет частичные состояния :meth:`Converter.export_state` без создания конвертера.
+
+    Результат — состояние того же вида, эквивалентное одному конвертеру,
+    в который данные всех состояний добавлены по порядку. Операция ассоциативна,
+    поэтому состояния можно сводить попарно в любом порядке группировки
+    (например, деревом редукции по процессам).
+    """
+    result: Optional[dict] = None
+    summary: Optional[JsonSummary] = None
+    for state in states:
+        if result is None:
+            result = {key: value for key, value in state.items() if key != "summary"}
+            result["schemas"] = list(state["schemas"])
+            if "jsons" in state:
+                result["jsons"] = list(state["jsons"])
+        elif state["incremental"] != result["incremental"]:
+            raise ValueError("Cannot merge states of incremental and batch converters.")
+        else:
+            result["schemas"].extend(state["schemas"])
+            if "jsons" in state:
+                result["jsons"].extend(state["jsons"])
+
+        if state.get("summary") is not None:
+            other = JsonSummary.from_state(state["summary"])
+            if summary is None:
+                summary = other
+            else:
+                summary.merge(other)
+
+    if result is None:
+        raise ValueError("No states to merge.")
+    if result["incremental"]:
+        result["summary"] = None if summary is None else summary.to_state()
+    return result
@@ -0,0 +1,108 @@
+"""
+Профилирование построения схемы.
+
+:class:`RunProfile` копит по компараторам и этапам обхода число вызовов,
+суммарное время и число обработанных ресурсов (схем и JSON-значений уровня).
+``Converter(profile=True)`` заполняет его во время ``run()``, результат
+возвращает ``Converter.stats()``. Без профилирования ``Converter`` не создаёт
+профиль, и замеры не выполняются.
+"""
+
+from typing import Any, Optional
+
+
+class ProfileEntry:
+    """Счётчики одного компаратора или этапа."""
+
+    __slots__ = ("calls", "applied", "seconds", "resources")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.applied = 0
+        self.seconds = 0.0
+        self.resources = 0
+
+    def merge(self, other: "ProfileEntry") -> None:
+        self.calls += other.calls
+        self.applied += other.applied
+        self.seconds += other.seconds
+        self.resources += other.resources
+
+
+class RunProfile:
+    """
+    Профиль одного запуска.
+
+    Этапы обхода: ``level`` — подготовка уровня вместе с компараторами,
+    ``object``, ``array``, ``pseudo_array`` и ``union`` — обход дочерних уровней
+    без времени самих дочерних уровней, ``split_array`` — сбор элементов массивов
+    (входит в ``array`` и ``pseudo_array``).
+    """
+
+    __slots__ = ("comparators", "stages")
+
+    def __init__(self) -> None:
+        self.comparators: dict[str, ProfileEntry] = {}
+        self.stages: dict[str, ProfileEntry] = {}
+
+    def comparator(self, name: str, seconds: float, applied: bool, resources: int) -> None:
+        """Учитывает вызов компаратора: ``can_process`` и, если он вернул истину, ``process``."""
+        entry = self.comparators.get(name)
+        if entry is None:
+            entry = self.comparators[name] = ProfileEntry()
+        entry.calls += 1
+        entry.seconds += seconds
+        if applied:
+            entry.applied += 1
+            entry.resources += resources
+
+    def stage(self, name: str, seconds: float, resources: int) -> None:
+        """Учитывает один проход этапа обхода."""
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = ProfileEntry()
+        entry.calls += 1
+        entry.seconds += seconds
+        entry.resources += resources
+
+    def merge(self, other: "RunProfile") -> None:
+        """Добавляет счётчики профиля поддерева, построенного в пуле."""
+        for mine, theirs in ((self.comparators, other.comparators), (self.stages, other.stages)):
+            for name, entry in theirs.items():
+                target = mine.get(name)
+                if target is None:
+                    target = mine[name] = ProfileEntry()
+                target.merge(entry)
+
+    def as_dict(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Счётчики в виде словарей ``{"comparators": {...}, "stages": {...}}``."""
+        return {
+            "comparators": {
+                name: {
+                    "calls": e.calls,
+                    "applied": e.applied,
+                    "seconds": e.seconds,
+                    "resources": e.resources,
+                }
+                for name, e in self.comparators.items()
+            },
+            "stages": {
+                name: {"calls": e.calls, "seconds": e.seconds, "resources": e.resources}
+                for name, e in self.stages.items()
+            },
+        }
+
+
+def profile_rows(stats: dict) -> list[tuple[str, str, int, Optional[int], float, int]]:
+    """
+    Строки таблицы профиля из :meth:`RunProfile.as_dict`: ``(вид, имя, вызовы,
+    применения, секунды, ресурсы)``, по убыванию времени внутри вида.
+    """
+    rows: list[tuple[str, str, int, Optional[int], float, int]] = []
+    for kind in ("stages", "comparators"):
+        entries = stats.get(kind, {})
+        for name, e in sorted(entries.items(), key=lambda item: -item[1]["seconds"]):
+            rows.append(
+                (kind[:-1], name, e["calls"], e.get("applied"), e["seconds"], e["resources"])
+            )
+    return rows
@@ -1,23 +1,66 @@
-from typing import Optional
+from typing import NamedTuple, Optional
 
 from .comparators.template import ProcessingContext
 
 
+class PseudoArrayDecision(NamedTuple):
+    """Решение обработчика для набора ключей объекта."""
+
+    is_pseudo_array: bool
+    pattern: Optional[str]
+    order: Optional[list[str]]
+    """Ключи в порядке элементов псевдомассива (только если он распознан)."""
+
+
+NOT_PSEUDO_ARRAY = PseudoArrayDecision(False, None, None)
+
+
+def _element_rank(key: str) -> int:
+    return int(key) if key.isdigit() else -1
+
+
 class PseudoArrayHandlerBase:
+    keys_only = False
+    """
+    Решение зависит только от набора ключей, а не от контекста. Тогда ``Converter``
+    кеширует :meth:`classify` по набору ключей в пределах запуска.
+    """
+
     def is_pseudo_array(
         self, keys: list[str], ctx: ProcessingContext
     ) -> tuple[bool, Optional[str]]:
         return False, None
 
+    def classify(self, keys: list[str], ctx: ProcessingContext) -> PseudoArrayDecision:
+        """
+        Решение вместе с порядком элементов. ``keys`` отсортированы.
+
+        По умолчанию вызывает :meth:`is_pseudo_array` и упорядочивает ключи
+        по их числовому значению; нечисловые ключи идут первыми.
+        """
+        is_pseudo_array, pattern = self.is_pseudo_array(keys, ctx)
+        if not is_pseudo_array:
+            return NOT_PSEUDO_ARRAY
+        return PseudoArrayDecision(True, pattern, sorted(keys, key=_element_rank))
+
 
 class PseudoArrayHandler(PseudoArrayHandlerBase):
+    keys_only = True
+
     def is_pseudo_array(
         self, keys: list[str], ctx: ProcessingContext
     ) -> tuple[bool, Optional[str]]:
+        decision = self.classify(keys, ctx)
+        return decision.is_pseudo_array, decision.pattern
+
+    def classify(self, keys: list[str], ctx: ProcessingContext) -> PseudoArrayDecision:
         if not keys:
-            return False, None
+            return NOT_PSEUDO_ARRAY
         try:
-            [int(k) for k in keys]
-            return True, "^[0-9]+$"
+            numbers = [int(k) for k in keys]
         except ValueError:
-            return False, None
+            return NOT_PSEUDO_ARRAY
+        # Числа разобраны один раз: порядок строится по ним же
+        ranks = [n if k.isdigit() else -1 for n, k in zip(numbers, keys)]
+        order = [keys[i] for i in sorted(range(len(keys)), key=ranks.__getitem__)]
+        return PseudoArrayDecision(True, "^[0-9]+$", order)
@@ -0,0 +1,121 @@
+"""
+Выборочная обработка элементов больших массивов.
+
+:class:`SamplingPolicy` решает, какие элементы массива (или псевдомассива)
+передать на дочерний уровень ``Converter``. Массивы не длиннее ``threshold``
+обрабатываются целиком; у более длинных берётся выборка, к которой всегда
+добавляются первые и последние ``keep_first``/``keep_last`` элементов
+и свидетели, найденные дешёвым предварительным проходом:
+
+- первый элемент каждого класса: тип JSON, формат строки и пустота контейнера,
+  поэтому варианты ``type`` и ``format`` не теряются;
+- объекты, которые расширяют объединение ключей или сужают их пересечение,
+  поэтому ``properties`` и ``required`` элементов те же, что без выборки;
+- первые вхождения первых ``distinct_values`` различных строк каждого формата —
+  столько, сколько нужно компараторам (``Comparator.distinct_values``, например ``enum``).
+
+Значения глубже самих элементов (свойства объектов, элементы вложенных массивов)
+берутся только из выбранных элементов.
+"""
+
+import random
+from dataclasses import dataclass
+from typing import Any, Hashable, Iterable, Literal, Optional
+
+from .comparators.format import FormatDetector
+from .comparators.type import infer_json_type
+
+
+def item_class(value: Any) -> Hashable:
+    """Класс элемента для предварительного прохода: тип, формат строки, пустота контейнера."""
+    t = infer_json_type(value)
+    if t == "string":
+        return t, FormatDetector.detect(value)
+    if t == "array" or t == "object":
+        return t, not value
+    return t
+
+
+@dataclass
+class SamplingPolicy:
+    """
+    Политика выборки элементов массивов для ``Converter(sampling=...)``.
+
+    ``"reservoir"`` — равномерная случайная выборка ``sample_size`` элементов
+    (длина массива известна заранее, поэтому она строится без прохода-резервуара,
+    но с тем же распределением). ``"stratified"`` — по одному случайному элементу
+    из каждой из ``sample_size`` равных частей массива.
+    Выборка детерминирована при фиксированном ``seed``.
+    """
+
+    threshold: int = 10_000
+    """Массивы с числом элементов не больше порога обрабатываются целиком."""
+
+    sample_size: int = 1_000
+    """Размер случайной части выборки."""
+
+    keep_first: int = 0
+    """Сколько первых элементов оставлять всегда."""
+
+    keep_last: int = 0
+    """Сколько последних элементов оставлять всегда."""
+
+    method: Literal["reservoir", "stratified"] = "reservoir"
+
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.method not in ("reservoir", "stratified"):
+            raise ValueError(f"Unknown sampling method: {self.method!r}")
+
+    def select(self, contents: Iterable[Any], total: int, distinct_values: int = 0) -> list[int]:
+        """
+        Возвращает отсортированные позиции элементов, которые нужно обработать.
+
+        :param contents: Значения элементов (для предварительного прохода по классам).
+        :param total: Число элементов.
+        :param distinct_values: Сколько первых различных строк каждого формата
+        оставить в выборке.
+        """
+        if total <= self.threshold:
+            return list(range(total))
+
+        keep: set[int] = set(range(min(self.keep_first, total)))
+        keep.update(range(max(total - self.keep_last, 0), total))
+
+        seen: set[Hashable] = set()
+        union: set[str] = set()
+        intersection: Optional[set[str]] = None
+        strings: dict[Hashable, set[str]] = {}
+        for position, value in enumerate(contents):
+            cls = item_class(value)
+            if cls not in seen:
+                seen.add(cls)
+                keep.add(position)
+            if isinstance(value, dict):
+                # Объект нужен, если без него объединение или пересечение ключей было бы другим
+                if intersection is None:
+                    intersection = set(value)
+                elif union.issuperset(value) and intersection.issubset(value):
+                    continue
+                else:
+                    intersection.intersection_update(value)
+                union.update(value)
+                keep.add(position)
+            elif isinstance(value, str) and distinct_values:
+                values = strings.setdefault(cls, set())
+                if len(values) < distinct_values and value not in values:
+                    values.add(value)
+                    keep.add(position)
+
+        rnd = random.Random(self.seed)
+        size = min(self.sample_size, total)
+        if self.method == "reservoir":
+            keep.update(rnd.sample(range(total), size))
+        elif size:
+            for stratum in range(size):
+                start = stratum * total // size
+                stop = (stratum + 1) * total // size
+                keep.add(rnd.randrange(start, stop))
+
+        return sorted(keep)
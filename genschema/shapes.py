@@ -0,0 +1,104 @@
+"""
+Интернирование форм значений уровня.
+
+Компараторы уровня смотрят только на «форму» значения на этом уровне: тип,
+набор ключей объекта, пустоту массива и само значение строки. Значения
+с одинаковой формой дают компараторам одинаковые свидетельства, поэтому
+уровень можно обработать по одному представителю каждой формы, а затем
+развернуть триггеры представителей на все значения группы.
+Форма поддерева складывается из форм его уровней: дочерние уровни строятся
+по всем значениям и интернируются заново.
+"""
+
+from typing import Any, Hashable, Optional, cast
+
+from .comparators.template import (
+    ContextPartition,
+    ElementTrigger,
+    ItemView,
+    ProcessingContext,
+    iter_contents,
+)
+
+
+def level_shape(value: Any) -> Hashable:
+    """
+    Ключ формы значения на текущем уровне.
+
+    Строки различаются по значению (оно нужно форматам и enum), объекты —
+    по кортежу ключей, массивы — по пустоте, прочие скаляры — по Python-типу.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return "object", tuple(value)
+    if isinstance(value, list):
+        return "array", not value
+    return cast(Hashable, type(value))
+
+
+class ShapeGroups:
+    """
+    Группы значений ``ctx.jsons`` с одинаковой формой уровня.
+
+    ``ctx`` — контекст из схем исходного контекста и первых значений каждой
+    группы (в порядке первого появления), ``source`` — исходный контекст.
+    """
+
+    __slots__ = ("source", "ctx", "members")
+
+    def __init__(self, source: ProcessingContext):
+        groups: dict[Hashable, list[int]] = {}
+        for position, value in enumerate(iter_contents(source.jsons)):
+            key = level_shape(value)
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [position]
+            else:
+                group.append(position)
+
+        self.source = source
+        self.members = list(groups.values())
+        firsts = [group[0] for group in self.members]
+        jsons = source.jsons
+        if isinstance(jsons, ItemView):
+            self.ctx = ProcessingContext(source.schemas, jsons.subset(firsts), source.sealed)
+        else:
+            self.ctx = ProcessingContext(source.schemas, [jsons[p] for p in firsts], source.sealed)
+
+    @classmethod
+    def of(cls, ctx: ProcessingContext) -> Optional["ShapeGroups"]:
+        """Группы контекста или ``None``, если все формы различны и выигрыша нет."""
+        groups = cls(ctx)
+        if len(groups.members) == len(ctx.jsons):
+            return None
+        return groups
+
+    def reduce(self, trigger: ElementTrigger) -> Optional[ElementTrigger]:
+        """
+        Переносит триггер исходного контекста на контекст представителей.
+
+        Возможно, только если триггер покрывает весь исходный контекст
+        (так выглядят триггеры, переданные альтернативе); иначе ``None``.
+        """
+        source = self.source
+        total = len(source.schemas) + len(source.jsons)
+        if trigger.ctx is not source or trigger.bits != (1 << total) - 1:
+            return None
+        return ElementTrigger.full(self.ctx, trigger.extra_ids)
+
+    def expand(self, trigger: ElementTrigger) -> ElementTrigger:
+        """Разворачивает триггер контекста представителей на все значения групп."""
+        split = len(self.ctx.schemas)
+        if trigger.bits == (1 << (split + len(self.members))) - 1:
+            return ElementTrigger.full(self.source, trigger.extra_ids)
+        positions = []
+        for p in trigger.positions:
+            if p < split:
+                positions.append(p)
+            else:
+                positions.extend(split + member for member in self.members[p - split])
+        # Подконтекст альтернативы строится сразу по развёрнутым позициям
+        partition = ContextPartition(self.source)
+        partition.groups[None] = sorted(positions)
+        return partition.trigger(None, trigger.extra_ids)
@@ -0,0 +1,175 @@
+"""
+Потоковое чтение больших JSON-файлов.
+
+:func:`iter_json_array` разбирает файл по частям и отдаёт элементы массива
+верхнего уровня по одному, не держа в памяти ни весь текст, ни весь массив:
+в буфере живут только непрочитанный остаток очередного блока и текущий элемент.
+Разбор элементов выполняет ``json.JSONDecoder.raw_decode``, поэтому
+значения совпадают с результатом ``json.load``.
+
+:func:`iter_json_lines` так же по одному отдаёт документы JSON Lines (NDJSON).
+"""
+
+import codecs
+import json
+import re
+from typing import IO, Any, Callable, Iterator, Optional
+
+InvalidLineHandler = Callable[[int, ValueError], None]
+"""Обработчик некорректной строки JSON Lines: номер строки (с единицы) и ошибка разбора."""
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+"""Размер блока чтения в символах (байтах для двоичных файлов)."""
+
+JSON_LINES_SUFFIXES = (".jsonl", ".ndjson")
+"""Расширения файлов JSON Lines."""
+
+_NON_WS = re.compile(r"[^ \t\n\r]")
+_NUMBER_TAIL = re.compile(r"[0-9eE.+-]*\Z")
+
+
+class _Reader:
+    """Буфер поверх ``read()`` текстового или двоичного (UTF-8) файла."""
+
+    def __init__(self, fp: IO, chunk_size: int):
+        self._read: Callable[[int], Any] = fp.read
+        self._chunk_size = chunk_size
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+        self._decode = json.JSONDecoder().raw_decode
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self, size: int) -> bool:
+        """
+        Отбрасывает прочитанное и дочитывает не меньше ``size`` символов
+        (или до конца файла). ``False``, если файл уже дочитан.
+        """
+        if self.eof:
+            return False
+        chunks = [self.buf[self.pos :]]
+        read = 0
+        while read < size:
+            data = self._read(self._chunk_size)
+            if isinstance(data, bytes):
+                if self._decoder is None:
+                    self._decoder = codecs.getincrementaldecoder("utf-8")()
+                text = self._decoder.decode(data, final=not data)
+            else:
+                text = data
+            chunks.append(text)
+            read += len(text)
+            if not data:
+                self.eof = True
+                break
+        self.buf = "".join(chunks)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Следующий символ после пробелов (позиция встаёт на него); ``""`` в конце файла."""
+        while True:
+            match = _NON_WS.search(self.buf, self.pos)
+            if match is not None:
+                self.pos = match.start()
+                return self.buf[self.pos]
+            self.pos = len(self.buf)
+            if not self.more(self._chunk_size):
+                return ""
+
+    def value(self) -> Any:
+        """Разбирает очередное значение, дочитывая файл, пока значение не завершится."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Значение могло оборваться на границе блока. Буфер растёт
+                # не меньше чем вдвое, поэтому повторных разборов немного.
+                if not self.more(len(self.buf) - self.pos + self._chunk_size):
+                    raise
+                continue
+            # Число, дошедшее до конца буфера, могло продолжаться в следующем блоке:
+            # ``raw_decode`` разбирает "1." как 1, а "1e" как 1
+            if (
+                isinstance(value, (int, float))
+                and _NUMBER_TAIL.match(self.buf, end) is not None
+                and self.more(self._chunk_size)
+            ):
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(fp: IO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Отдаёт элементы JSON-массива верхнего уровня из файла ``fp`` по одному.
+
+    ``fp`` — текстовый файл или двоичный в UTF-8. Ошибки синтаксиса поднимают
+    ``ValueError`` (``json.JSONDecodeError`` — внутри элемента) в момент,
+    когда до них дошёл разбор, то есть после уже отданных элементов.
+
+    :param chunk_size: Размер блока чтения.
+    :raises ValueError: Значение верхнего уровня не массив или JSON некорректен.
+    """
+    reader = _Reader(fp, chunk_size)
+    if reader.peek() != "[":
+        raise ValueError("Top-level JSON value is not an array.")
+    reader.pos += 1
+
+    if reader.peek() == "]":
+        reader.pos += 1
+    else:
+        while True:
+            yield reader.value()
+            delimiter = reader.peek()
+            reader.pos += 1
+            if delimiter == "]":
+                break
+            if delimiter != ",":
+                found = repr(delimiter) if delimiter else "end of input"
+                raise ValueError(f"Expected ',' or ']' in the top-level array, got {found}.")
+
+    if reader.peek():
+        raise ValueError("Extra data after the top-level JSON array.")
+
+
+def iter_json_lines(
+    fp: IO,
+    on_invalid: Optional[InvalidLineHandler] = None,
+    loads: Callable[[Any], Any] = json.loads,
+) -> Iterator[Any]:
+    """
+    Отдаёт документы JSON Lines (NDJSON) из файла ``fp`` по одному.
+
+    Каждая непустая строка — отдельный документ; строки читаются буферизованно
+    по мере разбора. ``fp`` — двоичный файл в UTF-8 или текстовый файл.
+    Двоичный файл декодируется построчно, поэтому строка с некорректным UTF-8 —
+    такая же некорректная строка, как и строка с ошибкой синтаксиса. Текстовый
+    поток декодирует блоками, и после ошибки декодирования читать его дальше
+    нельзя: она поднимается как ``ValueError`` даже с ``on_invalid``.
+
+    :param on_invalid: Обработчик некорректных строк. Без него такая строка
+    поднимает ``ValueError`` с её номером, с ним — передаётся обработчику и пропускается.
+    :param loads: Разбор строки, например ``JsonBackend.loads``.
+    """
+    lines = enumerate(fp, 1)
+    number = 0
+    while True:
+        try:
+            number, line = next(lines)
+        except StopIteration:
+            return
+        except UnicodeDecodeError as e:
+            raise ValueError(
+                f"Cannot decode text input after line {number}: {e}. "
+                "Open the file in binary mode to skip such lines."
+            ) from e
+        if not line.strip():
+            continue
+        try:
+            yield loads(line.decode("utf-8") if isinstance(line, bytes) else line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            if on_invalid is None:
+                raise ValueError(f"Invalid JSON on line {number}: {e}") from e
+            on_invalid(number, e)
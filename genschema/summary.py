@@ -0,0 +1,415 @@
+"""
+Накопительные сводки JSON-данных для инкрементального режима ``Converter``.
+
+Вместо хранения документов каждый путь схемы держит :class:`NodeSummary`:
+встреченные типы с моментом первого появления, первые различные строковые
+значения каждого класса формата, число объектов и массивов (в том числе пустых)
+и дочерние сводки свойств и элементов. Моменты появления (``stamp``) — номера
+элементов в порядке обхода документов в глубину, поэтому порядок элементов
+любого уровня пакетного ``run()`` совпадает с порядком их ``stamp``.
+
+Для построения схемы сводка превращается в небольшой набор
+:class:`Representative` — ресурсов, на которых обычный конвейер компараторов
+принимает те же решения, что и на полных данных. Дочерние уровни таких ресурсов
+строятся не из их содержимого, а из дочерних сводок.
+"""
+
+from typing import Any, Iterable, Optional
+
+from .comparators.format import FormatDetector
+from .comparators.template import Resource
+from .comparators.type import infer_json_type
+
+
+def pseudo_key_order(keys: Iterable[str]) -> list[str]:
+    """Порядок ключей словаря, в котором ``Converter`` выдаёт элементы псевдомассива."""
+    ordered = sorted(keys)
+    if any(key.isdigit() for key in ordered):
+        ordered.sort(key=lambda k: int(k) if k.isdigit() else -1)
+    return ordered
+
+
+class NodeSummary:
+    """Сводка всех JSON-значений, встреченных по одному пути."""
+
+    __slots__ = (
+        "count",
+        "first",
+        "strings",
+        "objects",
+        "empty_objects",
+        "properties",
+        "arrays",
+        "empty_arrays",
+        "items",
+    )
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.first: dict[str, tuple[int, Any]] = {}
+        """Тип -> (stamp первого значения, первое скалярное значение)."""
+        self.strings: dict[Optional[str], dict[str, int]] = {}
+        """Класс формата -> различные строки и stamp их первого появления."""
+        self.objects = 0
+        self.empty_objects = 0
+        self.properties: dict[str, NodeSummary] = {}
+        self.arrays = 0
+        self.empty_arrays = 0
+        self.items: Optional[NodeSummary] = None
+
+    def fold(self, value: Any, clock: int, limit: int) -> int:
+        """
+        Добавляет значение вместе со всем его поддеревом.
+
+        ``clock`` — stamp, который получит ``value``; возвращается следующий
+        свободный stamp. Для каждого класса формата хранится не более ``limit``
+        различных строк. Обход идёт на явном стеке и не ограничен глубиной рекурсии.
+        """
+        stack: list[tuple[NodeSummary, Any]] = [(self, value)]
+        while stack:
+            node, value = stack.pop()
+            stamp = clock
+            clock += 1
+            node.count += 1
+
+            t = infer_json_type(value)
+            if t not in node.first:
+                node.first[t] = (stamp, None if t in ("array", "object") else value)
+
+            if t == "string":
+                fmt = FormatDetector.detect(value)
+                values = node.strings.get(fmt)
+                if values is None:
+                    values = node.strings[fmt] = {}
+                if len(values) < limit and value not in values:
+                    values[value] = stamp
+            elif t == "object":
+                node.objects += 1
+                if not value:
+                    node.empty_objects += 1
+                    continue
+                children = []
+                for key in pseudo_key_order(value):
+                    child = node.properties.get(key)
+                    if child is None:
+                        child = node.properties[key] = NodeSummary()
+                    children.append((child, value[key]))
+                children.reverse()
+                stack.extend(children)
+            elif t == "array":
+                node.arrays += 1
+                if not value:
+                    node.empty_arrays += 1
+                    continue
+                if node.items is None:
+                    node.items = NodeSummary()
+                items = node.items
+                stack.extend((items, item) for item in reversed(value))
+        return clock
+
+    def absorb(self, other: "NodeSummary", offset: int = 0, limit: Optional[int] = None) -> None:
+        """
+        Вливает ``other`` в эту сводку, сдвигая его stamp на ``offset``.
+
+        ``other`` не изменяется. Если задан ``limit``, строковые классы
+        обрезаются до первых ``limit`` значений — так же, как при :meth:`fold`.
+        """
+        stack: list[tuple[NodeSummary, NodeSummary]] = [(self, other)]
+        while stack:
+            node, source = stack.pop()
+            node.count += source.count
+
+            for t, (stamp, value) in source.first.items():
+                current = node.first.get(t)
+                if current is None or stamp + offset < current[0]:
+                    node.first[t] = (stamp + offset, value)
+
+            for fmt, values in source.strings.items():
+                merged = node.strings.get(fmt)
+                if merged is None:
+                    merged = node.strings[fmt] = {}
+                for value, stamp in values.items():
+                    current_stamp = merged.get(value)
+                    if current_stamp is None or stamp + offset < current_stamp:
+                        merged[value] = stamp + offset
+                if limit is not None and len(merged) > limit:
+                    kept = sorted(merged.items(), key=lambda item: item[1])[:limit]
+                    node.strings[fmt] = dict(kept)
+
+            node.objects += source.objects
+            node.empty_objects += source.empty_objects
+            for key, child in source.properties.items():
+                target = node.properties.get(key)
+                if target is None:
+                    target = node.properties[key] = NodeSummary()
+                stack.append((target, child))
+
+            node.arrays += source.arrays
+            node.empty_arrays += source.empty_arrays
+            if source.items is not None:
+                if node.items is None:
+                    node.items = NodeSummary()
+                stack.append((node.items, source.items))
+
+    def truncate(self, limit: int) -> None:
+        """Оставляет во всех узлах не более ``limit`` первых строк на класс формата."""
+        stack: list[NodeSummary] = [self]
+        while stack:
+            node = stack.pop()
+            for fmt, values in node.strings.items():
+                if len(values) > limit:
+                    kept = sorted(values.items(), key=lambda item: item[1])[:limit]
+                    node.strings[fmt] = dict(kept)
+            stack.extend(node.properties.values())
+            if node.items is not None:
+                stack.append(node.items)
+
+    @classmethod
+    def merged(cls, summaries: Iterable["NodeSummary"]) -> "NodeSummary":
+        """Сводка объединения значений нескольких путей одного документа (stamp общие)."""
+        sources = list(summaries)
+        if len(sources) == 1:
+            return sources[0]
+        result = cls()
+        for source in sources:
+            result.absorb(source)
+        return result
+
+    def _object_contents(self) -> list[dict]:
+        """
+        Минимальный набор словарей с теми же объединением ключей, пересечением
+        ключей (``required``) и наличием пустых/непустых объектов.
+        """
+        keys = sorted(self.properties)
+        if not keys:
+            return [{}]
+        required = [key for key in keys if self.properties[key].count == self.objects]
+        contents = [dict.fromkeys(keys)]
+        if len(required) < len(keys):
+            if required:
+                contents.append(dict.fromkeys(required))
+            elif not self.empty_objects:
+                # Ключей, общих для всех объектов, нет, но пустых объектов тоже не было:
+                # два непустых словаря без общих ключей дают то же пересечение.
+                contents.append({keys[0]: None})
+                contents.append(dict.fromkeys(keys[1:]))
+        if self.empty_objects:
+            contents.append({})
+        return contents
+
+    def _array_contents(self) -> list[list]:
+        contents: list[list] = []
+        if self.arrays > self.empty_arrays:
+            contents.append([None])
+        if self.empty_arrays:
+            contents.append([])
+        return contents
+
+    def representatives(self) -> list["Representative"]:
+        """Ресурсы-представители значений пути в порядке первого появления."""
+        reps: list[tuple[int, Any]] = []
+        for t, (stamp, value) in self.first.items():
+            if t == "string":
+                continue
+            if t == "object":
+                reps.extend((stamp, content) for content in self._object_contents())
+            elif t == "array":
+                reps.extend((stamp, content) for content in self._array_contents())
+            else:
+                reps.append((stamp, value))
+        for values in self.strings.values():
+            reps.extend((stamp, value) for value, stamp in values.items())
+        reps.sort(key=lambda rep: rep[0])
+        return [Representative(self, f"#{stamp}", content) for stamp, content in reps]
+
+
+class Representative(Resource):
+    """
+    Ресурс, представляющий значения сводки :class:`NodeSummary`.
+
+    Содержимое объектов и массивов — заглушки с нужными ключами и пустотой;
+    их дочерние уровни строятся из ``summary``. Строковый ``id`` указывает на
+    stamp значения и не совпадает с ``id`` ресурсов пакетного режима.
+    """
+
+    __slots__ = ("summary",)
+
+    def __init__(self, summary: NodeSummary, id: str, content: Any):
+        super().__init__(id, "json", content)
+        self.summary = summary
+
+    def __reduce__(self) -> tuple:
+        return (Representative, (self.summary, self.id, self.content))
+
+
+def _unique_summaries(resources: Iterable[Resource]) -> list[NodeSummary]:
+    seen: set[int] = set()
+    result = []
+    for resource in resources:
+        assert isinstance(resource, Representative)
+        if id(resource.summary) not in seen:
+            seen.add(id(resource.summary))
+            result.append(resource.summary)
+    return result
+
+
+def property_representatives(parents: Iterable[Resource], name: str) -> list[Resource]:
+    """Представители свойства ``name`` объектов-представителей ``parents``."""
+    sources = [s.properties[name] for s in _unique_summaries(parents) if name in s.properties]
+    if not sources:
+        return []
+    return list(NodeSummary.merged(sources).representatives())
+
+
+def item_representatives(sources: Iterable[tuple[Resource, Optional[list]]]) -> list[Resource]:
+    """
+    Представители элементов массивов и псевдомассивов.
+
+    ``sources`` — пары ``(родитель, ключи)``: ``None`` для массива
+    и упорядоченные ключи для словаря, признанного псевдомассивом.
+    """
+    lists = [parent for parent, keys in sources if keys is None]
+    dicts = [parent for parent, keys in sources if keys is not None]
+    children: list[NodeSummary] = []
+    for summary in _unique_summaries(lists):
+        if summary.items is not None:
+            children.append(summary.items)
+    for summary in _unique_summaries(dicts):
+        children.extend(summary.properties.values())
+    if not children:
+        return []
+    return list(NodeSummary.merged(children).representatives())
+
+
+class JsonSummary:
+    """
+    Сводка всех JSON-документов, добавленных в инкрементальный ``Converter``.
+
+    :param limit: Сколько различных строк хранить на класс формата в каждом узле
+    (не меньше одной: по ним восстанавливаются варианты ``format``).
+    """
+
+    def __init__(self, limit: int = 1):
+        self.root = NodeSummary()
+        self.clock = 0
+        self.documents = 0
+        self.limit = max(limit, 1)
+
+    def add(self, document: Any) -> None:
+        self.clock = self.root.fold(document, self.clock, self.limit)
+        self.documents += 1
+
+    def add_array(self, items: Iterable[Any]) -> None:
+        """
+        Добавляет документ-массив, элементы которого приходят итератором ``items``.
+
+        Сводка получается та же, что у ``add(list(items))``, но элементы
+        сворачиваются по одному и не хранятся.
+        """
+        root = self.root
+        root.count += 1
+        root.first.setdefault("array", (self.clock, None))
+        root.arrays += 1
+        self.clock += 1
+        empty = True
+        for item in items:
+            if root.items is None:
+                root.items = NodeSummary()
+            self.clock = root.items.fold(item, self.clock, self.limit)
+            empty = False
+        if empty:
+            root.empty_arrays += 1
+        self.documents += 1
+
+    def merge(self, other: "JsonSummary") -> None:
+        """
+        Вливает ``other`` так, будто его документы были добавлены после своих.
+
+        Stamp сводки ``other`` сдвигаются на число уже выданных stamp, поэтому
+        слияние ассоциативно и даёт ту же сводку, что и один проход по всем
+        документам. Предел строк результата — меньший из двух.
+        """
+        limit = min(self.limit, other.limit)
+        if limit < self.limit:
+            self.root.truncate(limit)
+        self.root.absorb(other.root, self.clock, limit)
+        self.clock += other.clock
+        self.documents += other.documents
+        self.limit = limit
+
+    def to_state(self) -> dict:
+        """
+        Сериализует сводку в словарь из списков, строк и чисел.
+
+        Узлы хранятся плоским списком в порядке обхода (свойства — по
+        отсортированным именам), так что состояние не зависит от глубины
+        документов и одинаково для равных сводок.
+        """
+        nodes: list[list] = []
+        index: dict[int, int] = {}
+        order: list[NodeSummary] = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            index[id(node)] = len(order)
+            order.append(node)
+            children = [node.properties[key] for key in sorted(node.properties)]
+            if node.items is not None:
+                children.append(node.items)
+            stack.extend(reversed(children))
+
+        for node in order:
+            first = [
+                [t, stamp, value]
+                for t, (stamp, value) in sorted(node.first.items(), key=lambda item: item[1][0])
+            ]
+            strings = []
+            for fmt, values in sorted(node.strings.items(), key=lambda item: min(item[1].values())):
+                ordered = sorted(values.items(), key=lambda item: item[1])
+                strings.append([fmt, [[value, stamp] for value, stamp in ordered]])
+            properties = {key: index[id(node.properties[key])] for key in sorted(node.properties)}
+            items = None if node.items is None else index[id(node.items)]
+            nodes.append(
+                [
+                    node.count,
+                    first,
+                    strings,
+                    node.objects,
+                    node.empty_objects,
+                    properties,
+                    node.arrays,
+                    node.empty_arrays,
+                    items,
+                ]
+            )
+
+        return {
+            "limit": self.limit,
+            "clock": self.clock,
+            "documents": self.documents,
+            "nodes": nodes,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "JsonSummary":
+        """Восстанавливает сводку из результата :meth:`to_state`."""
+        summary = cls(state["limit"])
+        summary.clock = state["clock"]
+        summary.documents = state["documents"]
+        nodes = [NodeSummary() for _ in state["nodes"]]
+        for node, entry in zip(nodes, state["nodes"]):
+            count, first, strings, objects, empty_objects, properties, arrays, empty, items = entry
+            node.count = count
+            node.first = {t: (stamp, value) for t, stamp, value in first}
+            node.strings = {fmt: {v: stamp for v, stamp in values} for fmt, values in strings}
+            node.objects = objects
+            node.empty_objects = empty_objects
+            node.properties = {key: nodes[i] for key, i in properties.items()}
+            node.arrays = arrays
+            node.empty_arrays = empty
+            node.items = None if items is None else nodes[items]
+        summary.root = nodes[0]
+        return summary
+
+    def representatives(self) -> list[Resource]:
+        return list(self.root.representatives())
@@ -0,0 +1,87 @@
+"""
+Трассировка событий построения схемы.
+
+``Converter(tracer=...)`` передаёт вызываемому объекту события обхода
+(:class:`TraceEvent`) по мере их возникновения:
+
+- ``enter_level`` / ``exit_level`` — начало и конец уровня (у ``exit_level``
+  длительность включает дочерние уровни);
+- ``comparator_applied`` — применённый компаратор и время его работы;
+- ``union_split`` — узел разделён на альтернативы, ``elements`` — их число;
+- ``pseudo_array_detected`` — объект признан псевдомассивом, ``elements`` — число ключей.
+
+:class:`ChromeTrace` собирает события в формат Chrome trace-event,
+который открывают ``chrome://tracing``, Perfetto и speedscope.
+"""
+
+import json
+from typing import Any, Callable, NamedTuple, Optional
+
+
+class TraceEvent(NamedTuple):
+    """Событие обхода."""
+
+    kind: str
+    """``enter_level``, ``exit_level``, ``comparator_applied``, ``union_split``
+    или ``pseudo_array_detected``."""
+
+    env: str
+    """Путь уровня."""
+
+    elements: int
+    """Число ресурсов уровня (для ``union_split`` — альтернатив, для псевдомассива — ключей)."""
+
+    timestamp: float
+    """Момент события по ``time.perf_counter()``; у событий с длительностью — их конец."""
+
+    duration: float = 0.0
+    """Длительность в секундах (``exit_level`` и ``comparator_applied``)."""
+
+    name: Optional[str] = None
+    """Имя компаратора для ``comparator_applied``."""
+
+
+Tracer = Callable[[TraceEvent], None]
+
+
+class ChromeTrace:
+    """
+    Приёмник событий, собирающий их в формате Chrome trace-event.
+
+    Уровни и компараторы становятся интервалами (``"ph": "X"``), разделения
+    объединений и найденные псевдомассивы — мгновенными событиями.
+    """
+
+    def __init__(self) -> None:
+        self.events: list[dict[str, Any]] = []
+        self._origin: Optional[float] = None
+
+    def __call__(self, event: TraceEvent) -> None:
+        start = event.timestamp - event.duration
+        if self._origin is None:
+            self._origin = start
+        if event.kind == "enter_level":
+            # Интервал уровня записывается по exit_level, вход задаёт только начало отсчёта
+            return
+        record: dict[str, Any] = {
+            "pid": 1,
+            "tid": 1,
+            "ts": (start - self._origin) * 1e6,
+            "args": {"env": event.env, "elements": event.elements},
+        }
+        if event.kind == "exit_level":
+            record.update(name=event.env, cat="level", ph="X", dur=event.duration * 1e6)
+        elif event.kind == "comparator_applied":
+            record.update(name=event.name, cat="comparator", ph="X", dur=event.duration * 1e6)
+        else:
+            record.update(name=event.kind, cat="event", ph="i", s="t")
+        self.events.append(record)
+
+    def to_json(self) -> dict[str, Any]:
+        """Объект трассы: ``{"traceEvents": [...], "displayTimeUnit": "ms"}``."""
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str) -> None:
+        """Записывает трассу в файл ``path``."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f)
@@ -0,0 +1,176 @@
+import pickle
+import unittest
+
+from genschema import Converter
+from genschema.comparators.template import (
+    ContextPartition,
+    ElementTrigger,
+    ItemView,
+    ProcessingContext,
+    Resource,
+    bits_to_positions,
+    iter_contents,
+    positions_to_bits,
+)
+
+
+class TestResource(unittest.TestCase):
+    def test_root_id_accepts_int_and_str(self):
+        self.assertEqual(Resource(3, "json", {}).id, "3")
+        self.assertEqual(Resource("s0", "schema", {}).id, "s0")
+
+    def test_child_id_is_built_from_parent_chain(self):
+        root = Resource(0, "json", {"a": [1, 2]})
+        child = Resource.child(root, "a", [1, 2])
+        item = Resource.child(child, 1, 2)
+
+        self.assertIsNone(item._id)
+        self.assertEqual(item.id, "0/a/1")
+        self.assertEqual(item.type, "json")
+        self.assertEqual(child.id, "0/a")
+
+    def test_child_id_reuses_rendered_ancestor(self):
+        root = Resource(0, "schema", {})
+        child = Resource.child(root, "items", {})
+        self.assertEqual(child.id, "0/items")
+        child.parent = None  # the cached id must not walk the chain again
+        self.assertEqual(Resource.child(child, "x", {}).id, "0/items/x")
+
+    def test_pickling_flattens_parent_chain(self):
+        root = Resource(0, "json", {"a": [1, 2], "big": list(range(1000))})
+        item = Resource.child(Resource.child(root, "a", [1, 2]), 1, 2)
+        restored = pickle.loads(pickle.dumps(item))
+
+        self.assertIsNone(restored.parent)
+        self.assertEqual((restored.id, restored.type, restored.content), ("0/a/1", "json", 2))
+        self.assertEqual(Resource.child(restored, "x", None).id, "0/a/1/x")
+
+    def test_resources_compare_by_value(self):
+        root = Resource(0, "json", {"a": 1})
+        self.assertEqual(Resource.child(root, "a", 1), Resource("0/a", "json", 1))
+        self.assertNotEqual(Resource("j1", "json", 1), Resource("j1", "schema", 1))
+        self.assertNotEqual(Resource("j1", "json", 1), Resource("j2", "json", 1))
+
+    def test_id_is_settable(self):
+        root = Resource(0, "json", {"a": 1})
+        root.id = "doc"
+        self.assertEqual(root.id, "doc")
+        self.assertEqual(Resource.child(root, "a", 1).id, "doc/a")
+
+
+class TestItemView(unittest.TestCase):
+    def setUp(self):
+        self.root = Resource(0, "json", {"a": [1, 2], "b": {"1": "x", "0": "y"}})
+        self.view = ItemView()
+        self.view.add(Resource.child(self.root, "a", [1, 2]), [1, 2])
+        self.view.add(self.root, [])
+        self.view.add(Resource.child(self.root, "b", {}), {"1": "x", "0": "y"}, ["0", "1"])
+
+    def test_items_are_built_on_access(self):
+        self.assertEqual(len(self.view), 4)
+        self.assertEqual([r.id for r in self.view], ["0/a/0", "0/a/1", "0/b/0", "0/b/1"])
+        self.assertEqual(self.view[-1].content, "x")
+        self.assertEqual(list(iter_contents(self.view)), [1, 2, "y", "x"])
+        self.assertEqual(list(self.view.ids([0, 3])), ["0/a/0", "0/b/1"])
+
+    def test_subset_keeps_positions(self):
+        sub = self.view.subset([1, 2])
+        self.assertEqual([r.id for r in sub], ["0/a/1", "0/b/0"])
+        self.assertEqual([r.id for r in sub.subset([1])], ["0/b/0"])
+        self.assertEqual(list(iter_contents(sub)), [2, "y"])
+
+    def test_equality(self):
+        self.assertEqual(self.view, self.view)
+        self.assertEqual(self.view, list(self.view))
+        self.assertEqual(list(self.view), self.view)
+        self.assertEqual(self.view.subset([1, 2]), [self.view[1], self.view[2]])
+        self.assertNotEqual(self.view, list(self.view)[:3])
+        self.assertNotEqual(self.view.subset([0]), [Resource("0/a/0", "json", 5)])
+
+
+class TestElementTrigger(unittest.TestCase):
+    def test_renders_sorted_unique_ids(self):
+        j2 = Resource("j2", "json", "x")
+        s1 = Resource("s1", "schema", {})
+        trigger = ElementTrigger(ProcessingContext([s1], [j2]), [1, 0, 1])
+
+        self.assertEqual(trigger, ["j2", "s1"])
+        self.assertEqual(list(trigger), ["j2", "s1"])
+        self.assertEqual(len(trigger), 2)
+        self.assertEqual(trigger[0], "j2")
+
+    def test_select_keeps_context_order(self):
+        a, b, c = (Resource(f"j{i}", "json", i) for i in range(3))
+        ctx = ProcessingContext([], [a, b, c])
+        self.assertEqual(ElementTrigger(ctx, [2, 0]).select(ctx).jsons, [a, c])
+
+    def test_from_ids_keeps_unmatched_ids(self):
+        a, b = Resource("j0", "json", 0), Resource("j1", "json", 1)
+        ctx = ProcessingContext([], [a, b])
+        trigger = ElementTrigger.from_ids(ctx, ["j1", "s9"])
+
+        self.assertEqual(list(trigger.positions), [1])
+        self.assertEqual(trigger, ["j1", "s9"])
+        self.assertEqual(trigger.on(ProcessingContext([], [b])).positions, [0])
+
+    def test_bitmap_round_trip(self):
+        for positions in ([], [0], [3, 9, 10], list(range(0, 100, 7)), range(5), range(2, 6)):
+            bits = positions_to_bits(positions)
+            self.assertEqual(list(bits_to_positions(bits)), list(positions))
+        self.assertEqual(positions_to_bits(iter([5, 1, 5])), 0b100010)
+
+    def test_set_operations_are_bitmap_operations(self):
+        ctx = ProcessingContext([], [Resource(f"j{i}", "json", i) for i in range(6)])
+        a = ElementTrigger(ctx, [0, 1, 2, 3], ["x"])
+        b = ElementTrigger(ctx, [2, 3, 4], ["x", "y"])
+
+        self.assertEqual((a & b).positions, [2, 3])
+        self.assertEqual((a | b).positions, [0, 1, 2, 3, 4])
+        self.assertEqual((a - b).positions, [0, 1])
+        self.assertEqual((a & b).extra_ids, {"x"})
+        self.assertEqual((a | b).bits, 0b11111)
+        self.assertEqual(ElementTrigger.full(ctx).bits, 0b111111)
+
+    def test_partition_triggers_carry_their_subcontexts(self):
+        s0 = Resource("s0", "schema", {"type": "string"})
+        view = ItemView()
+        view.add(Resource(0, "json", ["a", 1, "b", 2]), ["a", 1, "b", 2])
+        ctx = ProcessingContext([s0], view)
+        partition = ContextPartition(ctx)
+        partition.groups["string"] = [0, 1, 3]
+        partition.groups["integer"] = [2, 4]
+
+        strings = partition.trigger("string")
+        selected = strings.select(ctx)
+        self.assertIs(strings.select(ctx), selected)
+        self.assertEqual(selected.schemas, [s0])
+        self.assertEqual(list(iter_contents(selected.jsons)), ["a", "b"])
+        self.assertEqual(
+            list(iter_contents(partition.trigger("integer").select(ctx).jsons)), [1, 2]
+        )
+
+        rebuilt = ElementTrigger(ctx, strings.positions).select(ctx)
+        self.assertEqual(list(iter_contents(rebuilt.jsons)), ["a", "b"])
+
+    def test_partition_merge_keeps_context_order(self):
+        partition = ContextPartition(ProcessingContext([], []))
+        partition.groups.update({"number": [1, 4], "integer": [0, 4, 5]})
+        partition.merge("integer", "number")
+        self.assertEqual(partition.groups, {"number": [0, 1, 4, 5]})
+
+    def test_empty_trigger_is_falsy(self):
+        self.assertFalse(ElementTrigger(ProcessingContext([], [])))
+
+    def test_run_output_contains_plain_id_lists(self):
+        conv = Converter()
+        conv.add_json({"a": [1, "x"]})
+        schema = conv.run()
+
+        self.assertIs(type(schema["j2sElementTrigger"]), list)
+        self.assertEqual(schema["j2sElementTrigger"], ["0"])
+        variants = schema["properties"]["a"]["items"]["anyOf"]
+        self.assertEqual([v["j2sElementTrigger"] for v in variants], [["0/a/0"], ["0/a/1"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
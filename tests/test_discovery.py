@@ -0,0 +1,159 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from genschema import Converter
+from genschema.cli import main
+from genschema.comparators import DeleteElement, FormatComparator, RequiredComparator
+from genschema.discovery import iter_json_files
+
+TREE = {
+    "top.json": {"a": 1},
+    "notes.txt": "{}",
+    "b/1.json": {"a": "x@example.com"},
+    "b/2.json": {"a": 2, "b": [1]},
+    "b/3.json": {"a": None},
+    "b/deep/4.json": [1, 2],
+    "c/events.jsonl": '{"c": 1}\n{"c": 2}',
+    ".hidden.json": {"h": 1},
+    ".cache/5.json": {"h": 2},
+}
+
+
+def _write_tree(root: Path) -> None:
+    for name, content in TREE.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content if isinstance(content, str) else json.dumps(content))
+
+
+def _relative(root: Path, paths: Any) -> list[str]:
+    return [Path(path).relative_to(root).as_posix() for path in paths]
+
+
+class TestIterJsonFiles(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        _write_tree(self.root)
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def test_patterns(self) -> None:
+        cases = {
+            "**/*.json": ["top.json", "b/1.json", "b/2.json", "b/3.json", "b/deep/4.json"],
+            "*.json": ["top.json"],
+            "b/?.json": ["b/1.json", "b/2.json", "b/3.json"],
+            "b/**": ["b/1.json", "b/2.json", "b/3.json", "b/deep/4.json"],
+            "**/*.jsonl": ["c/events.jsonl"],
+            "[bc]/*.json*": ["b/1.json", "b/2.json", "b/3.json", "c/events.jsonl"],
+            "b/[!2].json": ["b/1.json", "b/3.json"],
+            ".*.json": [".hidden.json"],
+            ".cache/*.json": [".cache/5.json"],
+            "missing/*.json": [],
+        }
+        for pattern, expected in cases.items():
+            with self.subTest(pattern=pattern):
+                self.assertEqual(
+                    _relative(self.root, iter_json_files(self.root, pattern)), expected
+                )
+
+    def test_reads_only_directories_the_pattern_can_reach(self) -> None:
+        real_scandir = os.scandir
+        for pattern, expected in (
+            ("*.json", ["."]),
+            ("b/*.json", ["b"]),
+            ("b/deep/*.json", ["b/deep"]),
+            ("b/**/*.json", ["b", "b/deep"]),
+            ("**/*.json", [".", "b", "b/deep", "c"]),
+        ):
+            scanned: list[str] = []
+
+            def scandir(path: str) -> Any:
+                scanned.append(Path(os.path.relpath(path, self.root)).as_posix())
+                return real_scandir(path)
+
+            with self.subTest(pattern=pattern):
+                with mock.patch("genschema.discovery.os.scandir", scandir):
+                    list(iter_json_files(self.root, pattern))
+                self.assertEqual(scanned, expected)
+
+    def test_per_directory_sample(self) -> None:
+        sample = _relative(self.root, iter_json_files(self.root, per_directory=2))
+        self.assertEqual(sample, _relative(self.root, iter_json_files(self.root, per_directory=2)))
+        self.assertEqual(len([path for path in sample if path.startswith("b/")]), 3)
+        self.assertEqual(len([path for path in sample if path.count("/") == 1]), 2)
+        self.assertEqual(_relative(self.root, iter_json_files(self.root, per_directory=0)), [])
+
+    def test_is_lazy_and_reports_subdirectory_errors(self) -> None:
+        scanned: list[str] = []
+        real_scandir = os.scandir
+
+        def scandir(path: str) -> Any:
+            scanned.append(path)
+            if path.endswith("deep"):
+                raise PermissionError(13, "Permission denied", path)
+            return real_scandir(path)
+
+        errors: list[str] = []
+        with mock.patch("genschema.discovery.os.scandir", scandir):
+            files = iter_json_files(self.root, on_error=lambda path, e: errors.append(path))
+            self.assertEqual(Path(next(files)).name, "top.json")
+            self.assertEqual(len(scanned), 1)
+            rest = list(files)
+        self.assertEqual(len(rest), 3)
+        self.assertEqual(_relative(self.root, errors), ["b/deep"])
+
+        with self.assertRaises(FileNotFoundError):
+            list(iter_json_files(self.root / "missing"))
+
+
+class TestAddJsonDir(unittest.TestCase):
+    def _converter(self) -> Converter:
+        conv = Converter(incremental=True)
+        conv.register(FormatComparator())
+        conv.register(RequiredComparator())
+        conv.register(DeleteElement())
+        return conv
+
+    def test_matches_explicit_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            _write_tree(root)
+            expected = self._converter()
+            expected.add_json_files(list(iter_json_files(root, "**/*.json*")))
+            for workers in (None, 2):
+                with self.subTest(workers=workers):
+                    conv = self._converter()
+                    report = conv.add_json_dir(root, "**/*.json*", workers=workers)
+                    self.assertEqual(report["files"], 6)
+                    self.assertEqual(report["instances"], 7)
+                    self.assertEqual(conv.schema(), expected.schema())
+
+    def test_cli_input_dir(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir) / "tree"
+            _write_tree(root)
+            output_path = Path(tmpdir) / "schema.json"
+            outputs = []
+            for args in (
+                [*map(str, iter_json_files(root)), "-o", str(output_path)],
+                ["--input-dir", str(root), "-o", str(output_path)],
+                ["--input-dir", str(root), "--jobs", "2", "-o", str(output_path)],
+            ):
+                main(args)
+                outputs.append(json.loads(output_path.read_text(encoding="utf-8")))
+            self.assertEqual(outputs[1], outputs[0])
+            self.assertEqual(outputs[2], outputs[0])
+
+            with self.assertRaises(SystemExit):
+                main(["--input-dir", str(root), "--stream"])
+
+
+if __name__ == "__main__":
+    unittest.main()
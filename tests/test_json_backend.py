@@ -0,0 +1,87 @@
+import glob
+import io
+import json
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+from genschema import Converter, JsonBackend, get_json_backend
+from genschema.cli import main
+from genschema.json_backend import JSON_BACKENDS
+
+EDGE_CASES = b'[NaN, -Infinity, 123456789012345678901234567890, 1.5e300, "\\ud800", {"a": {}}]'
+
+
+def _installed() -> list[JsonBackend]:
+    backends = []
+    for name in JSON_BACKENDS:
+        try:
+            backends.append(get_json_backend(name))
+        except ValueError:
+            continue
+    return backends
+
+
+class TestJsonBackend(unittest.TestCase):
+    def test_loads_matches_stdlib(self) -> None:
+        expected = repr(json.loads(EDGE_CASES))
+        for backend in _installed():
+            with self.subTest(backend=backend.name):
+                self.assertEqual(repr(backend.loads(EDGE_CASES)), expected)
+                self.assertEqual(repr(backend.loads(EDGE_CASES.decode())), expected)
+                with self.assertRaises(json.JSONDecodeError):
+                    backend.loads(b"{oops")
+
+    def test_dumps_round_trips(self) -> None:
+        doc = {"a": [1, 10**30, 2.5, None, True], "b": "юникод", "c": {}}
+        for backend in _installed():
+            for indent in (None, 2, 4):
+                with self.subTest(backend=backend.name, indent=indent):
+                    text = backend.dumps(doc, indent=indent)
+                    self.assertIn("юникод", text)
+                    self.assertEqual(json.loads(text), doc)
+            with self.subTest(backend=backend.name, indent="cli"):
+                self.assertEqual(
+                    backend.dumps(doc, indent=2), json.dumps(doc, indent=2, ensure_ascii=False)
+                )
+
+    def test_selection(self) -> None:
+        self.assertIsInstance(get_json_backend("auto"), JsonBackend)
+        self.assertEqual(get_json_backend("json").name, "json")
+        with self.assertRaises(ValueError):
+            get_json_backend("yaml")
+        for backend in _installed():
+            self.assertIs(type(pickle.loads(pickle.dumps(backend))), type(backend))
+
+    def test_converter_files(self) -> None:
+        for file_path in sorted(glob.glob("tests/datasets/*.json")):
+            results = []
+            for backend in _installed():
+                conv = Converter(json_backend=backend)
+                conv.add_json(file_path)
+                conv.add_jsonl(io.StringIO('{"x": 1}\n"y"\n'))
+                results.append(conv.run())
+            with self.subTest(file_path=file_path):
+                self.assertTrue(all(result == results[0] for result in results))
+
+    def test_cli_output_independent_of_backend(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outputs = set()
+            for backend in _installed():
+                output_path = Path(tmpdir) / f"{backend.name}.json"
+                main(
+                    [
+                        "tests/datasets/titanic.json",
+                        "-o",
+                        str(output_path),
+                        "--json-backend",
+                        backend.name,
+                    ]
+                )
+                outputs.add(output_path.read_text(encoding="utf-8"))
+            self.assertEqual(len(outputs), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
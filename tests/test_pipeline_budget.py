@@ -0,0 +1,87 @@
+import unittest
+from typing import Any
+
+from genschema import Converter, PseudoArrayHandler, RunBudget
+from genschema.comparators import DeleteElement, FormatComparator, RequiredComparator
+
+DOC = {
+    "a": {"b": {"c": {"d": 1}}},
+    "u": [1, "x", None, True, {"k": 1}, [1]],
+    "n": [{"x": 1}],
+}
+
+
+def _converter(**kwargs: Any) -> Converter:
+    conv = Converter(pseudo_handler=PseudoArrayHandler(), **kwargs)
+    conv.register(FormatComparator())
+    conv.register(RequiredComparator())
+    conv.register(DeleteElement())
+    conv.register(DeleteElement("isPseudoArray"))
+    conv.add_json(DOC)
+    return conv
+
+
+class TestRunBudget(unittest.TestCase):
+    def test_validation(self) -> None:
+        with self.assertRaises(ValueError):
+            RunBudget(max_depth=-1)
+
+    def test_unlimited_budget_changes_nothing(self) -> None:
+        plain = _converter().run()
+        conv = _converter()
+        self.assertEqual(conv.run(budget=RunBudget()), plain)
+        self.assertEqual(conv.truncated_paths(), {})
+
+    def test_max_depth(self) -> None:
+        for engine in ("recursive", "iterative"):
+            with self.subTest(engine=engine):
+                conv = _converter(engine=engine)
+                schema = conv.run(budget=RunBudget(max_depth=2))
+                b = schema["properties"]["a"]["properties"]["b"]
+                self.assertEqual(b["properties"]["c"], {})
+                truncated = conv.truncated_paths()
+                self.assertEqual(truncated["//properties/a/properties/b/properties/c"], "max_depth")
+                self.assertEqual(set(truncated.values()), {"max_depth"})
+
+    def test_max_nodes(self) -> None:
+        for engine in ("recursive", "iterative"):
+            with self.subTest(engine=engine):
+                conv = _converter(engine=engine)
+                schema = conv.run(budget=RunBudget(max_nodes=4))
+                self.assertEqual(schema["properties"]["n"], {})
+                self.assertEqual(schema["properties"]["u"], {})
+                self.assertEqual(
+                    conv.truncated_paths(),
+                    {
+                        "//properties/a/properties/b/properties/c/properties/d": "max_nodes",
+                        "//properties/n": "max_nodes",
+                        "//properties/u": "max_nodes",
+                    },
+                )
+
+    def test_max_union_width(self) -> None:
+        conv = _converter()
+        schema = conv.run(budget=RunBudget(max_union_width=3))
+        self.assertEqual(schema["properties"]["u"], {"type": "array", "items": {}})
+        self.assertEqual(conv.truncated_paths(), {"//properties/u/items": "max_union_width"})
+
+        schema = conv.run(budget=RunBudget(max_union_width=6))
+        self.assertEqual(len(schema["properties"]["u"]["items"]["anyOf"]), 6)
+        self.assertEqual(conv.truncated_paths(), {})
+
+    def test_deadline(self) -> None:
+        conv = _converter()
+        self.assertEqual(conv.run(budget=RunBudget(deadline=0)), {})
+        self.assertEqual(conv.truncated_paths(), {"/": "deadline"})
+
+    def test_budget_bypasses_memo_and_pool(self) -> None:
+        plain = _converter().run()
+        conv = _converter(memo_size=16, parallel_subtrees="thread", subtree_threshold=1)
+        schema = conv.run(budget=RunBudget(max_depth=2))
+        self.assertEqual(conv.memo_stats()["misses"], 0)
+        self.assertEqual(schema["properties"]["a"]["properties"]["b"]["properties"]["c"], {})
+        self.assertEqual(conv.run(), plain)
+
+
+if __name__ == "__main__":
+    unittest.main()
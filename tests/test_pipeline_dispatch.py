@@ -0,0 +1,76 @@
+import unittest
+
+from genschema import Converter
+from genschema.comparators import SchemaVersionComparator
+from genschema.comparators.template import Comparator, ComparatorResult, ProcessingContext
+
+
+class Recorder(Comparator):
+    name = "recorder"
+
+    def __init__(self, node_types: frozenset[str] | None = None) -> None:
+        self.node_types = node_types
+        self.seen: list[str] = []
+
+    def can_process(self, ctx: ProcessingContext, env: str, node: dict) -> bool:
+        self.seen.append(env)
+        return False
+
+
+class Retyper(Comparator):
+    """Превращает целочисленные узлы в строковые."""
+
+    name = "retyper"
+    node_types = frozenset({"integer"})
+
+    def can_process(self, ctx: ProcessingContext, env: str, node: dict) -> bool:
+        return True
+
+    def process(self, ctx: ProcessingContext, env: str, node: dict) -> ComparatorResult:
+        return {"type": "string"}, None
+
+
+class TestComparatorDispatch(unittest.TestCase):
+    def test_comparators_only_see_declared_node_types(self) -> None:
+        strings = Recorder(frozenset({"string"}))
+        anything = Recorder()
+        conv = Converter()
+        conv.add_json({"a": "x", "b": 1, "c": {"d": "y"}})
+        conv.register(strings)
+        conv.register(anything)
+        conv.run()
+
+        self.assertEqual(strings.seen, ["//properties/a", "//properties/c/properties/d"])
+        self.assertEqual(len(anything.seen), 5)
+
+    def test_root_only_comparator(self) -> None:
+        conv = Converter()
+        conv.add_json({"a": {"b": 1}})
+        conv.register(SchemaVersionComparator())
+        schema = conv.run()
+        self.assertIn("$schema", schema)
+        self.assertNotIn("$schema", schema["properties"]["a"])
+
+    def test_type_change_switches_the_table(self) -> None:
+        strings = Recorder(frozenset({"string"}))
+        conv = Converter()
+        conv.add_json({"a": 1})
+        conv.register(Retyper())
+        conv.register(strings)
+        schema = conv.run()
+
+        self.assertEqual(schema["properties"]["a"]["type"], "string")
+        self.assertEqual(strings.seen, ["//properties/a"])
+
+    def test_tables_are_rebuilt_on_register(self) -> None:
+        conv = Converter()
+        conv.add_json({"a": "x"})
+        conv.run()
+        late = Recorder(frozenset({"string"}))
+        conv.register(late)
+        conv.run()
+        self.assertEqual(late.seen, ["//properties/a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import copy
+import glob
+import json
+import sys
+import unittest
+
+from genschema import Converter, PseudoArrayHandler
+from genschema.comparators import (
+    DeleteElement,
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+    SchemaVersionComparator,
+)
+from genschema.pipeline import NO_PREV
+
+
+def _make_converter(engine: str) -> Converter:
+    conv = Converter(pseudo_handler=PseudoArrayHandler(), base_of="anyOf", engine=engine)
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(SchemaVersionComparator())
+    conv.register(RequiredComparator())
+    conv.register(EmptyComparator())
+    return conv
+
+
+def _nested(depth: int) -> dict:
+    doc: object = "leaf"
+    for _ in range(depth):
+        doc = {"children": [doc]}
+    return {"root": doc}
+
+
+class TestIterativeEngine(unittest.TestCase):
+    def test_rejects_unknown_engine(self) -> None:
+        with self.assertRaises(ValueError):
+            Converter(engine="parallel")  # type: ignore[arg-type]
+
+    def test_matches_recursive_engine_on_datasets(self) -> None:
+        for file_path in sorted(glob.glob("tests/datasets/*.json")):
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            results = []
+            for engine in ("recursive", "iterative"):
+                conv = _make_converter(engine)
+                conv.add_json(data)
+                results.append(conv.run())
+
+            with self.subTest(file_path=file_path):
+                self.assertEqual(results[0], results[1])
+
+    def test_matches_recursive_engine_on_unions_and_schemas(self) -> None:
+        results = []
+        for engine in ("recursive", "iterative"):
+            conv = _make_converter(engine)
+            conv.add_schema(
+                {
+                    "type": "object",
+                    "properties": {"a": {"type": "string", "format": "email"}},
+                    "required": ["a"],
+                }
+            )
+            conv.add_json({"a": "x@example.com", "b": [1, "2", None, {"c": "2024-01-01"}]})
+            conv.add_json({"a": 1, "b": {"0": {"c": 1}, "1": {"c": "z"}}})
+            results.append(conv.run())
+
+        self.assertEqual(results[0], results[1])
+
+    def test_leaves_inputs_untouched(self) -> None:
+        schema = {
+            "type": "object",
+            "properties": {"a": {"type": "string"}, "b": {"type": "array", "items": {}}},
+        }
+        doc = {"a": "x", "b": [{"c": 1}, "y"], "d": {"0": 1, "1": 2}}
+        for engine in ("recursive", "iterative"):
+            with self.subTest(engine=engine):
+                conv = _make_converter(engine)
+                conv.add_schema(copy.deepcopy(schema))
+                conv.add_json(copy.deepcopy(doc))
+                first = conv.run()
+                self.assertEqual(conv.run(), first)
+                self.assertEqual(conv._schemas[0].content, schema)
+                self.assertEqual(NO_PREV, {})
+
+    def test_handles_nesting_deeper_than_recursion_limit(self) -> None:
+        depth = sys.getrecursionlimit() * 2
+        conv = Converter(engine="iterative")
+        conv.add_json(_nested(depth))
+        conv.register(RequiredComparator())
+        conv.register(DeleteElement())
+
+        node = conv.run()["properties"]["root"]
+        levels = 0
+        while node.get("type") == "object":
+            self.assertEqual(node["required"], ["children"])
+            node = node["properties"]["children"]["items"]
+            levels += 1
+
+        self.assertEqual(levels, depth)
+        self.assertEqual(node, {"type": "string"})
+
+
+if __name__ == "__main__":
+    unittest.main()
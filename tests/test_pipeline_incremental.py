@@ -0,0 +1,184 @@
+import glob
+import json
+import unittest
+
+from genschema import Converter, PseudoArrayHandler, merge_states
+from genschema.comparators import (
+    DeleteElement,
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+    SchemaVersionComparator,
+)
+from genschema.summary import JsonSummary
+
+
+def _make_converter(incremental: bool, pseudo: bool = True) -> Converter:
+    conv = Converter(
+        pseudo_handler=PseudoArrayHandler() if pseudo else None,
+        base_of="anyOf",
+        incremental=incremental,
+    )
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(SchemaVersionComparator())
+    conv.register(RequiredComparator())
+    conv.register(EmptyComparator())
+    conv.register(DeleteElement())
+    conv.register(DeleteElement("isPseudoArray"))
+    return conv
+
+
+def _both(docs: list, schemas: tuple = (), pseudo: bool = True) -> tuple[dict, dict]:
+    results = []
+    for incremental in (False, True):
+        conv = _make_converter(incremental, pseudo)
+        for schema in schemas:
+            conv.add_schema(schema)
+        for doc in docs:
+            conv.add_json(doc)
+        results.append(conv.schema())
+    return results[0], results[1]
+
+
+class TestIncrementalConverter(unittest.TestCase):
+    def test_matches_batch_run_on_datasets(self) -> None:
+        for file_path in sorted(glob.glob("tests/datasets/*.json")):
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            docs = data if isinstance(data, list) else [data]
+            for pseudo in (True, False):
+                with self.subTest(file_path=file_path, pseudo=pseudo):
+                    batch, incremental = _both(docs, pseudo=pseudo)
+                    self.assertEqual(batch, incremental)
+
+    def test_schema_can_be_requested_between_documents(self) -> None:
+        docs = [
+            {"status": "new", "tags": []},
+            {"status": "paid", "tags": ["a"], "email": "a@b.cd"},
+            {"status": "new", "tags": [1, "x"], "email": "2024-01-01"},
+            {"status": "", "extra": {"0": 1, "1": "y"}},
+        ]
+        batch = _make_converter(incremental=False)
+        incremental = _make_converter(incremental=True)
+        for doc in docs:
+            batch.add_json(doc)
+            incremental.add_json(doc)
+            self.assertEqual(batch.run(), incremental.schema())
+
+    def test_enum_evidence_is_bounded_but_exact(self) -> None:
+        limit_docs = [{"code": f"v{i}"} for i in range(16)]
+        overflow_docs = limit_docs + [{"code": "v0"}, {"code": "v99"}]
+        for docs in (limit_docs, overflow_docs):
+            batch, incremental = _both(docs)
+            self.assertEqual(batch, incremental)
+
+        conv = _make_converter(incremental=True)
+        for i in range(1000):
+            conv.add_json({"code": f"v{i}"})
+        assert conv._summary is not None
+        code = conv._summary.root.properties["code"]
+        self.assertEqual(len(code.strings[None]), EnumComparator().max_unique_values + 1)
+
+    def test_required_and_empty_evidence(self) -> None:
+        docs = [
+            {"a": 1, "b": {}, "c": [1]},
+            {"a": 2, "b": {"x": 1}, "c": []},
+            {"a": 3, "d": {"x": 1, "y": 2}},
+            {"a": 4, "d": {"y": 3, "z": None}},
+        ]
+        batch, incremental = _both(docs)
+        self.assertEqual(batch, incremental)
+        self.assertEqual(incremental["required"], ["a"])
+
+    def test_matches_batch_run_with_schemas_and_pseudo_arrays(self) -> None:
+        schemas = (
+            {
+                "type": "object",
+                "properties": {"a": {"type": "string", "enum": ["x"]}},
+                "required": ["a"],
+            },
+            {"type": "object", "patternProperties": {"^[0-9]+$": {"type": "integer"}}},
+        )
+        docs = [
+            {"a": "y", "b": {"2": 1, "10": "s"}},
+            {"a": "x", "b": {"1": [1, 2.5]}},
+            {"0": 1, "1": 2},
+        ]
+        for pseudo in (True, False):
+            with self.subTest(pseudo=pseudo):
+                batch, incremental = _both(docs, schemas, pseudo)
+                self.assertEqual(batch, incremental)
+
+    def test_comparators_must_be_registered_before_data(self) -> None:
+        conv = Converter(incremental=True)
+        conv.add_json({"a": "x"})
+        with self.assertRaises(ValueError):
+            conv.register(EnumComparator())
+        conv.register(RequiredComparator())
+
+    def test_summary_folds_deep_documents(self) -> None:
+        doc: object = "leaf"
+        for _ in range(5000):
+            doc = [doc]
+        summary = JsonSummary()
+        summary.add(doc)
+        self.assertEqual(summary.clock, 5001)
+        self.assertEqual(summary.root.arrays, 1)
+
+
+class TestMergeStates(unittest.TestCase):
+    docs = [
+        {"status": "new", "email": "a@b.cd", "tags": ["x"], "meta": {"0": 1}},
+        {"status": "paid", "tags": [], "meta": {"1": "y", "2": None}},
+        {"status": "new", "email": "2024-01-01", "extra": {}},
+        {"status": "paid", "email": "c@d.ef", "tags": [1.5]},
+        [{"status": "done"}, "free text"],
+    ]
+
+    def _shards(self, incremental: bool) -> list[Converter]:
+        shards = []
+        for part in (self.docs[:2], self.docs[2:3], self.docs[3:]):
+            conv = _make_converter(incremental)
+            for doc in part:
+                conv.add_json(doc)
+            shards.append(conv)
+        return shards
+
+    def test_merge_matches_single_converter(self) -> None:
+        for incremental in (True, False):
+            whole = _make_converter(incremental)
+            for doc in self.docs:
+                whole.add_json(doc)
+
+            merged = _make_converter(incremental)
+            for shard in self._shards(incremental):
+                merged.merge(shard)
+            with self.subTest(incremental=incremental):
+                self.assertEqual(merged.schema(), whole.schema())
+
+    def test_state_reduction_is_associative(self) -> None:
+        states = [json.loads(json.dumps(shard.export_state())) for shard in self._shards(True)]
+        left = merge_states([merge_states(states[:2]), states[2]])
+        right = merge_states([states[0], merge_states(states[1:])])
+        self.assertEqual(left, right)
+
+        conv = _make_converter(incremental=True)
+        conv.merge_state(left)
+        batch, _ = _both(self.docs)
+        self.assertEqual(conv.schema(), batch)
+
+    def test_rejects_incompatible_states(self) -> None:
+        batch_state = self._shards(False)[0].export_state()
+        with self.assertRaises(ValueError):
+            _make_converter(incremental=True).merge_state(batch_state)
+
+        lean = Converter(incremental=True)
+        lean.add_json({"a": "x"})
+        with self.assertRaises(ValueError):
+            _make_converter(incremental=True).merge(lean)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+import json
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from genschema import Converter, PseudoArrayHandler, SamplingPolicy
+from genschema.comparators import (
+    DeleteElement,
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+)
+from genschema.memo import ContentDigest, MemoCache, copy_node
+
+ADDRESS = {"street": "Main", "city": "Springfield", "zip": "12345", "geo": {"lat": 1.5}}
+
+
+def _converter(memo_size: Any = None, delete: bool = True, **kwargs: Any) -> Converter:
+    conv = Converter(pseudo_handler=PseudoArrayHandler(), memo_size=memo_size, **kwargs)
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(RequiredComparator())
+    conv.register(EmptyComparator())
+    if delete:
+        conv.register(DeleteElement())
+        conv.register(DeleteElement("isPseudoArray"))
+    return conv
+
+
+def _run(data: Any, **kwargs: Any) -> tuple[dict, Converter]:
+    conv = _converter(**kwargs)
+    conv.add_json(data)
+    return conv.run(), conv
+
+
+class TestContentDigest(unittest.TestCase):
+    def test_equal_content_equal_digest(self) -> None:
+        digest = ContentDigest()
+        self.assertEqual(digest.of({"a": [1, "x"]}), digest.of({"a": [1, "x"]}))
+        self.assertNotEqual(digest.of({"a": 1}), digest.of({"a": "1"}))
+        self.assertNotEqual(digest.of({"a": 1}), digest.of({"a": True}))
+        self.assertNotEqual(digest.of([1, 2]), digest.of([2, 1]))
+        self.assertNotEqual(digest.of({}), digest.of([]))
+
+    def test_deep_nesting(self) -> None:
+        value: Any = 1
+        for _ in range(5000):
+            value = [value]
+        self.assertEqual(len(ContentDigest().of(value)), 16)
+
+
+class TestCopyNode(unittest.TestCase):
+    def test_copies_containers_and_keeps_sharing(self) -> None:
+        shared = {"type": "string"}
+        node = {"a": shared, "b": [shared, 1, None], "c": {"d": [[]]}}
+        copied = copy_node(node)
+        self.assertEqual(copied, node)
+        self.assertIsNot(copied["a"], shared)
+        self.assertIs(copied["b"][0], copied["a"])
+        self.assertIsNot(copied["c"]["d"][0], node["c"]["d"][0])
+
+
+class TestMemoCache(unittest.TestCase):
+    def test_lru_eviction(self) -> None:
+        cache = MemoCache(2)
+        cache.put(b"a", {"type": "string"})
+        cache.put(b"b", {"type": "integer"})
+        self.assertIsNotNone(cache.get(b"a"))
+        cache.put(b"c", {"type": "null"})
+        self.assertIsNone(cache.get(b"b"))
+        self.assertIsNotNone(cache.get(b"a"))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (2, 1, 2))
+
+    def test_invalid_size(self) -> None:
+        with self.assertRaises(ValueError):
+            MemoCache(0)
+
+    def test_shared_between_threads(self) -> None:
+        cache = MemoCache(4)
+        keys = [bytes([i]) for i in range(16)]
+
+        def work(offset: int) -> None:
+            for i in range(2000):
+                key = keys[(i + offset) % len(keys)]
+                if cache.get(key) is None:
+                    cache.put(key, {})
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(work, range(8)))
+        self.assertEqual(cache.hits + cache.misses, 8 * 2000)
+        self.assertLessEqual(len(cache), 4)
+
+    def test_thread_subtrees_match_plain_run(self) -> None:
+        data = {f"office_{i}": {"billing": ADDRESS, "shipping": ADDRESS} for i in range(20)}
+        plain, _ = _run(data)
+        memo, _ = _run(
+            data,
+            memo_size=8,
+            parallel_subtrees="thread",
+            subtree_threshold=1,
+            subtree_workers=4,
+        )
+        self.assertEqual(memo, plain)
+
+
+class TestConverterMemo(unittest.TestCase):
+    def test_repeated_subtrees_hit(self) -> None:
+        data = {f"office_{i}": {"billing": ADDRESS, "shipping": ADDRESS} for i in range(20)}
+        plain, _ = _run(data)
+        memo, conv = _run(data, memo_size=256)
+        self.assertEqual(memo, plain)
+        stats = conv.memo_stats()
+        self.assertEqual(stats["hits"], 20)
+        self.assertEqual(stats["maxsize"], 256)
+
+    def test_matches_plain_run(self) -> None:
+        for name in ("titanic", "iris", "fixprice_catalog"):
+            with open(f"tests/datasets/{name}.json", "r", encoding="utf-8") as f:
+                data = json.load(f)
+            plain, _ = _run(data)
+            for kwargs in ({}, {"engine": "iterative"}, {"intern_shapes": True}):
+                with self.subTest(name=name, **kwargs):
+                    memo, _ = _run(data, memo_size=4, **kwargs)
+                    self.assertEqual(memo, plain)
+
+    def test_second_run_hits_root(self) -> None:
+        conv = _converter(memo_size=16)
+        conv.add_json({"a": ADDRESS})
+        first = conv.run()
+        first["properties"]["a"]["type"] = "mutated"
+        second = conv.run()
+        self.assertEqual(second["properties"]["a"]["type"], "object")
+        self.assertGreaterEqual(conv.memo_stats()["hits"], 1)
+
+    def test_new_data_is_not_served_from_cache(self) -> None:
+        conv = _converter(memo_size=16)
+        conv.add_json({"a": 1})
+        conv.run()
+        conv.add_json({"a": "x"})
+        schema = conv.run()
+        self.assertEqual(len(schema["properties"]["a"]["anyOf"]), 2)
+
+    def test_inactive_without_delete_element(self) -> None:
+        schema, conv = _run({"a": ADDRESS, "b": ADDRESS}, memo_size=16, delete=False)
+        self.assertEqual(conv.memo_stats()["hits"], 0)
+        self.assertIn("j2sElementTrigger", schema["properties"]["a"])
+
+    def test_path_dependent_inputs(self) -> None:
+        data = {"a": ["x", "y", "x"], "b": ["x", "y", "x"]}
+        conv = Converter(pseudo_handler=PseudoArrayHandler(), memo_size=16)
+        conv.register(EnumComparator(excluded_field_names={"b"}))
+        conv.register(DeleteElement())
+        conv.add_json(data)
+        schema = conv.run()
+        self.assertIn("enum", schema["properties"]["a"]["items"])
+        self.assertNotIn("enum", schema["properties"]["b"]["items"])
+
+    def test_incremental_matches_plain_run(self) -> None:
+        data = {"r": [[1.5, {"q": "1.2.3.4"}, True, {}]], "p": [{"0": 1}]}
+        plain, _ = _run(data)
+        for incremental, workers in ((True, None), (False, 2)):
+            with self.subTest(incremental=incremental, workers=workers):
+                conv = _converter(memo_size=8, incremental=incremental)
+                conv.add_json(data)
+                conv.add_json(data)
+                self.assertEqual(conv.run(workers=workers), plain)
+                self.assertEqual(conv.memo_stats()["hits"], 0)
+
+    def test_hits_keep_sampling_stats(self) -> None:
+        data = {"a": list(range(50)), "b": list(range(50))}
+        policy = SamplingPolicy(threshold=10, sample_size=5)
+        _, plain = _run(data, sampling=policy)
+        for engine in ("recursive", "iterative"):
+            with self.subTest(engine=engine):
+                _, conv = _run(data, memo_size=16, sampling=policy, engine=engine)
+                self.assertEqual(conv.memo_stats()["hits"], 1)
+                self.assertEqual(conv.sampling_stats(), plain.sampling_stats())
+                self.assertEqual(len(conv.sampling_stats()), 2)
+
+    def test_deep_nesting_with_iterative_engine(self) -> None:
+        depth = sys.getrecursionlimit() * 2
+        obj: Any = "x"
+        arr: Any = 1
+        for _ in range(depth):
+            obj = {"a": obj}
+            arr = [arr]
+        for data in (obj, arr):
+            conv = _converter(memo_size=64, engine="iterative")
+            conv.add_json(data)
+            first = conv.run()
+            # digests are computed without recursion, unlike == on nested dicts
+            digest = ContentDigest()
+            self.assertEqual(digest.of(conv.run()), digest.of(first))
+            self.assertEqual(conv.memo_stats()["hits"], 1)
+
+    def test_stats_without_memo(self) -> None:
+        _, conv = _run({"a": 1})
+        self.assertEqual(conv.memo_stats(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from genschema import Converter, PseudoArrayHandler
+from genschema.cli import main
+from genschema.comparators import (
+    DeleteElement,
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+)
+
+DOCS = [
+    {"id": 1, "status": "new", "email": "a@b.cd", "lines": [{"qty": 1}], "attrs": {"0": 1}},
+    {"id": 2, "status": "paid", "lines": [], "attrs": {"1": "x"}},
+    {"id": 3.5, "status": "new", "email": "2024-01-01", "lines": [{"qty": 2, "note": ""}]},
+    {"id": None, "status": "done", "lines": [{"qty": "3"}], "attrs": {}},
+    {"id": 5, "status": "paid", "email": "e@f.gh"},
+]
+
+
+def _make_converter(delete_triggers: bool = True) -> Converter:
+    conv = Converter(pseudo_handler=PseudoArrayHandler())
+    for doc in DOCS:
+        conv.add_json(doc)
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(RequiredComparator())
+    conv.register(EmptyComparator())
+    if delete_triggers:
+        conv.register(DeleteElement())
+    conv.register(DeleteElement("isPseudoArray"))
+    return conv
+
+
+class TestParallelRun(unittest.TestCase):
+    def test_matches_serial_run(self) -> None:
+        expected = _make_converter().run()
+        for workers in (2, 3):
+            with self.subTest(workers=workers):
+                self.assertEqual(_make_converter().run(workers=workers), expected)
+
+    def test_keeps_trigger_ids_by_running_serially(self) -> None:
+        expected = _make_converter(delete_triggers=False).run()
+        result = _make_converter(delete_triggers=False).run(workers=2)
+        self.assertEqual(result, expected)
+        self.assertEqual(result["j2sElementTrigger"], ["0", "1", "2", "3", "4"])
+
+    def test_cli_jobs_option(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            inputs = []
+            for index, doc in enumerate(DOCS):
+                path = tmp_path / f"doc{index}.json"
+                path.write_text(json.dumps(doc), encoding="utf-8")
+                inputs.append(str(path))
+
+            outputs = []
+            for jobs in ("1", "2"):
+                output_path = tmp_path / f"schema{jobs}.json"
+                main([*inputs, "--jobs", jobs, "-o", str(output_path)])
+                outputs.append(json.loads(output_path.read_text(encoding="utf-8")))
+
+        self.assertEqual(outputs[0], outputs[1])
+
+
+def _write_files(tmp_path: Path) -> list[str]:
+    paths = []
+    for index, doc in enumerate(DOCS * 8):
+        path = tmp_path / f"doc{index}.json"
+        path.write_text(json.dumps(doc), encoding="utf-8")
+        paths.append(str(path))
+    lines = tmp_path / "events.ndjson"
+    lines.write_text("\n".join([*map(json.dumps, DOCS), "{oops"]), encoding="utf-8")
+    bad = tmp_path / "bad.json"
+    bad.write_text("{oops", encoding="utf-8")
+    paths[3:3] = [str(bad), str(tmp_path / "missing.json")]
+    paths.insert(20, str(lines))
+    return paths
+
+
+class TestParallelFiles(unittest.TestCase):
+    def _converter(self, incremental: bool) -> Converter:
+        conv = Converter(pseudo_handler=PseudoArrayHandler(), incremental=incremental)
+        conv.register(FormatComparator())
+        conv.register(EnumComparator())
+        conv.register(RequiredComparator())
+        conv.register(DeleteElement())
+        return conv
+
+    def test_matches_serial_ingestion(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = _write_files(Path(tmpdir))
+            serial = self._converter(False)
+            serial_report = serial.add_json_files(paths, skip_invalid_lines=True)
+            expected = serial.run()
+
+            for workers in (2, 3):
+                with self.subTest(workers=workers):
+                    conv = self._converter(True)
+                    report = conv.add_json_files(iter(paths), workers, skip_invalid_lines=True)
+                    self.assertEqual(report, serial_report)
+                    self.assertEqual(conv.run(), expected)
+
+        self.assertEqual(serial_report["files"], len(paths) - 2)
+        self.assertEqual(serial_report["instances"], len(DOCS) * 9)
+        self.assertEqual(serial_report["skipped_lines"], 1)
+        self.assertEqual(list(serial_report["errors"]), paths[3:5])
+
+    def test_requires_incremental_mode(self) -> None:
+        with self.assertRaises(ValueError):
+            self._converter(False).add_json_files([], workers=2)
+
+    def test_cli_reports_all_failed_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            paths = _write_files(tmp_path)
+            output_path = tmp_path / "schema.json"
+            with self.assertRaises(SystemExit):
+                main([*paths, "--jobs", "2", "-o", str(output_path)])
+            self.assertFalse(output_path.exists())
+
+            outputs = []
+            for jobs in ("1", "2"):
+                args = ["--jobs", jobs, "--keep-going", "--skip-invalid-lines"]
+                main([*paths, *args, "-o", str(output_path)])
+                outputs.append(json.loads(output_path.read_text(encoding="utf-8")))
+        self.assertEqual(outputs[0], outputs[1])
+
+
+class TestParallelSubtrees(unittest.TestCase):
+    def _run(self, **kwargs: object) -> dict:
+        with open("tests/datasets/latestblock.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+        conv = Converter(pseudo_handler=PseudoArrayHandler(), **kwargs)  # type: ignore[arg-type]
+        conv.add_json(data)
+        conv.register(FormatComparator())
+        conv.register(RequiredComparator())
+        conv.register(EmptyComparator())
+        return conv.run()
+
+    def test_matches_serial_run_including_trigger_ids(self) -> None:
+        expected = self._run()
+        for mode in ("thread", "process"):
+            for engine in ("recursive", "iterative"):
+                with self.subTest(mode=mode, engine=engine):
+                    result = self._run(parallel_subtrees=mode, subtree_threshold=2, engine=engine)
+                    self.assertEqual(result, expected)
+
+    def test_rejects_unknown_mode(self) -> None:
+        with self.assertRaises(ValueError):
+            Converter(parallel_subtrees="fiber")  # type: ignore[arg-type]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from genschema import Converter, PseudoArrayHandler
+from genschema.cli import main
+from genschema.comparators import (
+    DeleteElement,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+)
+from genschema.profiling import RunProfile, profile_rows
+
+DOC = {
+    "id": 1,
+    "email": "a@example.com",
+    "tags": ["x", "y", 3],
+    "rows": {"0": {"v": 1}, "1": {"v": 2}},
+}
+
+
+def _converter(**kwargs: Any) -> Converter:
+    conv = Converter(pseudo_handler=PseudoArrayHandler(), **kwargs)
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(RequiredComparator())
+    conv.register(DeleteElement())
+    conv.add_json(DOC)
+    return conv
+
+
+class TestRunProfile(unittest.TestCase):
+    def test_merge_and_rows(self) -> None:
+        a, b = RunProfile(), RunProfile()
+        a.comparator("format", 0.5, True, 3)
+        b.comparator("format", 0.25, False, 3)
+        b.stage("object", 1.0, 2)
+        a.merge(b)
+        stats = a.as_dict()
+        self.assertEqual(
+            stats["comparators"]["format"],
+            {"calls": 2, "applied": 1, "seconds": 0.75, "resources": 3},
+        )
+        self.assertEqual(stats["stages"]["object"], {"calls": 1, "seconds": 1.0, "resources": 2})
+        self.assertEqual(
+            profile_rows(stats),
+            [("stage", "object", 1, None, 1.0, 2), ("comparator", "format", 2, 1, 0.75, 3)],
+        )
+
+
+class TestConverterStats(unittest.TestCase):
+    def test_disabled_by_default(self) -> None:
+        conv = _converter()
+        conv.run()
+        self.assertEqual(conv.stats(), {})
+
+    def test_counts(self) -> None:
+        plain = _converter().run()
+        for kwargs in ({}, {"engine": "iterative"}):
+            with self.subTest(**kwargs):
+                conv = _converter(profile=True, **kwargs)
+                self.assertEqual(conv.run(), plain)
+                stats = conv.stats()
+                stages = stats["stages"]
+                self.assertEqual(
+                    set(stages),
+                    {"level", "object", "array", "pseudo_array", "split_array", "union"},
+                )
+                # Корень, 4 свойства, элементы tags и 2 альтернативы, элементы rows и их v
+                self.assertEqual(stages["level"]["calls"], 10)
+                self.assertEqual(stages["split_array"]["calls"], 2)
+                comparators = stats["comparators"]
+                self.assertEqual(comparators["type"]["calls"], 10)
+                self.assertEqual(comparators["required"]["applied"], 2)
+                self.assertEqual(comparators["format"]["applied"], 2)
+                self.assertGreater(comparators["format"]["seconds"], 0)
+
+    def test_stats_reset_per_run(self) -> None:
+        conv = _converter(profile=True)
+        conv.run()
+        first = conv.stats()["stages"]["level"]["calls"]
+        conv.run()
+        self.assertEqual(conv.stats()["stages"]["level"]["calls"], first)
+
+    def test_parallel_subtrees_merge_profiles(self) -> None:
+        serial = _converter(profile=True)
+        serial.run()
+        for pool in ("thread", "process"):
+            with self.subTest(pool=pool):
+                conv = _converter(profile=True, parallel_subtrees=pool, subtree_threshold=1)
+                conv.run()
+                self.assertEqual(
+                    conv.stats()["stages"]["level"]["calls"],
+                    serial.stats()["stages"]["level"]["calls"],
+                )
+
+
+class TestCliProfile(unittest.TestCase):
+    def test_cli_prints_profile_table(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            input_path = Path(tmpdir) / "input.json"
+            input_path.write_text(json.dumps(DOC), encoding="utf-8")
+            with mock.patch("genschema.cli.console") as console:
+                main([str(input_path), "-o", str(Path(tmpdir) / "schema.json"), "--profile"])
+            tables = [
+                call.args[0]
+                for call in console.print.call_args_list
+                if call.args and not isinstance(call.args[0], str)
+            ]
+            self.assertEqual(len(tables), 1)
+            self.assertEqual(tables[0].title, "Profile")
+            self.assertGreater(tables[0].row_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from genschema import Converter
+from genschema.comparators import DeleteElement, RequiredComparator
+from genschema.comparators.template import Resource
+
+
+class TestPropertyBucketing(unittest.TestCase):
+    def test_bucket_properties_keeps_context_order_and_sorts_names(self) -> None:
+        conv = Converter()
+        s0 = Resource("s0", "schema", {"type": "object", "properties": {"b": {}, "a": {}}})
+        j0 = Resource("j0", "json", {"c": 1, "a": 2})
+        j1 = Resource("j1", "json", {"a": 3})
+        j2 = Resource("j2", "json", [1, 2])
+
+        buckets = conv._bucket_properties([s0], [j0, j1, j2])
+
+        self.assertEqual(list(buckets), ["a", "b", "c"])
+        self.assertEqual(buckets["a"], ([s0], [j0, j1]))
+        self.assertEqual(buckets["b"], ([s0], []))
+        self.assertEqual(buckets["c"], ([], [j0]))
+
+    def test_property_ctx_builds_child_resources(self) -> None:
+        conv = Converter()
+        s0 = Resource("s0", "schema", {"properties": {"a": {"type": "string"}}})
+        j0 = Resource("j0", "json", {"a": "x"})
+
+        ctx = conv._property_ctx("a", ([s0], [j0]), False)
+
+        self.assertEqual([s.id for s in ctx.schemas], ["s0/a"])
+        self.assertEqual([j.id for j in ctx.jsons], ["j0/a"])
+        self.assertEqual(ctx.schemas[0].content, {"type": "string"})
+        self.assertEqual(ctx.jsons[0].content, "x")
+
+    def test_sparse_records_keep_required_semantics(self) -> None:
+        conv = Converter()
+        conv.add_json([{"id": 1, "a": "x"}, {"id": 2, "b": "y"}, {"id": 3}])
+        conv.register(RequiredComparator())
+        conv.register(DeleteElement())
+
+        schema = conv.run()
+
+        self.assertEqual(list(schema["items"]["properties"]), ["a", "b", "id"])
+        self.assertEqual(schema["items"]["required"], ["id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+
+from genschema import Converter, PseudoArrayHandler, SamplingPolicy
+from genschema.comparators import (
+    DeleteElement,
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+)
+
+
+def _document() -> dict:
+    items: list = [{"id": i, "name": "x"} for i in range(5000)]
+    items[1234] = "a@b.cd"
+    items[2345] = None
+    items[3456] = []
+    return {"items": items, "map": {str(i): i for i in range(3000)}}
+
+
+def _run(sampling: SamplingPolicy | None, **kwargs: object) -> Converter:
+    conv = Converter(
+        pseudo_handler=PseudoArrayHandler(), sampling=sampling, **kwargs  # type: ignore[arg-type]
+    )
+    conv.add_json(_document())
+    conv.register(FormatComparator())
+    conv.register(EmptyComparator())
+    conv.register(DeleteElement())
+    return conv
+
+
+class TestSamplingPolicy(unittest.TestCase):
+    def test_full_scan_below_threshold(self) -> None:
+        policy = SamplingPolicy(threshold=10, sample_size=2)
+        self.assertEqual(policy.select(range(10), 10), list(range(10)))
+
+    def test_keeps_edges_and_every_item_class(self) -> None:
+        values: list = [1] * 1000
+        values[500] = "2024-01-01"
+        values[600] = "text"
+        values[700] = {}
+        policy = SamplingPolicy(threshold=10, sample_size=5, keep_first=2, keep_last=2)
+        positions = policy.select(values, len(values))
+        for position in (0, 1, 500, 600, 700, 998, 999):
+            self.assertIn(position, positions)
+        self.assertLessEqual(len(positions), 2 + 2 + 4 + 5)
+        self.assertEqual(positions, sorted(positions))
+
+    def test_is_deterministic(self) -> None:
+        for method in ("reservoir", "stratified"):
+            policy = SamplingPolicy(threshold=10, sample_size=20, method=method)  # type: ignore
+            self.assertEqual(policy.select(range(1000), 1000), policy.select(range(1000), 1000))
+
+    def test_stratified_takes_one_item_per_stratum(self) -> None:
+        policy = SamplingPolicy(threshold=10, sample_size=10, method="stratified")
+        positions = policy.select([0] * 100, 100)
+        # позиция 0 — ещё и первый элемент своего класса
+        self.assertEqual({p // 10 for p in positions}, set(range(10)))
+        self.assertLessEqual(len(positions), 11)
+
+    def test_keeps_key_set_and_string_value_evidence(self) -> None:
+        values: list = [{"id": 1, "status": "a"}] * 1000
+        values[300] = {"status": "a"}
+        values[400] = {"id": 1, "status": "a", "extra": True}
+        values[500] = {"id": 2, "status": "b"}
+        policy = SamplingPolicy(threshold=10, sample_size=0)
+        self.assertEqual(policy.select(values, len(values)), [0, 300, 400])
+
+        strings = ["a"] * 1000
+        strings[600] = "b"
+        strings[700] = "c"
+        self.assertEqual(policy.select(strings, len(strings)), [0])
+        self.assertEqual(policy.select(strings, len(strings), distinct_values=2), [0, 600])
+
+    def test_rejects_unknown_method(self) -> None:
+        with self.assertRaises(ValueError):
+            SamplingPolicy(method="systematic")  # type: ignore[arg-type]
+
+
+class TestConverterSampling(unittest.TestCase):
+    def test_matches_full_scan_and_reports_examined_items(self) -> None:
+        expected = _run(None).run()
+        conv = _run(SamplingPolicy(threshold=100, sample_size=50))
+        self.assertEqual(conv.run(), expected)
+
+        stats = conv.sampling_stats()
+        self.assertEqual(stats["//properties/items/items"]["total"], 5000)
+        self.assertLess(stats["//properties/items/items"]["examined"], 100)
+        self.assertEqual(stats["//properties/map/patternProperties/^[0-9]+$"]["total"], 3000)
+
+    def test_keeps_required_and_enum_of_full_scan(self) -> None:
+        items: list = [{"id": i, "status": "open"} for i in range(5000)]
+        items[1111] = {"status": "open"}
+        items[2222] = {"id": 2222, "status": "open", "note": "x"}
+        tags = ["red"] * 5000
+        tags[3333] = "blue"
+        results = []
+        for sampling in (None, SamplingPolicy(threshold=100, sample_size=5)):
+            conv = Converter(sampling=sampling)
+            conv.add_json({"items": items, "tags": tags})
+            conv.register(EnumComparator())
+            conv.register(RequiredComparator())
+            conv.register(DeleteElement())
+            results.append(conv.run())
+        self.assertEqual(results[1], results[0])
+        self.assertEqual(results[0]["properties"]["items"]["items"]["required"], ["status"])
+        self.assertEqual(results[0]["properties"]["tags"]["items"]["enum"], ["red", "blue"])
+
+    def test_no_stats_without_sampling(self) -> None:
+        conv = _run(SamplingPolicy())
+        conv.run()
+        self.assertEqual(conv.sampling_stats(), {})
+
+    def test_collects_stats_from_parallel_subtrees(self) -> None:
+        policy = SamplingPolicy(threshold=100, sample_size=50)
+        expected = _run(policy)
+        expected.run()
+        for mode in ("thread", "process"):
+            with self.subTest(mode=mode):
+                conv = _run(policy, parallel_subtrees=mode, subtree_threshold=2)
+                conv.run()
+                self.assertEqual(conv.sampling_stats(), expected.sampling_stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import unittest
+
+from genschema import Converter, PseudoArrayHandler
+from genschema.comparators import (
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+)
+from genschema.comparators.template import (
+    Comparator,
+    ElementTrigger,
+    ProcessingContext,
+    Resource,
+)
+from genschema.shapes import ShapeGroups, level_shape
+
+
+def _run(data: object, intern_shapes: bool) -> dict:
+    conv = Converter(pseudo_handler=PseudoArrayHandler(), intern_shapes=intern_shapes)
+    conv.add_json(data)  # type: ignore[arg-type]
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(RequiredComparator())
+    conv.register(EmptyComparator())
+    return conv.run()
+
+
+class TestShapeGroups(unittest.TestCase):
+    def test_level_shape(self) -> None:
+        self.assertEqual(level_shape({"a": 1}), level_shape({"a": "x"}))
+        self.assertNotEqual(level_shape({"a": 1}), level_shape({"b": 1}))
+        self.assertEqual(level_shape([1]), level_shape(["x", None]))
+        self.assertNotEqual(level_shape([]), level_shape([1]))
+        self.assertNotEqual(level_shape("a"), level_shape("b"))
+        self.assertNotEqual(level_shape(1), level_shape(True))
+        self.assertEqual(level_shape(1.5), level_shape(2.0))
+
+    def test_groups_and_expand(self) -> None:
+        jsons = [Resource(i, "json", v) for i, v in enumerate([1, "a", 2, "a", None, 3])]
+        ctx = ProcessingContext([], jsons)
+        shapes = ShapeGroups.of(ctx)
+        assert shapes is not None
+        self.assertEqual(shapes.members, [[0, 2, 5], [1, 3], [4]])
+        self.assertEqual([r.content for r in shapes.ctx.jsons], [1, "a", None])
+
+        expanded = shapes.expand(ElementTrigger(shapes.ctx, [0, 2]))
+        self.assertIs(expanded.ctx, ctx)
+        self.assertEqual(list(expanded.positions), [0, 2, 4, 5])
+
+    def test_no_groups_without_repeats(self) -> None:
+        ctx = ProcessingContext([], [Resource(0, "json", 1), Resource(1, "json", "x")])
+        self.assertIsNone(ShapeGroups.of(ctx))
+
+
+class TestInternShapes(unittest.TestCase):
+    def test_matches_plain_run_including_trigger_ids(self) -> None:
+        for name in ("titanic", "iris", "fixprice_catalog"):
+            with open(f"tests/datasets/{name}.json", "r", encoding="utf-8") as f:
+                data = json.load(f)
+            with self.subTest(dataset=name):
+                self.assertEqual(_run(data, True), _run(data, False))
+
+    def test_mixed_alternatives(self) -> None:
+        data = [1, "a@b.cd", {"x": 1}, "2024-01-01", {"x": "s"}, 2.5, "a@b.cd", [], [{"y": None}]]
+        self.assertEqual(_run(data, True), _run(data, False))
+
+    def test_rejects_comparators_depending_on_repeats(self) -> None:
+        conv = Converter(intern_shapes=True)
+        with self.assertRaises(ValueError):
+            conv.register(Comparator())
+
+
+if __name__ == "__main__":
+    unittest.main()
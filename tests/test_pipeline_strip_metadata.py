@@ -0,0 +1,74 @@
+import json
+import unittest
+from typing import Any, Iterator
+
+from genschema import Converter, PseudoArrayHandler
+from genschema.comparators import (
+    DeleteElement,
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+)
+
+
+def _converter(strip: bool, **kwargs: Any) -> Converter:
+    conv = Converter(pseudo_handler=PseudoArrayHandler(), strip_metadata=strip, **kwargs)
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(RequiredComparator())
+    conv.register(EmptyComparator())
+    if not strip:
+        conv.register(DeleteElement())
+        conv.register(DeleteElement("isPseudoArray"))
+    return conv
+
+
+def _run(data: Any, strip: bool, **kwargs: Any) -> dict:
+    conv = _converter(strip, **kwargs)
+    conv.add_json(data)
+    return conv.run()
+
+
+def _keys(node: Any) -> Iterator[str]:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield key
+            yield from _keys(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _keys(value)
+
+
+class TestStripMetadata(unittest.TestCase):
+    def test_matches_delete_element_pair(self) -> None:
+        for name in ("titanic", "iris", "fixprice_catalog", "latestblock"):
+            with open(f"tests/datasets/{name}.json", "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for kwargs in ({}, {"engine": "iterative"}, {"intern_shapes": True}):
+                with self.subTest(name=name, **kwargs):
+                    stripped = _run(data, True, **kwargs)
+                    self.assertEqual(stripped, _run(data, False, **kwargs))
+                    keys = set(_keys(stripped))
+                    self.assertNotIn("j2sElementTrigger", keys)
+                    self.assertNotIn("isPseudoArray", keys)
+
+    def test_incremental(self) -> None:
+        docs = [{"a": "x@example.com", "b": {"0": 1, "1": "y"}}, {"a": 1, "c": [None, "z"]}]
+        batch = _converter(True)
+        incremental = _converter(True, incremental=True)
+        for doc in docs:
+            batch.add_json(doc)
+            incremental.add_json(doc)
+        self.assertEqual(incremental.schema(), batch.run())
+
+    def test_enables_memo(self) -> None:
+        address = {"city": "X", "zip": "12345"}
+        conv = _converter(True, memo_size=16)
+        conv.add_json({"billing": address, "shipping": address})
+        conv.run()
+        self.assertEqual(conv.memo_stats()["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+
+from genschema import ChromeTrace, Converter, PseudoArrayHandler, TraceEvent
+from genschema.cli import main
+from genschema.comparators import DeleteElement, FormatComparator, RequiredComparator
+
+DOC = {
+    "email": "a@example.com",
+    "tags": ["x", 3],
+    "rows": {"0": {"v": 1}, "1": {"v": 2}},
+}
+
+
+def _converter(**kwargs: Any) -> Converter:
+    conv = Converter(pseudo_handler=PseudoArrayHandler(), **kwargs)
+    conv.register(FormatComparator())
+    conv.register(RequiredComparator())
+    conv.register(DeleteElement())
+    conv.add_json(DOC)
+    return conv
+
+
+class TestTracer(unittest.TestCase):
+    def test_events(self) -> None:
+        events: list[TraceEvent] = []
+        plain = _converter().run()
+        for kwargs in ({}, {"engine": "iterative"}):
+            with self.subTest(**kwargs):
+                events.clear()
+                self.assertEqual(_converter(tracer=events.append, **kwargs).run(), plain)
+
+                # Уровни вложены правильно: каждый выход закрывает последний вход
+                open_levels: list[str] = []
+                for event in events:
+                    if event.kind == "enter_level":
+                        open_levels.append(event.env)
+                    elif event.kind == "exit_level":
+                        self.assertEqual(open_levels.pop(), event.env)
+                        self.assertGreaterEqual(event.duration, 0)
+                self.assertEqual(open_levels, [])
+
+                by_kind: dict[str, list[TraceEvent]] = {}
+                for event in events:
+                    by_kind.setdefault(event.kind, []).append(event)
+                self.assertEqual(events[0], by_kind["enter_level"][0])
+                self.assertEqual(events[0].env, "/")
+                self.assertEqual(len(by_kind["enter_level"]), 9)
+
+                unions = by_kind["union_split"]
+                self.assertEqual(
+                    [(e.env, e.elements) for e in unions], [("//properties/tags/items", 2)]
+                )
+                pseudo = by_kind["pseudo_array_detected"]
+                self.assertEqual([(e.env, e.elements) for e in pseudo], [("//properties/rows", 2)])
+
+                applied = {e.name for e in by_kind["comparator_applied"]}
+                self.assertEqual(applied, {"type", "format", "required", "delete-element"})
+
+    def test_tracer_builds_subtrees_in_place(self) -> None:
+        events: list[TraceEvent] = []
+        conv = _converter(tracer=events.append, parallel_subtrees="thread", subtree_threshold=1)
+        self.assertEqual(conv.run(), _converter().run())
+        kinds = [e.kind for e in events]
+        self.assertEqual(kinds.count("enter_level"), kinds.count("exit_level"))
+
+
+class TestChromeTrace(unittest.TestCase):
+    def test_trace_format(self) -> None:
+        trace = ChromeTrace()
+        _converter(tracer=trace).run()
+        events = trace.to_json()["traceEvents"]
+        levels = [e for e in events if e["cat"] == "level"]
+        self.assertEqual(len(levels), 9)
+        root = levels[-1]
+        self.assertEqual(root["name"], "/")
+        self.assertEqual(root["ts"], 0)
+        for event in events:
+            self.assertGreaterEqual(event["ts"], 0)
+            if event["ph"] == "X":
+                self.assertLessEqual(event["ts"] + event["dur"], root["dur"] + 1e-3)
+        instants = {e["name"] for e in events if e["ph"] == "i"}
+        self.assertEqual(instants, {"union_split", "pseudo_array_detected"})
+
+    def test_cli_writes_trace(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            input_path = Path(tmpdir) / "input.json"
+            trace_path = Path(tmpdir) / "trace.json"
+            input_path.write_text(json.dumps(DOC), encoding="utf-8")
+            main(
+                [
+                    str(input_path),
+                    "-o",
+                    str(Path(tmpdir) / "schema.json"),
+                    "--trace",
+                    str(trace_path),
+                ]
+            )
+            trace = json.loads(trace_path.read_text(encoding="utf-8"))
+            self.assertTrue(any(e["cat"] == "comparator" for e in trace["traceEvents"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
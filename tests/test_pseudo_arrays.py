@@ -0,0 +1,78 @@
+import unittest
+from typing import Optional
+
+from genschema import Converter, PseudoArrayHandler, PseudoArrayHandlerBase
+from genschema.comparators import DeleteElement
+from genschema.comparators.template import ProcessingContext
+from genschema.pseudo_arrays import PseudoArrayDecision
+
+
+class CountingHandler(PseudoArrayHandler):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def classify(self, keys: list[str], ctx: ProcessingContext) -> PseudoArrayDecision:
+        self.calls += 1
+        return super().classify(keys, ctx)
+
+
+class EvenKeysHandler(PseudoArrayHandlerBase):
+    def is_pseudo_array(
+        self, keys: list[str], ctx: ProcessingContext
+    ) -> tuple[bool, Optional[str]]:
+        if keys and all(k.isdigit() and int(k) % 2 == 0 for k in keys):
+            return True, "^[0-9]*[02468]$"
+        return False, None
+
+
+def _rows(count: int) -> dict:
+    return {str(i): {"id": i} for i in range(count)}
+
+
+class TestClassify(unittest.TestCase):
+    def test_order_by_number(self) -> None:
+        ctx = ProcessingContext([], [])
+        decision = PseudoArrayHandler().classify(sorted(["10", "2", "1", "01", "-3"]), ctx)
+        self.assertTrue(decision.is_pseudo_array)
+        self.assertEqual(decision.pattern, "^[0-9]+$")
+        self.assertEqual(decision.order, ["-3", "01", "1", "2", "10"])
+
+    def test_not_pseudo(self) -> None:
+        ctx = ProcessingContext([], [])
+        self.assertFalse(PseudoArrayHandler().classify(["1", "a"], ctx).is_pseudo_array)
+        self.assertFalse(PseudoArrayHandler().classify([], ctx).is_pseudo_array)
+        self.assertEqual(PseudoArrayHandler().is_pseudo_array(["0", "1"], ctx), (True, "^[0-9]+$"))
+
+    def test_base_classify_uses_is_pseudo_array(self) -> None:
+        ctx = ProcessingContext([], [])
+        decision = EvenKeysHandler().classify(["10", "2"], ctx)
+        self.assertEqual(decision, PseudoArrayDecision(True, "^[0-9]*[02468]$", ["2", "10"]))
+        self.assertIsNone(EvenKeysHandler().classify(["1"], ctx).order)
+
+
+class TestConverterPseudoArrays(unittest.TestCase):
+    def test_each_key_set_classified_once(self) -> None:
+        handler = CountingHandler()
+        conv = Converter(pseudo_handler=handler)
+        conv.register(DeleteElement())
+        for _ in range(5):
+            conv.add_json({"rows": _rows(50)})
+        schema = conv.run()
+        self.assertIn("^[0-9]+$", schema["properties"]["rows"]["patternProperties"])
+        # Набор ключей строк и набор ключей элементов {"id"} (плюс ключи корня)
+        self.assertEqual(handler.calls, 3)
+
+        conv.run()
+        self.assertEqual(handler.calls, 6)
+
+    def test_context_dependent_handler_not_cached(self) -> None:
+        conv = Converter(pseudo_handler=EvenKeysHandler())
+        conv.register(DeleteElement())
+        conv.add_json({"a": {"0": 1, "2": 2}, "b": {"1": 1, "2": 2}})
+        schema = conv.run()
+        self.assertIn("patternProperties", schema["properties"]["a"])
+        self.assertNotIn("patternProperties", schema["properties"]["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import glob
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+
+from genschema import Converter, PseudoArrayHandler
+from genschema.cli import main
+from genschema.comparators import (
+    EmptyComparator,
+    EnumComparator,
+    FormatComparator,
+    RequiredComparator,
+)
+from genschema.streaming import iter_json_array, iter_json_lines
+
+ITEMS = [
+    1.5e10,
+    -3,
+    12345678901234567890,
+    'a\\u00e9"',
+    "юникод" * 20,
+    None,
+    True,
+    {"x": [1, {}], "y": "2024-01-01"},
+    [],
+    2.5e-3,
+]
+
+
+def _converter(incremental: bool) -> Converter:
+    conv = Converter(
+        pseudo_handler=PseudoArrayHandler(), incremental=incremental, strip_metadata=True
+    )
+    conv.register(FormatComparator())
+    conv.register(EnumComparator())
+    conv.register(RequiredComparator())
+    conv.register(EmptyComparator())
+    return conv
+
+
+class TestIterJsonArray(unittest.TestCase):
+    def test_chunk_boundaries(self) -> None:
+        for items in ([], [7], ITEMS):
+            text = json.dumps(items, ensure_ascii=False, indent=1)
+            for chunk_size in (1, 2, 3, 7, 1 << 16):
+                with self.subTest(items=len(items), chunk_size=chunk_size):
+                    self.assertEqual(list(iter_json_array(io.StringIO(text), chunk_size)), items)
+                    binary = io.BytesIO(text.encode("utf-8"))
+                    self.assertEqual(list(iter_json_array(binary, chunk_size)), items)
+
+    def test_invalid_input(self) -> None:
+        for text in ("", "{}", "[1,]", "[1 2]", "[1", "[1] x", "[tru]"):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    list(iter_json_array(io.StringIO(text), 2))
+
+
+class TestAddJsonStream(unittest.TestCase):
+    def test_matches_add_json(self) -> None:
+        for file_path in sorted(glob.glob("tests/datasets/*.json")):
+            with open(file_path, "r", encoding="utf-8") as f:
+                if not isinstance(json.load(f), list):
+                    continue
+            for incremental in (False, True):
+                with self.subTest(file_path=file_path, incremental=incremental):
+                    loaded = _converter(incremental)
+                    loaded.add_json(file_path)
+                    streamed = _converter(incremental)
+                    streamed.add_json_stream(file_path)
+                    self.assertEqual(streamed.run(), loaded.run())
+
+    def test_incremental_summary_matches(self) -> None:
+        docs: list[Any] = [{"a": 1}, ITEMS, []]
+        loaded = _converter(True)
+        streamed = _converter(True)
+        for doc in docs:
+            loaded.add_json(doc)
+            if isinstance(doc, list):
+                streamed.add_json_stream(io.StringIO(json.dumps(doc)))
+            else:
+                streamed.add_json(doc)
+        self.assertEqual(streamed.export_state(), loaded.export_state())
+        self.assertEqual(streamed.schema(), loaded.schema())
+
+    def test_cli_stream(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            input_path = Path(tmpdir) / "input.json"
+            input_path.write_text(json.dumps(ITEMS), encoding="utf-8")
+            outputs = []
+            for extra in ([], ["--stream"]):
+                output_path = Path(tmpdir) / "schema.json"
+                main([str(input_path), "-o", str(output_path), *extra])
+                outputs.append(json.loads(output_path.read_text(encoding="utf-8")))
+            self.assertEqual(outputs[0], outputs[1])
+
+
+class TestAddJsonl(unittest.TestCase):
+    LINES = ["", *map(json.dumps, ITEMS), "{oops", "   ", '{"x": "2024-01-02"}']
+
+    def test_matches_add_json(self) -> None:
+        text = "\n".join(line for line in self.LINES if line != "{oops")
+        for incremental in (False, True):
+            with self.subTest(incremental=incremental):
+                loaded = _converter(incremental)
+                for item in ITEMS + [{"x": "2024-01-02"}]:
+                    loaded._add_document(item)
+                streamed = _converter(incremental)
+                counts = streamed.add_jsonl(io.StringIO(text))
+                self.assertEqual(counts, {"instances": len(ITEMS) + 1, "skipped": 0})
+                self.assertEqual(streamed.run(), loaded.run())
+
+    def test_invalid_lines(self) -> None:
+        text = "\n".join(self.LINES)
+        with self.assertRaisesRegex(ValueError, f"line {len(ITEMS) + 2}"):
+            _converter(True).add_jsonl(io.StringIO(text))
+
+        conv = _converter(True)
+        counts = conv.add_jsonl(io.BytesIO(text.encode("utf-8")), skip_invalid=True)
+        self.assertEqual(counts, {"instances": len(ITEMS) + 1, "skipped": 1})
+
+        invalid: list[int] = []
+        values = list(iter_json_lines(io.StringIO(text), lambda n, e: invalid.append(n)))
+        self.assertEqual(len(values), len(ITEMS) + 1)
+        self.assertEqual(invalid, [len(ITEMS) + 2])
+
+    def test_invalid_utf8_line(self) -> None:
+        data = b'{"a": 1}\n{"a": "\xff"}\n{"a": 2}\n'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "events.jsonl"
+            path.write_bytes(data)
+            counts = _converter(True).add_jsonl(path, skip_invalid=True)
+            self.assertEqual(counts, {"instances": 2, "skipped": 1})
+            with self.assertRaisesRegex(ValueError, "line 2"):
+                _converter(True).add_jsonl(path)
+
+        invalid: list[int] = []
+        values = list(iter_json_lines(io.BytesIO(data), lambda n, e: invalid.append(n)))
+        self.assertEqual((values, invalid), ([{"a": 1}, {"a": 2}], [2]))
+
+        text = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8")
+        with self.assertRaisesRegex(ValueError, "binary mode"):
+            list(iter_json_lines(text, lambda n, e: None))
+
+    def test_cli_jsonl(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            lines = "\n".join(self.LINES)
+            output_path = Path(tmpdir) / "schema.json"
+            outputs = []
+            for name, extra in (
+                ("events.ndjson", ["--skip-invalid-lines"]),
+                ("events.txt", ["--jsonl", "--skip-invalid-lines"]),
+            ):
+                input_path = Path(tmpdir) / name
+                input_path.write_text(lines, encoding="utf-8")
+                main([str(input_path), "-o", str(output_path), *extra])
+                outputs.append(json.loads(output_path.read_text(encoding="utf-8")))
+            self.assertEqual(outputs[0], outputs[1])
+            self.assertIn("anyOf", outputs[0])
+
+            with self.assertRaises(SystemExit):
+                main([str(Path(tmpdir) / "events.ndjson"), "-o", str(output_path)])
+
+
+if __name__ == "__main__":
+    unittest.main()